@@ -0,0 +1,156 @@
+"""Draws the bar charts of `generate` with matplotlib's Agg rasterizer, without a browser."""
+
+import base64
+import time
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import plotly.io as pio
+from matplotlib.axes import Axes
+from matplotlib.figure import Figure
+
+from log import get_logger
+
+logger = get_logger()
+
+# Colors of plotly's default template, so that both engines draw similar looking charts
+_PLOT_BACKGROUND = "#E5ECF6"
+_GRID_COLOR = "white"
+_DPI = 100
+
+
+class AggRenderer:
+    """Renders the figures built by `generate` in the process, drawing them with matplotlib.
+
+    Only what `generate` puts into the figures is drawn: grouped bar traces with optional error bars and value labels,
+    the title, the axis titles and the legend. The image size is the same as Kaleido's.
+    """
+
+    def __init__(self) -> None:
+        self.rendered_images = 0
+
+    def write_images(
+        self, fig_dicts: list[dict], file_paths: list[list[Path]] | list[list[str]]
+    ) -> list[Path] | list[str]:
+        """Write every figure to all of its paths, the image format is taken from the suffix of the path.
+
+        Returns:
+            The paths that failed to render, like `KaleidoRenderer.write_images`.
+        """
+        start = time.perf_counter()
+        figures = 0
+        failed = []
+        for fig_dict, paths in zip(fig_dicts, file_paths, strict=True):
+            if not paths:
+                continue
+            try:
+                fig = draw_figure(fig_dict)
+            except Exception as e:
+                logger.error(f"Failed to draw a figure: {e}")
+                failed.extend(paths)
+                continue
+            for file_path in paths:
+                try:
+                    fig.savefig(
+                        file_path, format=Path(file_path).suffix.removeprefix(".") or pio.defaults.default_format
+                    )
+                except Exception as e:
+                    logger.error(f"Failed to write {file_path}: {e}")
+                    failed.append(file_path)
+                    continue
+                self.rendered_images += 1
+            figures += 1
+
+        if figures:
+            seconds = time.perf_counter() - start
+            logger.info(f"Drew {figures} figures in {seconds:.2f}s, {seconds / figures * 1000:.1f}ms per figure")
+        return failed
+
+    def close(self) -> None:
+        pass
+
+
+def draw_figure(fig_dict: dict) -> Figure:
+    """Draw a figure made of grouped bar traces, as built by `generate.make_plot` and `generate.make_plot_with_error`."""
+    layout = fig_dict.get("layout", {})
+    traces = [trace for trace in fig_dict.get("data", []) if trace.get("type", "bar") == "bar"]
+
+    fig = Figure(
+        figsize=(pio.defaults.default_width / _DPI, pio.defaults.default_height / _DPI),
+        dpi=_DPI * pio.defaults.default_scale,
+        layout="constrained",
+    )
+    ax = fig.add_subplot()
+    ax.set_facecolor(_PLOT_BACKGROUND)
+    ax.grid(axis="y", color=_GRID_COLOR)
+    ax.set_axisbelow(True)
+    for spine in ax.spines.values():
+        spine.set_visible(False)
+
+    xaxis = layout.get("xaxis", {})
+    categories = _categories([_array(trace.get("x", [])) for trace in traces], xaxis.get("categoryarray"))
+    _draw_bars(ax, traces, categories, layout)
+
+    if xaxis.get("showticklabels", True):
+        ax.set_xticks(range(len(categories)), [str(category) for category in categories])
+    else:
+        ax.set_xticks([])
+    ax.set_xlim(-0.5, len(categories) - 0.5)
+
+    fig.suptitle(_text(layout.get("title")), x=0.02, horizontalalignment="left")
+    ax.set_xlabel(_text(xaxis.get("title")))
+    ax.set_ylabel(_text(layout.get("yaxis", {}).get("title")))
+    if traces:
+        fig.legend(title=_text(layout.get("legend", {}).get("title")), loc="outside right upper", frameon=False)
+    return fig
+
+
+def _draw_bars(ax: Axes, traces: list[dict], categories: list[Any], layout: dict) -> None:
+    """Draw the traces side by side in every category, like plotly's group bar mode."""
+    position = {category: index for (index, category) in enumerate(categories)}
+    group_width = 1 - layout.get("bargap", 0.2)
+    slot_width = group_width / max(len(traces), 1)
+    bar_width = slot_width * (1 - layout.get("bargroupgap", 0.0))
+
+    for index, trace in enumerate(traces):
+        x = _array(trace.get("x", []))
+        y = _array(trace.get("y", []))
+        offset = -group_width / 2 + (index + 0.5) * slot_width
+        error = _array(trace["error_y"]["array"]) if "array" in trace.get("error_y", {}) else None
+
+        bars = ax.bar(
+            [position[category] + offset for category in x.tolist()],
+            y,
+            width=bar_width,
+            color=trace.get("marker", {}).get("color"),
+            label=trace.get("name"),
+            yerr=error,
+            capsize=3 if error is not None else 0,
+        )
+        if trace.get("texttemplate") == "%{y}":
+            ax.bar_label(bars, labels=[f"{value:g}" for value in y], fontsize="small")
+
+
+def _categories(xs: list[np.ndarray], category_order: list[Any] | None) -> list[Any]:
+    """Categories of the x axis in the order plotly shows them: numbers sorted, other values by the category order."""
+    categories = list(dict.fromkeys(value for x in xs for value in x.tolist()))
+    if all(isinstance(category, int | float) for category in categories):
+        return sorted(categories)
+    if category_order is not None:
+        order = {category: index for (index, category) in enumerate(category_order)}
+        categories.sort(key=lambda category: order.get(category, len(order)))
+    return categories
+
+
+def _array(value: Any) -> np.ndarray:
+    """Values of a data array of a figure, which is encoded as base64 in figures loaded from JSON."""
+    if isinstance(value, dict) and "bdata" in value:
+        return np.frombuffer(base64.b64decode(value["bdata"]), dtype=value["dtype"])
+    return np.asarray(value)
+
+
+def _text(title: dict | str | None) -> str:
+    if isinstance(title, dict):
+        return title.get("text", "")
+    return title or ""
@@ -1,11 +1,16 @@
+from collections.abc import Callable
+from functools import partial
+from pathlib import Path
 from typing import Any, TypeVar
 
-from yaml import safe_load
+import yaml
 from yamlable import YamlAble, yaml_info
+from yamlable.main import YAMLABLE_PREFIX
 
+from fast_yaml import FastDumper, FastLoader, safe_dump, safe_load
 from log import get_logger
 from metadata import BenchmarkType
-from stats import ShardedMetricRunMeasurement, ShardlessMetricRunMeasurement, Stats, summarize_stats
+from stats import SamplesTree, Stats, join_stats, split_by_run, summarize_stats
 from tree import TreeDict
 
 logger = get_logger()
@@ -26,8 +31,14 @@ def try_deserialize_yaml(t: type[T], data: Any, yaml_tag: str) -> T:
         return t.__from_yaml_dict__(data, yaml_tag=yaml_tag)
 
 
+# The result classes are slotted, but YamlAble has no __slots__, so their instances still have a __dict__. The slots
+# only keep it empty and unallocated, as long as nothing reads it: `__to_yaml_dict__` replaces yamlable's default,
+# which reads vars(self). On Python 3.13 a ShardedMeasurement takes ~104 bytes, an unslotted one 128, growing to 192
+# once vars(self) is read. Dropping the __dict__ entirely would need classes that aren't YamlAble.
 @yaml_info("shardless_backend_result")
 class ShardlessBackendResult(YamlAble):
+    __slots__ = ("properties", "value")
+
     def __init__(self, properties: dict[str, Any], value: Any) -> None:
         self.properties = properties
         self.value = value
@@ -35,6 +46,9 @@ class ShardlessBackendResult(YamlAble):
     def __repr__(self) -> str:
         return f"ShardlessBackendResult(properties={self.properties}, value={self.value})"
 
+    def __to_yaml_dict__(self) -> dict[str, Any]:
+        return {"properties": self.properties, "value": self.value}
+
     @classmethod
     def __from_yaml_dict__(cls, dct: dict[str, Any], yaml_tag: str) -> "ShardlessBackendResult":
         properties = dct.get("properties", {})
@@ -44,6 +58,8 @@ class ShardlessBackendResult(YamlAble):
 
 @yaml_info("sharded_measurement")
 class ShardedMeasurement(YamlAble):
+    __slots__ = ("shard", "value")
+
     def __init__(self, shard: int, value: Any) -> None:
         self.value = value
         self.shard = shard
@@ -51,6 +67,9 @@ class ShardedMeasurement(YamlAble):
     def __repr__(self) -> str:
         return f"ShardedMeasurement(shard={self.shard}, value={self.value})"
 
+    def __to_yaml_dict__(self) -> dict[str, Any]:
+        return {"value": self.value, "shard": self.shard}
+
     @classmethod
     def __from_yaml_dict__(cls, dct: dict[str, Any], yaml_tag: str) -> "ShardedMeasurement":
         shard = int(dct["shard"])
@@ -60,6 +79,8 @@ class ShardedMeasurement(YamlAble):
 
 @yaml_info("sharded_backend_result")
 class ShardedBackendResult(YamlAble):
+    __slots__ = ("properties", "shards")
+
     def __init__(self, properties: dict[str, Any], shards: list[ShardedMeasurement]) -> None:
         self.properties = properties
         self.shards = shards
@@ -67,6 +88,9 @@ class ShardedBackendResult(YamlAble):
     def __repr__(self) -> str:
         return f"ShardedBackendResult(properties={self.properties}, shards={self.shards})"
 
+    def __to_yaml_dict__(self) -> dict[str, Any]:
+        return {"properties": self.properties, "shards": self.shards}
+
     @classmethod
     def __from_yaml_dict__(cls, dct: dict[str, Any], yaml_tag: str) -> "ShardedBackendResult":
         properties = dct.get("properties", {})
@@ -207,20 +231,61 @@ class BenchmarkInfo(YamlAble):
 
 @yaml_info("benchmark")
 class Benchmark(YamlAble):
+    """Summary of all runs of a benchmark.
+
+    The measurements are kept in the compact per-metric sample store returned by `stats.join_stats`,
+    the per-run `RunSummary` view is only built when requested (e.g. for the YAML output).
+    """
+
     def __init__(
-        self, runs: list[RunSummary], info: BenchmarkInfo, summary: Stats, run_count: int | None = None
+        self,
+        sharded_samples: SamplesTree,
+        shardless_samples: SamplesTree,
+        info: BenchmarkInfo,
+        summary: Stats,
+        run_count: int | None = None,
     ) -> None:
-        self.runs = runs
+        self.sharded_samples = sharded_samples
+        self.shardless_samples = shardless_samples
         self.benchmark = info
         self.summary = summary
-        self.run_count = run_count if run_count is not None else len(runs)
+        # Loads the runs of a benchmark loaded without them, see `load_from_file`
+        self._runs_loader: Callable[[], list[RunSummary]] | None = None
+        self.run_count = run_count if run_count is not None else len(self.get_run_ids())
         logger.debug(f"Initialized benchmark with benchmark={info}")
         logger.debug(
-            f"Initialized benchmark with runs={self.runs}, benchmark={self.benchmark}, summary={self.summary}, run_count={self.run_count}"
+            f"Initialized benchmark with benchmark={self.benchmark}, summary={self.summary}, run_count={self.run_count}"
         )
 
+    @classmethod
+    def from_runs(
+        cls, runs: list[RunSummary], info: BenchmarkInfo, summary: Stats, run_count: int | None = None
+    ) -> "Benchmark":
+        (sharded_samples, shardless_samples) = join_run_summaries(runs)
+        return cls(sharded_samples, shardless_samples, info, summary, run_count if run_count is not None else len(runs))
+
+    def _load_runs(self) -> None:
+        if self._runs_loader is not None:
+            logger.debug(f"Loading runs of benchmark {self.benchmark.id}")
+            (self.sharded_samples, self.shardless_samples) = join_run_summaries(self._runs_loader())
+            self._runs_loader = None
+
     def get_runs(self) -> list[RunSummary]:
-        return self.runs
+        self._load_runs()
+        return build_run_summaries(self.sharded_samples, self.shardless_samples)
+
+    def get_run_ids(self) -> list[int]:
+        self._load_runs()
+        run_ids: set[int] = set()
+        for samples_tree in (self.sharded_samples, self.shardless_samples):
+            for _, backends in samples_tree.items():
+                for samples in backends.values():
+                    run_ids.update(samples.run_ids)
+        return sorted(run_ids)
+
+    def get_samples(self) -> tuple[SamplesTree, SamplesTree]:
+        self._load_runs()
+        return (self.sharded_samples, self.shardless_samples)
 
     def get_info(self) -> BenchmarkInfo:
         return self.benchmark
@@ -232,94 +297,198 @@ class Benchmark(YamlAble):
         return self.run_count
 
     @classmethod
-    def load_from_file(cls, file):
+    def load_from_file(cls, file, lazy_runs: bool = False):
         """Load a benchmark summary from a YAML file and return a `benchmark` instance.
 
         This helper accepts both tagged yamlable documents and legacy plain mappings
-        (no `!yamlable/...` tag). It prefers the yamlable loading path when possible,
-        otherwise it normalizes the mapping and constructs the object.
+        (no `!yamlable/...` tag), with the runs either inline or in a separate file
+        referred to by `runs_file` (see `dump_split`).
+
+        Runs in a separate file are only loaded when the measurements are first accessed.
+        With lazy_runs, the same is done for inline runs of a file opened from a path,
+        which is then read again if they are accessed.
         """
         logger.debug(f"Loading benchmark from file {file}")
-        data = safe_load(file)
-
-        if isinstance(data, cls):
-            return data
-
-        if isinstance(data, dict):
-            return cls.__from_yaml_dict__(data, yaml_tag=None)
-
-        raise TypeError(f"Cannot load benchmark: unexpected YAML document type {type(data)}")
+        path = Path(file.name) if isinstance(getattr(file, "name", None), str) else None
+        skip_runs = lazy_runs and path is not None
+
+        (dct, skipped) = _load_benchmark_mapping(file, include=lambda key: not (skip_runs and key == "runs"))
+        runs_file = dct.pop("runs_file", None)
+        if "runs" in skipped:
+            runs_loader = partial(_load_inline_runs, path)
+        elif runs_file is not None and "runs" not in dct:
+            runs_loader = partial(_load_runs_file, (path.parent if path is not None else Path()) / runs_file)
+        else:
+            return cls.__from_yaml_dict__(dct, yaml_tag=None)
+
+        benchmark = cls.__from_yaml_dict__(dct, yaml_tag=None)
+        benchmark._runs_loader = runs_loader
+        if "run_count" not in dct:
+            benchmark.run_count = len(benchmark.get_run_ids())
+        return benchmark
+
+    def dump_split(self, summary_path: Path, runs_path: Path) -> None:
+        """Dump the runs of the benchmark into runs_path and everything else into summary_path.
+
+        The summary file refers to the runs file by its path relative to the summary's directory,
+        so tools that only need the stats can load it without reading the runs.
+        """
+        with open(runs_path, "w") as f:
+            safe_dump(self.get_runs(), f)
+        with open(summary_path, "w") as f:
+            safe_dump(_SplitBenchmark(self, Path(runs_path).relative_to(Path(summary_path).parent)), f)
+
+    def __to_yaml_dict__(self) -> dict[str, Any]:
+        return {
+            "runs": self.get_runs(),
+            "benchmark": self.benchmark,
+            "summary": self.summary,
+            "run_count": self.run_count,
+        }
 
     @classmethod
     def __from_yaml_dict__(cls, dct: dict[str, Any], yaml_tag: str) -> "Benchmark":
-        runs_data = dct.get("runs", [])
-        runs = [try_deserialize_yaml(RunSummary, run_dct, yaml_tag="run_summary") for run_dct in runs_data]
+        runs = _deserialize_runs(dct.get("runs", []))
 
         summary = try_deserialize_yaml(Stats, dct.get("summary", {}), yaml_tag="stats")
 
         run_count = int(dct.get("run_count", len(runs)))
         benchmark_info = try_deserialize_yaml(BenchmarkInfo, dct.get("benchmark", {}), yaml_tag="benchmark_info")
 
-        return cls(runs=runs, info=benchmark_info, summary=summary, run_count=run_count)
+        return cls.from_runs(runs, info=benchmark_info, summary=summary, run_count=run_count)
 
     def __repr__(self) -> str:
-        return f"Benchmark(runs={self.runs}, benchmark={self.benchmark}, summary={self.summary})"
+        return f"Benchmark(sharded_samples={self.sharded_samples}, shardless_samples={self.shardless_samples}, benchmark={self.benchmark}, summary={self.summary})"
+
+
+class _SplitBenchmark:
+    """A benchmark dumped without its runs, which are stored in runs_file."""
+
+    __slots__ = ("benchmark", "runs_file")
+
+    def __init__(self, benchmark: Benchmark, runs_file: Path) -> None:
+        self.benchmark = benchmark
+        self.runs_file = runs_file
+
+
+def _represent_split_benchmark(dumper: FastDumper, data: _SplitBenchmark) -> yaml.nodes.MappingNode:
+    return dumper.represent_mapping(
+        YAMLABLE_PREFIX + Benchmark.__yaml_tag_suffix__,
+        {
+            "benchmark": data.benchmark.get_info(),
+            "summary": data.benchmark.get_stats(),
+            "run_count": data.benchmark.get_run_count(),
+            "runs_file": data.runs_file.as_posix(),
+        },
+    )
+
+
+FastDumper.add_representer(_SplitBenchmark, _represent_split_benchmark)
+
+# Tags of the documents `Benchmark.load_from_file` accepts: tagged benchmarks and legacy plain mappings
+_BENCHMARK_TAGS = (YAMLABLE_PREFIX + Benchmark.__yaml_tag_suffix__, yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG)
+
+
+def _load_benchmark_mapping(file, include: Callable[[Any], bool]) -> tuple[dict[str, Any], set[Any]]:
+    """Load the top-level mapping of a benchmark document, constructing only the values of the included keys.
+
+    Returns the mapping and the keys of the document that were not included.
+    """
+    loader = FastLoader(file)
+    try:
+        root = loader.get_single_node()
+        if not isinstance(root, yaml.nodes.MappingNode) or root.tag not in _BENCHMARK_TAGS:
+            data = loader.construct_document(root) if root is not None else None
+            raise TypeError(f"Cannot load benchmark: unexpected YAML document type {type(data)}")
+
+        dct: dict[str, Any] = {}
+        skipped: set[Any] = set()
+        for key_node, value_node in root.value:
+            key = loader.construct_object(key_node, deep=True)
+            if key in dct or key in skipped:
+                raise ValueError(f"Duplicate key '{key}' at {key_node.start_mark}")
+            if include(key):
+                dct[key] = loader.construct_object(value_node, deep=True)
+            else:
+                skipped.add(key)
+        return (dct, skipped)
+    finally:
+        loader.dispose()
+
+
+def _deserialize_runs(runs_data: list) -> list[RunSummary]:
+    return [try_deserialize_yaml(RunSummary, run_dct, yaml_tag="run_summary") for run_dct in runs_data]
+
+
+def _load_inline_runs(path: Path) -> list[RunSummary]:
+    with open(path) as f:
+        (dct, _) = _load_benchmark_mapping(f, include=lambda key: key == "runs")
+    return _deserialize_runs(dct.get("runs", []))
+
+
+def _load_runs_file(path: Path) -> list[RunSummary]:
+    with open(path) as f:
+        return _deserialize_runs(safe_load(f) or [])
 
 
 def compute_benchmark_summary(
-    sharded_metrics: TreeDict[dict[str, list[ShardedMetricRunMeasurement]]],
-    shardless_metrics: TreeDict[dict[str, list[ShardlessMetricRunMeasurement]]],
+    sharded_metrics: SamplesTree,
+    shardless_metrics: SamplesTree,
     benchmark_info: BenchmarkInfo,
 ) -> Benchmark:
-    # build map run_id -> run entry
-    runs_map: dict[int, RunSummary] = {}
-
     logger.debug(f"Computing benchmark summary {sharded_metrics=}, {shardless_metrics=}, {benchmark_info=}")
 
-    # process sharded metrics
-    for metric_name, backends in (sharded_metrics or {}).items():
-        for backend_name, items in backends.items():
-            for item in items:
-                run_id = item.run_id
-                shard = item.shard
-                value = item.value
-
-                if run_id not in runs_map:
-                    runs_map[run_id] = RunSummary(
-                        id=run_id,
-                        properties={},
-                        results=Results(sharded_metrics=TreeDict(), shardless_metrics=TreeDict()),
-                    )
-
-                run_entry = runs_map[run_id]
-                backends_for_metric = run_entry.results.sharded_metrics.setdefault(
-                    metric_name, PerBenchmarkShardedResults.default()
-                ).backends
-
-                backends_for_metric.setdefault(
-                    backend_name, ShardedBackendResult(properties={}, shards=[])
-                ).shards.append(ShardedMeasurement(shard=shard, value=value))
-
-    # process shardless metrics
-    for metric_name, backends in (shardless_metrics or {}).items():
-        for backend_name, items in backends.items():
-            for item in items:
-                run_id = item.run_id
-                value = item.value
-
-                if run_id not in runs_map:
-                    runs_map[run_id] = RunSummary(
-                        id=run_id,
+    summary_stats = summarize_stats(sharded_metrics, shardless_metrics)
+    return Benchmark(sharded_metrics, shardless_metrics, info=benchmark_info, summary=summary_stats)
+
+
+def build_run_summaries(sharded_metrics: SamplesTree, shardless_metrics: SamplesTree) -> list[RunSummary]:
+    """Group the measurements by run, sorted by run id."""
+    runs: list[RunSummary] = []
+    for run_id, (sharded, shardless) in split_by_run(sharded_metrics, shardless_metrics).items():
+        results = Results.default()
+        for metric_name, backends in sharded.items():
+            results.sharded_metrics[metric_name] = PerBenchmarkShardedResults(
+                backends={
+                    backend_name: ShardedBackendResult(
                         properties={},
-                        results=Results(sharded_metrics=TreeDict(), shardless_metrics=TreeDict()),
+                        shards=[ShardedMeasurement(shard=shard, value=value) for shard, value in shards.items()],
                     )
-
-                run_entry = runs_map[run_id]
-                backends_for_metric = run_entry.results.shardless_metrics.setdefault(
-                    metric_name, PerBenchmarkShardlessResults.default()
-                ).backends[backend_name] = ShardlessBackendResult(properties={}, value=value)
-
-    # prepare final summary
-    runs_list = [runs_map[k] for k in sorted(runs_map.keys())]
-    summary_stats = summarize_stats(sharded_metrics, shardless_metrics)
-    return Benchmark(runs=runs_list, info=benchmark_info, summary=summary_stats)
+                    for backend_name, shards in backends.items()
+                },
+                properties={},
+            )
+        for metric_name, backends in shardless.items():
+            results.shardless_metrics[metric_name] = PerBenchmarkShardlessResults(
+                backends={
+                    backend_name: ShardlessBackendResult(properties={}, value=value)
+                    for backend_name, value in backends.items()
+                },
+                properties={},
+            )
+        runs.append(RunSummary(id=run_id, properties={}, results=results))
+
+    return runs
+
+
+def join_run_summaries(runs: list[RunSummary]) -> tuple[SamplesTree, SamplesTree]:
+    """Inverse of `build_run_summaries`: collect the measurements of the runs into the sample store."""
+    return join_stats(
+        [
+            {
+                "run_id": run.id,
+                "sharded": {
+                    metric_name: {
+                        backend_name: {measurement.shard: measurement.value for measurement in backend.shards}
+                        for backend_name, backend in results.backends.items()
+                    }
+                    for metric_name, results in run.results.sharded_metrics.items()
+                },
+                "shardless": {
+                    metric_name: {backend_name: backend.value for backend_name, backend in results.backends.items()}
+                    for metric_name, results in run.results.shardless_metrics.items()
+                },
+            }
+            for run in runs
+        ]
+    )
@@ -1,26 +1,46 @@
 import argparse
+import multiprocessing
+import os
 import subprocess
+from dataclasses import dataclass, replace
 from datetime import datetime
 from pathlib import Path
 from typing import Any
 
-from yaml import safe_dump, safe_load
-
 from benchmark import Benchmark, BenchmarkInfo, compute_benchmark_summary
+from columnar_summary import (
+    COLUMNAR_SUMMARY_FILENAME,
+    UnsupportedSummaryError,
+    load_columnar_summary,
+    write_columnar_summary,
+)
+from config_scheduling import config_resources, local_cpus, schedule_batches
 from config_versioning import get_config_version, make_proportional_splitter, upgrade_version1_to_version2
+from fast_yaml import safe_dump, safe_load
 from generate import PlotGenerator
-from log import get_logger
+from iteration_policy import IterationPolicy
+from journal import JOURNAL_FILENAME, SuiteJournal
+from log import get_logger, set_level
 from metadata import BenchmarkMetadataHolder
 from parse import RawBackendData, auto_generate_data_points, join_metrics
-from pdf_summary import generate_benchmark_summary_pdf, merge_pdfs
+from pdf_summary import (
+    PdfRenderOptions,
+    find_chart_images,
+    generate_benchmark_summary_pdf,
+    merge_pdfs,
+    parse_pdf_grid,
+)
+from render_pipeline import BackgroundWorker
+from renderer import DEFAULT_RENDER_ENGINE, RENDER_ENGINES, SVG_TEXT_AS_PATHS_ENGINES
 from run_io import run_io_test
 from run_rpc import run_rpc_test
 from scylla_perf import PerfSimpleQueryTestRunner
-from stats import join_stats
+from stats import SamplesTree, StatsAggregator, split_by_run
 from tree import TreeDict
 
 SUITE_SUMMARY_PDF_FILENAME = "suite_summary.pdf"
 BENCHMARK_SUMMARY_FILENAME = "metrics_summary.yaml"
+BENCHMARK_RUNS_FILENAME = "runs.yaml"
 
 logger = get_logger()
 
@@ -28,14 +48,17 @@ SUPPORTED_BENCHMARK_TYPES = ["io", "rpc", "simple-query"]
 
 
 class BenchmarkSuiteRunner:
+    @dataclass
     class PlottingConfig:
-        def __init__(self, generate_graphs: bool, generate_summary_graph: bool, generate_pdf: bool) -> None:
-            self.generate_graphs = generate_graphs
-            self.generate_summary_graph = generate_summary_graph
-            self.generate_pdf = generate_pdf
-
-        def __repr__(self) -> str:
-            return f"PlottingConfig(generate_graphs={self.generate_graphs}, generate_summary_graph={self.generate_summary_graph}, generate_pdf={self.generate_pdf})"
+        generate_graphs: bool
+        generate_summary_graph: bool
+        generate_pdf: bool
+        render_jobs: int = 1
+        render_engine: str = DEFAULT_RENDER_ENGINE
+        # Charts per page of the summary PDFs, (rows, columns)
+        pdf_grid: tuple[int, int] = (1, 1)
+        # CPUs the outputs are rendered on, by default those not used by the testers of the config
+        render_cpus: set[int] | None = None
 
     def __init__(
         self,
@@ -55,17 +78,36 @@ class BenchmarkSuiteRunner:
         self.plotting_config = plotting_config
         self.benchmarks = benchmarks
         self.plot_generator = plot_generator
+        self.journal = SuiteJournal(self.output_dir / JOURNAL_FILENAME)
+        self.render_cpus = self._render_cpus(config)
         logger.debug(
             f"Initialized benchmark suite runner with output_dir={self.output_dir}, backends={self.backends}, params={self.params}, io_config={self.io_config}, rpc_config={self.rpc_config}, scylla_config={self.scylla_config}, benchmarks={self.benchmarks}, genetare_graphs={self.plotting_config.generate_graphs}, generate_summary_graph={self.plotting_config.generate_summary_graph}, generate_pdf={self.plotting_config.generate_pdf}"
         )
 
     def run(self) -> None:
-        per_benchmark_pdfs: list[Path] = []
+        # Graphs, PDFs and summaries of a finished benchmark are produced in the background,
+        # on CPUs not used by the testers, while the next benchmark is already running
+        renderer = BackgroundWorker(
+            BenchmarkOutputRenderer(self.plotting_config, self.plot_generator), self.render_cpus
+        )
+        renderer.start()
+        try:
+            self._run_benchmarks(renderer)
+        except BaseException:
+            # Waiting for the pending outputs could take long, and their errors would hide this one
+            renderer.terminate()
+            raise
+        per_benchmark_pdfs = [pdf for pdf in renderer.close() if pdf is not None]
+
+        if self.plotting_config.generate_pdf and per_benchmark_pdfs:
+            logger.info("Merging pdfs")
+            merge_pdfs(input_pdfs=per_benchmark_pdfs, output_pdf=self.output_dir / SUITE_SUMMARY_PDF_FILENAME)
 
+    def _run_benchmarks(self, renderer: BackgroundWorker) -> None:
         for benchmark in self.benchmarks:
             test_name = benchmark["name"]
-            iterations = benchmark.get("iterations", 1)
-            logger.info(f"Running benchmark {test_name} with {iterations} iterations")
+            policy = IterationPolicy.from_config(benchmark.get("iterations"))
+            logger.info(f"Running benchmark {test_name} with {policy}")
 
             test_output_dir: Path = self.output_dir / test_name
             test_output_dir.mkdir(exist_ok=True, parents=True)
@@ -75,72 +117,71 @@ class BenchmarkSuiteRunner:
             with open(config_path, "w") as f:
                 print(safe_dump(benchmark["config"]), file=f)
 
-            metrics_runs = []
-            for i in range(iterations):
+            runs = StatsAggregator()
+            while (stop_reason := policy.stop_reason(runs)) is None:
+                i = runs.run_count
+                if i > 0:
+                    # So that a long benchmark can be inspected while it's still running
+                    self._dump_partial_summary(benchmark, runs, test_output_dir, renderer)
                 logger.info(f"Running test {test_name}, i={i}")
 
                 run_output_dir: Path = test_output_dir / f"run_{i}"
                 run_output_dir.mkdir(exist_ok=True, parents=True)
-                [shardless_metrics, sharded_metrics] = self._run_iteration(benchmark, run_output_dir, config_path)
-                metrics_runs.append({"run_id": i, "sharded": sharded_metrics, "shardless": shardless_metrics})
-
-            (combined_sharded, combined_shardless) = join_stats(metrics_runs)
-            benchmark_info = BenchmarkInfo(id=test_name, type=benchmark["type"], properties={"iterations": iterations})
-            summary = compute_benchmark_summary(combined_sharded, combined_shardless, benchmark_info)
-
-            if self.plotting_config.generate_graphs:
-                _plot_runs(summary, test_output_dir, self.plot_generator)
-
-            if self.plotting_config.generate_summary_graph:
-                logger.info("Generating summary graphs")
-                self.plot_generator.schedule_graphs_for_summary(
-                    summary.get_info().id,
-                    summary.get_stats(),
-                    test_output_dir,
-                    type=benchmark_info.type,
-                    image_format="svg",
-                )
-
-            if self.plotting_config.generate_pdf:
-                logger.info("Generating pdf graphs")
-                self.plot_generator.schedule_graphs_for_summary(
-                    summary.get_info().id,
-                    summary.get_stats(),
-                    test_output_dir,
-                    type=benchmark_info.type,
-                    image_format="png",
+                [shardless_metrics, sharded_metrics] = self._run_iteration(benchmark, i, run_output_dir, config_path)
+                runs.add_run({"run_id": i, "sharded": sharded_metrics, "shardless": shardless_metrics})
+
+            properties: dict[str, Any] = {"iterations": runs.run_count}
+            if not policy.is_fixed():
+                properties["stop_reason"] = stop_reason
+                properties["achieved_rel_ci"] = policy.relative_ci(runs)
+                logger.info(
+                    f"Stopped benchmark {test_name} after {runs.run_count} iterations: {stop_reason}, relative CI {properties['achieved_rel_ci']}"
                 )
 
-            # We need to plot now, to have at least the plots for the .pdfs
-            self.plot_generator.plot()
+            benchmark_info = BenchmarkInfo(id=test_name, type=benchmark["type"], properties=properties)
+            renderer.submit(*runs.get_samples(), benchmark_info, test_output_dir)
 
-            if self.plotting_config.generate_pdf:
-                logger.info("Generating pdf")
-                summary_images = sorted(test_output_dir.glob("*.png"))
-                pdf_path = generate_benchmark_summary_pdf(
-                    benchmark_name=test_name,
-                    images=summary_images,
-                    output_pdf=test_output_dir / "summary.pdf",
-                )
-                per_benchmark_pdfs.append(pdf_path)
-
-            dump_summary(test_output_dir, summary)
-
-        if self.plotting_config.generate_pdf and per_benchmark_pdfs:
-            logger.info("Merging pdfs")
-            merge_pdfs(input_pdfs=per_benchmark_pdfs, output_pdf=self.output_dir / SUITE_SUMMARY_PDF_FILENAME)
+    def _dump_partial_summary(
+        self, benchmark: dict, runs: StatsAggregator, test_output_dir: Path, renderer: BackgroundWorker
+    ) -> None:
+        """Have the renderer dump the summary of the runs so far, marked as partial, in place of the final one."""
+        benchmark_info = BenchmarkInfo(
+            id=benchmark["name"], type=benchmark["type"], properties={"iterations": runs.run_count, "partial": True}
+        )
+        renderer.submit(*runs.get_samples(), benchmark_info, test_output_dir)
+
+    def _render_cpus(self, config: dict) -> set[int] | None:
+        """CPUs available to this process that aren't used by the testers of this config.
+
+        Configs running concurrently get the CPUs not used by the testers of any of them, in the plotting config.
+        """
+        render_cpus = self.plotting_config.render_cpus
+        if render_cpus is None:
+            tester_cpus = local_cpus(config_resources(config, {benchmark["type"] for benchmark in self.benchmarks}))
+            render_cpus = os.sched_getaffinity(0) - tester_cpus
+        if not render_cpus:
+            logger.warning("All available CPUs are used by the testers, rendering won't be pinned")
+            return None
+        return render_cpus
 
     def _run_iteration(
-        self, benchmark: Benchmark, run_output_dir: Path, config_path: Path
+        self, benchmark: Benchmark, iteration: int, run_output_dir: Path, config_path: Path
     ) -> tuple[TreeDict[dict[str, Any]], TreeDict[dict[str, dict[int, Any]]]]:
         result: dict[str, tuple[TreeDict[Any], TreeDict[dict[int, Any]]]] = {}
 
         for backend in self.backends:
+            journaled = self.journal.get(benchmark["name"], iteration, backend)
+            if journaled is not None:
+                logger.info(f"Skipping backend {backend}, its result is already in the journal")
+                result[backend] = journaled
+                continue
+
             logger.info(f"Running iteration for backend {backend}")
             raw_results = self._run_benchmark(benchmark, run_output_dir, config_path, backend)
             if raw_results is None:
                 raise Exception(f"Backend {backend} did not return any result")
             result[backend] = auto_generate_data_points(raw_results)
+            self.journal.record(benchmark["name"], iteration, backend, result[backend])
 
         return join_metrics(result)
 
@@ -175,23 +216,118 @@ class BenchmarkSuiteRunner:
 
 
 def _plot_runs(benchmark: Benchmark, output_dir: Path, plot_generator: PlotGenerator) -> None:
-    for run in benchmark.runs:
-        run_id = run.id
+    for run_id, (sharded, shardless) in split_by_run(*benchmark.get_samples()).items():
         run_output_dir = output_dir / f"run_{run_id}"
         run_output_dir.mkdir(exist_ok=True, parents=True)
 
         plot_generator.schedule_graphs_for_run(
-            benchmark.get_info().id, run.results, run_output_dir, type=benchmark.get_info().type
+            benchmark.get_info().id, sharded, shardless, run_output_dir, type=benchmark.get_info().type
         )
 
 
+class BenchmarkOutputRenderer:
+    """Generates the graphs, the PDF and the summary file of a finished benchmark, or the summary of a running one."""
+
+    def __init__(self, plotting_config: BenchmarkSuiteRunner.PlottingConfig, plot_generator: PlotGenerator) -> None:
+        self.plotting_config = plotting_config
+        self.plot_generator = plot_generator
+
+    def __call__(
+        self, sharded: SamplesTree, shardless: SamplesTree, benchmark_info: BenchmarkInfo, test_output_dir: Path
+    ) -> Path | None:
+        """Summarize the samples of the benchmark and render its outputs into `test_output_dir`.
+
+        A partial summary, of the iterations run so far, is only dumped.
+
+        Returns:
+            The path of the benchmark summary PDF, or None if PDFs are disabled or the summary is partial.
+        """
+        summary = compute_benchmark_summary(sharded, shardless, benchmark_info)
+        if benchmark_info.properties.get("partial"):
+            dump_summary(test_output_dir, summary)
+            return None
+
+        pdf_path = None
+
+        if self.plotting_config.generate_graphs:
+            _plot_runs(summary, test_output_dir, self.plot_generator)
+
+        # SVGs are the summary graphs, the PDF embeds them as vector graphics if their text is drawn as paths,
+        # otherwise, or without them, it uses PNGs
+        image_formats = []
+        if self.plotting_config.generate_summary_graph:
+            image_formats.append("svg")
+        if self.plotting_config.generate_pdf and (
+            not self.plotting_config.generate_summary_graph
+            or self.plotting_config.render_engine not in SVG_TEXT_AS_PATHS_ENGINES
+        ):
+            image_formats.append("png")
+        if image_formats:
+            logger.info(f"Generating summary graphs as {image_formats}")
+            self.plot_generator.schedule_graphs_for_summary(
+                benchmark_info.id,
+                summary.get_stats(),
+                test_output_dir,
+                type=benchmark_info.type,
+                image_formats=image_formats,
+            )
+
+        # We need to plot now, to have at least the plots for the .pdfs
+        self.plot_generator.plot()
+
+        if self.plotting_config.generate_pdf:
+            logger.info("Generating pdf")
+            summary_images = find_chart_images(test_output_dir)
+            pdf_path = generate_benchmark_summary_pdf(
+                benchmark_name=benchmark_info.id,
+                images=summary_images,
+                output_pdf=test_output_dir / "summary.pdf",
+                options=PdfRenderOptions(
+                    grid_rows=self.plotting_config.pdf_grid[0], grid_columns=self.plotting_config.pdf_grid[1]
+                ),
+            )
+
+        dump_summary(test_output_dir, summary)
+        return pdf_path
+
+
 def dump_summary(benchmark_output_dir: Path, summary: Benchmark) -> None:
     """
-    Dumps the benchmark summary into benchmark_output_dir/metrics_summary.yaml
+    Dumps the benchmark summary into benchmark_output_dir/metrics_summary.yaml and its runs into
+    benchmark_output_dir/runs.yaml, and the columnar copy of both into benchmark_output_dir/metrics_summary.npz
     """
     benchmark_output_dir.mkdir(parents=True, exist_ok=True)
-    with open(benchmark_output_dir / BENCHMARK_SUMMARY_FILENAME, "w") as f:
-        f.write(safe_dump(summary))
+    summary.dump_split(
+        benchmark_output_dir / BENCHMARK_SUMMARY_FILENAME, benchmark_output_dir / BENCHMARK_RUNS_FILENAME
+    )
+
+    columnar_path = benchmark_output_dir / COLUMNAR_SUMMARY_FILENAME
+    try:
+        write_columnar_summary(summary, columnar_path)
+    except UnsupportedSummaryError as e:
+        logger.debug(f"Not writing columnar summary: {e}")
+        columnar_path.unlink(missing_ok=True)
+
+
+def load_summary(benchmark_output_dir: Path, lazy_runs: bool = False) -> Benchmark:
+    """
+    Loads the benchmark summary from benchmark_output_dir, preferring the columnar copy
+    when it is at least as recent as metrics_summary.yaml.
+    See `Benchmark.load_from_file` for lazy_runs, which only matters for summaries with inline runs
+    """
+    yaml_path = benchmark_output_dir / BENCHMARK_SUMMARY_FILENAME
+    columnar_path = benchmark_output_dir / COLUMNAR_SUMMARY_FILENAME
+
+    if columnar_path.is_file() and (
+        not yaml_path.is_file() or columnar_path.stat().st_mtime >= yaml_path.stat().st_mtime
+    ):
+        try:
+            return load_columnar_summary(columnar_path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"Failed to load columnar summary {columnar_path}, falling back to YAML: {e}")
+
+    with open(yaml_path) as f:
+        return Benchmark.load_from_file(f, lazy_runs=lazy_runs)
 
 
 def dump_environment(dir_for_config: Path, dir_to_seastar: Path) -> None:
@@ -273,6 +409,22 @@ def dump_environment(dir_for_config: Path, dir_to_seastar: Path) -> None:
 
 
 def run_benchmark_suite_args(args: argparse.Namespace, metadata_holder: BenchmarkMetadataHolder) -> None:
+    plotting_config = BenchmarkSuiteRunner.PlottingConfig(
+        generate_graphs=args.generate_graphs,
+        generate_summary_graph=args.generate_summary_graphs,
+        generate_pdf=args.pdf,
+        render_jobs=args.render_jobs,
+        render_engine=args.render_engine,
+        pdf_grid=args.pdf_grid,
+    )
+
+    if args.resume is not None:
+        _resume_suite(Path(args.resume).resolve(), plotting_config, metadata_holder, args.log_level)
+        return
+
+    if args.benchmark is None:
+        raise RuntimeError("Missing --benchmark, it is required unless --resume is given")
+
     timestamp_for_suite: str = datetime.now().strftime("%Y-%m-%d_%H:%M:%S")
 
     benchmark_path = Path(args.benchmark).resolve()
@@ -288,64 +440,186 @@ def run_benchmark_suite_args(args: argparse.Namespace, metadata_holder: Benchmar
         else:
             config_paths.append(config_path)
 
-    for config_path in config_paths:
-        with open(config_path) as f:
-            config_yaml = f.read()
+    configs = [
+        (config_path.stem, _prepare_config(args, config_path, timestamp_for_suite, benchmark_yaml))
+        for config_path in config_paths
+    ]
 
-        config = safe_load(config_yaml)
+    if args.parallel_configs:
+        _run_configs_in_parallel(configs, plotting_config, metadata_holder, benchmark_yaml, args.log_level)
+    else:
+        for _, config in configs:
+            _run_suite_for_config(plotting_config, metadata_holder, benchmark_yaml, config, args.log_level)
 
-        match get_config_version(config):
-            case 1:
-                if "legacy_cores_per_worker" not in args:
-                    raise RuntimeError("Missing legacy_cores_per_worker value")
 
-                logger.warning(
-                    f"Automatically calculating async worker cpused based on cores_per_worker value {args.legacy_cores_per_worker}"
-                )
+def _prepare_config(args: argparse.Namespace, config_path: Path, timestamp_for_suite: str, benchmark_yaml: str) -> dict:
+    """Load and upgrade a config, and prepare its timestamped output directory."""
+    with open(config_path) as f:
+        config_yaml = f.read()
 
-                config = upgrade_version1_to_version2(
-                    config, make_proportional_splitter(int(args.legacy_cores_per_worker))
-                )
-            case 2:
-                pass
-            case other:
-                raise ValueError(f"Unknown config version: {other}")
+    config = safe_load(config_yaml)
 
-        output_dir = Path(config["output_dir"]).resolve()
+    match get_config_version(config):
+        case 1:
+            if "legacy_cores_per_worker" not in args:
+                raise RuntimeError("Missing legacy_cores_per_worker value")
 
-        timestamped_output_dir: Path = output_dir / timestamp_for_suite / config_path.stem
-        timestamped_output_dir.mkdir(exist_ok=True, parents=True)
+            logger.warning(
+                f"Automatically calculating async worker cpused based on cores_per_worker value {args.legacy_cores_per_worker}"
+            )
 
-        with open(timestamped_output_dir / "suite.yaml", "w") as f:
-            print(benchmark_yaml, end="", file=f)
+            config = upgrade_version1_to_version2(config, make_proportional_splitter(int(args.legacy_cores_per_worker)))
+        case 2:
+            pass
+        case other:
+            raise ValueError(f"Unknown config version: {other}")
 
-        with open(timestamped_output_dir / f"config_{config_path.name}", "w") as f:
-            print(safe_dump(config), end="", file=f)
+    output_dir = Path(config["output_dir"]).resolve()
 
-        config["output_dir"] = timestamped_output_dir
+    timestamped_output_dir: Path = output_dir / timestamp_for_suite / config_path.stem
+    timestamped_output_dir.mkdir(exist_ok=True, parents=True)
 
-        dump_environment(timestamped_output_dir, Path(config["io"]["tester_path"]).expanduser().resolve().parent)
+    with open(timestamped_output_dir / "suite.yaml", "w") as f:
+        print(benchmark_yaml, end="", file=f)
 
-        if "backends" not in config:
-            config["backends"] = ["asymmetric_io_uring", "io_uring"]
-            logger.warning(f"backends selecton not detected, assuming {config['backends']}")
+    with open(timestamped_output_dir / f"config_{config_path.name}", "w") as f:
+        print(safe_dump(config), end="", file=f)
 
-        plotting_config = BenchmarkSuiteRunner.PlottingConfig(
-            generate_graphs=args.generate_graphs,
-            generate_summary_graph=args.generate_summary_graphs,
-            generate_pdf=args.pdf,
-        )
-        runner = BenchmarkSuiteRunner(
-            plotting_config, PlotGenerator(metadata_holder), safe_load(benchmark_yaml), config
-        )
+    config["output_dir"] = timestamped_output_dir
+
+    dump_environment(timestamped_output_dir, Path(config["io"]["tester_path"]).expanduser().resolve().parent)
+
+    _set_default_backends(config)
+
+    return config
+
+
+def _resume_suite(
+    resume_dir: Path,
+    plotting_config: BenchmarkSuiteRunner.PlottingConfig,
+    metadata_holder: BenchmarkMetadataHolder,
+    log_level: str,
+) -> None:
+    """Resume a suite from its timestamped output directory.
+
+    The suite and config are read from the copies saved in the directory, and runs already recorded
+    in the journal are not repeated.
+    """
+    logger.info(f"Resuming suite from {resume_dir}")
+
+    with open(resume_dir / "suite.yaml") as f:
+        benchmark_yaml = f.read()
+
+    config_files = list(resume_dir.glob("config_*.yaml"))
+    if len(config_files) != 1:
+        raise RuntimeError(f"Expected exactly one config_*.yaml file in {resume_dir}, found {len(config_files)}")
+
+    with open(config_files[0]) as f:
+        config = safe_load(f.read())
+
+    config["output_dir"] = resume_dir
+    _set_default_backends(config)
+
+    _run_suite_for_config(plotting_config, metadata_holder, benchmark_yaml, config, log_level)
+
+
+def _set_default_backends(config: dict) -> None:
+    if "backends" not in config:
+        config["backends"] = ["asymmetric_io_uring", "io_uring"]
+        logger.warning(f"backends selecton not detected, assuming {config['backends']}")
+
+
+def _run_suite_for_config(
+    plotting_config: BenchmarkSuiteRunner.PlottingConfig,
+    metadata_holder: BenchmarkMetadataHolder,
+    benchmark_yaml: str,
+    config: dict,
+    log_level: str,
+) -> None:
+    # Worker processes don't necessarily inherit the logger configuration of the parent
+    set_level(log_level)
+
+    plot_generator = PlotGenerator(
+        metadata_holder, render_jobs=plotting_config.render_jobs, render_engine=plotting_config.render_engine
+    )
+    runner = BenchmarkSuiteRunner(plotting_config, plot_generator, safe_load(benchmark_yaml), config)
+    runner.run()
 
-        runner.run()
+
+def _run_configs_in_parallel(
+    configs: list[tuple[str, dict]],
+    plotting_config: BenchmarkSuiteRunner.PlottingConfig,
+    metadata_holder: BenchmarkMetadataHolder,
+    benchmark_yaml: str,
+    log_level: str,
+) -> None:
+    """Run configs in batches, where all configs of a batch run concurrently in separate processes.
+
+    Configs are put into the same batch only if they don't share any CPU, storage directory or listen address,
+    see `config_scheduling.config_resources`.
+    """
+    benchmark_types = {benchmark["type"] for benchmark in safe_load(benchmark_yaml)}
+    resources = [config_resources(config, benchmark_types) for _, config in configs]
+
+    for batch in schedule_batches(resources):
+        names = [configs[index][0] for index in batch]
+        logger.info(f"Running configs {names} concurrently")
+        # Rendering of every config must stay off the testers of all configs of the batch
+        tester_cpus = set().union(*(local_cpus(resources[index]) for index in batch))
+        batch_plotting_config = replace(plotting_config, render_cpus=os.sched_getaffinity(0) - tester_cpus)
+
+        processes: list[multiprocessing.Process] = []
+        try:
+            for index in batch:
+                name, config = configs[index]
+                process = multiprocessing.Process(
+                    target=_run_suite_for_config,
+                    args=(batch_plotting_config, metadata_holder, benchmark_yaml, config, log_level),
+                    name=name,
+                )
+                process.start()
+                processes.append(process)
+
+            for process in processes:
+                process.join()
+        except BaseException:
+            for process in processes:
+                process.terminate()
+                process.join()
+            raise
+
+        failed = [process.name for process in processes if process.exitcode != 0]
+        if failed:
+            raise RuntimeError(f"Configs {failed} failed")
+
+
+class _NotWithResumeAction(argparse.Action):
+    """Stores the value of --benchmark or --resume, rejecting the other one if it was given too.
+
+    A resumed run uses the suite saved in its directory, so --benchmark would be silently ignored.
+    """
+
+    def __call__(
+        self,
+        parser: argparse.ArgumentParser,
+        namespace: argparse.Namespace,
+        values: Any,
+        option_string: str | None = None,
+    ) -> None:
+        other = "resume" if self.dest == "benchmark" else "benchmark"
+        if getattr(namespace, other, None) is not None:
+            parser.error("argument --benchmark: not allowed with argument --resume, the resumed run has its suite")
+        setattr(namespace, self.dest, values)
 
 
 def configure_run_benchmark_suite_parser(parser: argparse.ArgumentParser) -> None:
-    parser.add_argument("--benchmark", help="path to .yaml file with the benchmark suite", required=True)
-    parser.add_argument(
-        "--config", help="path to .yaml file with configuration for the test suite", required=True, nargs="+"
+    parser.add_argument("--benchmark", help="path to .yaml file with the benchmark suite", action=_NotWithResumeAction)
+    configs_group = parser.add_mutually_exclusive_group(required=True)
+    configs_group.add_argument("--config", help="path to .yaml file with configuration for the test suite", nargs="+")
+    configs_group.add_argument(
+        "--resume",
+        help="timestamped output directory of an interrupted suite run (for one config) to resume",
+        action=_NotWithResumeAction,
     )
     parser.add_argument("--generate-graphs", help="generate graphs for each run metric", action="store_true")
     parser.add_argument(
@@ -355,4 +629,27 @@ def configure_run_benchmark_suite_parser(parser: argparse.ArgumentParser) -> Non
         "--generate-summary-graphs", help="generate summary graphs for each benchmark", action="store_true"
     )
     parser.add_argument("--pdf", help="generate per-benchmark summary PDFs and a merged suite PDF", action="store_true")
+    parser.add_argument(
+        "--pdf-grid",
+        help="charts per page of the summary PDFs as ROWSxCOLUMNS, e.g. 2x3",
+        type=parse_pdf_grid,
+        default="1x1",
+    )
+    parser.add_argument(
+        "--render-jobs",
+        help="number of processes rendering the graphs of a benchmark in parallel",
+        type=int,
+        default=1,
+    )
+    parser.add_argument(
+        "--render-engine",
+        help="how graphs are rendered, agg draws them with matplotlib without a browser",
+        choices=RENDER_ENGINES,
+        default=DEFAULT_RENDER_ENGINE,
+    )
+    parser.add_argument(
+        "--parallel-configs",
+        help="run configs that don't share CPUs, storage directories or listen addresses concurrently",
+        action="store_true",
+    )
     parser.set_defaults(func=run_benchmark_suite_args)
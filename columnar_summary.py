@@ -0,0 +1,182 @@
+"""Columnar binary copy of a benchmark summary, which is much faster to load than the YAML file.
+
+Every sample of every metric is a row of the following columns:
+    metric: index into the `metric_paths` table (paths are stored JSON encoded)
+    backend: index into the `backends` table
+    run_id
+    shard: -1 for shardless metrics
+    value, is_int: the value, restored as an int if it was one
+
+The rows of each (metric, backend) pair are contiguous, in the order of the samples.
+The summary stats are stored as rows of metric, backend, shard (-1 for shardless metrics)
+and one column per statistic.
+"""
+
+import json
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+
+from benchmark import Benchmark, BenchmarkInfo
+from log import get_logger
+from stats import NO_SHARD, MetricSamples, SamplesTree, Stats
+from tree import TreeDict
+
+COLUMNAR_SUMMARY_FILENAME = "metrics_summary.npz"
+
+_FORMAT_VERSION = 2
+# Keys of the dicts returned by `stats.compute_stats`, in order
+_STAT_KEYS = ["min", "max", "mean", "median", "range", "stdev", "variance"]
+
+logger = get_logger()
+
+
+class UnsupportedSummaryError(ValueError):
+    """The summary can't be stored in the columnar format, e.g. it has non-numeric values."""
+
+
+class _ColumnsBuilder:
+    def __init__(self) -> None:
+        self.metric_indices: dict[tuple[str, ...], int] = {}
+        self.backend_indices: dict[str, int] = {}
+        self.columns: dict[str, list[np.ndarray]] = {
+            name: [] for name in ["metric", "backend", "run_id", "shard", "value", "is_int"]
+        }
+        self.stats_keys: list[tuple[int, int, int]] = []
+        self.stats_values: list[list[float]] = []
+
+    def add_samples(self, metric_path: tuple[str, ...], backend: str, samples: MetricSamples) -> None:
+        if samples.other_values:
+            value = next(iter(samples.other_values.values()))
+            raise UnsupportedSummaryError(f"Non-numeric value {value!r} of metric {metric_path}")
+
+        size = len(samples)
+        self.columns["metric"].append(np.full(size, self._metric_index(metric_path), dtype=np.int32))
+        self.columns["backend"].append(np.full(size, self._backend_index(backend), dtype=np.int32))
+        self.columns["run_id"].append(np.frombuffer(samples.run_ids, dtype=np.int32))
+        self.columns["shard"].append(np.frombuffer(samples.shards, dtype=np.int32))
+        self.columns["value"].append(np.frombuffer(samples.values, dtype=np.float64))
+        self.columns["is_int"].append(np.frombuffer(samples.is_int, dtype=np.int8).astype(np.bool_))
+
+    def add_stats(self, metric_path: tuple[str, ...], backend: str, shard: int, stats: dict[str, Any] | None) -> None:
+        if stats is None or list(stats) != _STAT_KEYS:
+            raise UnsupportedSummaryError(f"Unexpected stats {stats!r} of metric {metric_path}")
+
+        self.stats_keys.append((self._metric_index(metric_path), self._backend_index(backend), shard))
+        self.stats_values.append([stats[key] for key in _STAT_KEYS])
+
+    def arrays(self) -> dict[str, np.ndarray]:
+        dtypes = {
+            "metric": np.int32,
+            "backend": np.int32,
+            "run_id": np.int32,
+            "shard": np.int32,
+            "value": np.float64,
+            "is_int": np.bool_,
+        }
+        return {
+            "metric_paths": np.array([json.dumps(list(path)) for path in self.metric_indices], dtype=str),
+            "backends": np.array(list(self.backend_indices), dtype=str),
+            **{
+                name: np.concatenate(self.columns[name]) if self.columns[name] else np.empty(0, dtype=dtype)
+                for name, dtype in dtypes.items()
+            },
+            "stats_keys": np.array(self.stats_keys, dtype=np.int32).reshape(-1, 3),
+            "stats_values": np.array(self.stats_values, dtype=np.float64).reshape(-1, len(_STAT_KEYS)),
+        }
+
+    def _metric_index(self, metric_path: tuple[str, ...]) -> int:
+        return self.metric_indices.setdefault(metric_path, len(self.metric_indices))
+
+    def _backend_index(self, backend: str) -> int:
+        return self.backend_indices.setdefault(backend, len(self.backend_indices))
+
+
+def write_columnar_summary(summary: Benchmark, path: Path) -> None:
+    builder = _ColumnsBuilder()
+    for samples_tree in summary.get_samples():
+        for metric_path, backends in samples_tree.items():
+            for backend, samples in backends.items():
+                builder.add_samples(metric_path, backend, samples)
+    _add_stats(builder, summary)
+
+    info = summary.get_info()
+    with open(path, "wb") as f:
+        np.savez(
+            f,
+            format_version=np.array(_FORMAT_VERSION),
+            info=np.array(json.dumps({"id": info.id, "type": info.type, "properties": info.properties})),
+            run_count=np.array(summary.get_run_count()),
+            **builder.arrays(),
+        )
+
+
+def _add_stats(builder: _ColumnsBuilder, summary: Benchmark) -> None:
+    for metric_path, backends in summary.get_stats().get_sharded_metrics().items():
+        for backend, shards in backends.items():
+            for shard, stats in shards.items():
+                builder.add_stats(metric_path, backend, shard, stats)
+    for metric_path, backends in summary.get_stats().get_shardless_metrics().items():
+        for backend, stats in backends.items():
+            builder.add_stats(metric_path, backend, NO_SHARD, stats)
+
+
+def load_columnar_summary(path: Path) -> Benchmark:
+    with np.load(path, allow_pickle=False) as data:
+        if int(data["format_version"]) != _FORMAT_VERSION:
+            raise UnsupportedSummaryError(f"Unsupported columnar summary version {int(data['format_version'])}")
+
+        info = json.loads(str(data["info"]))
+        metric_paths = [tuple(json.loads(metric_path)) for metric_path in data["metric_paths"].tolist()]
+        backends = data["backends"].tolist()
+        (sharded, shardless) = _load_samples(data, metric_paths, backends)
+
+        sharded_stats: TreeDict[dict[str, dict[int, Any]]] = TreeDict()
+        shardless_stats: TreeDict[dict[str, Any]] = TreeDict()
+        for (metric, backend, shard), values in zip(
+            data["stats_keys"].tolist(), data["stats_values"].tolist(), strict=True
+        ):
+            stats = dict(zip(_STAT_KEYS, values, strict=True))
+            if shard != NO_SHARD:
+                sharded_stats.setdefault(metric_paths[metric], {}).setdefault(backends[backend], {})[shard] = stats
+            else:
+                shardless_stats.setdefault(metric_paths[metric], {})[backends[backend]] = stats
+
+        run_count = int(data["run_count"])
+
+    benchmark_info = BenchmarkInfo(id=info["id"], type=info["type"], properties=info["properties"])
+    return Benchmark(sharded, shardless, benchmark_info, Stats(sharded_stats, shardless_stats), run_count)
+
+
+def _load_samples(
+    data: Any, metric_paths: list[tuple[str, ...]], backends: list[str]
+) -> tuple[SamplesTree, SamplesTree]:
+    metric = data["metric"]
+    backend = data["backend"]
+    shard = data["shard"]
+    is_sharded = shard != NO_SHARD
+
+    # Split the rows into the contiguous runs of each (metric, backend, sharded) triple
+    changes = (metric[1:] != metric[:-1]) | (backend[1:] != backend[:-1]) | (is_sharded[1:] != is_sharded[:-1])
+    starts = [0, *(np.flatnonzero(changes) + 1).tolist()] if len(metric) else []
+    ends = [*starts[1:], len(metric)]
+
+    run_id = data["run_id"].astype(np.int32)
+    shard = shard.astype(np.int32)
+    value = data["value"].astype(np.float64)
+    is_int = data["is_int"].astype(np.int8)
+
+    sharded: SamplesTree = TreeDict()
+    shardless: SamplesTree = TreeDict()
+    for start, end in zip(starts, ends, strict=True):
+        samples = MetricSamples()
+        samples.run_ids.frombytes(run_id[start:end].tobytes())
+        samples.shards.frombytes(shard[start:end].tobytes())
+        samples.values.frombytes(value[start:end].tobytes())
+        samples.is_int.frombytes(is_int[start:end].tobytes())
+
+        samples_tree = sharded if is_sharded[start] else shardless
+        samples_tree.setdefault(metric_paths[int(metric[start])], {})[backends[int(backend[start])]] = samples
+
+    return (sharded, shardless)
@@ -0,0 +1,111 @@
+"""Schedules suite configs so that configs sharing no resources can run at the same time."""
+
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+from config_versioning import parse_cpuset
+from run_rpc import DEFAULT_PORT
+
+LOCAL_HOST = "localhost"
+
+type Resource = tuple[Any, ...]
+
+_IO_CPUSET_KEYS = ["asymmetric_app_cpuset", "asymmetric_async_worker_cpuset", "symmetric_cpuset"]
+_RPC_SERVER_CPUSET_KEYS = [
+    "asymmetric_server_app_cpuset",
+    "asymmetric_server_async_worker_cpuset",
+    "symmetric_server_cpuset",
+]
+_RPC_CLIENT_CPUSET_KEYS = [
+    "asymmetric_client_app_cpuset",
+    "asymmetric_client_async_worker_cpuset",
+    "symmetric_client_cpuset",
+]
+_SCYLLA_CPUSET_KEYS = ["asymmetric_app_cpuset", "asymmetric_async_worker_cpuset", "symmetric_cpuset"]
+
+
+def config_resources(config: dict, benchmark_types: Iterable[str]) -> set[Resource]:
+    """Collect the resources a config occupies while running benchmarks of the given types.
+
+    Resources are tuples, so that two configs conflict exactly when their resource sets intersect:
+        - ("cpu", host, cpu) for every CPU of every cpuset used by the tester,
+        - ("storage_dir", host, path) for the io tester storage directory,
+        - ("listen", host, address, port) for the rpc server listen socket.
+
+    Only the sections used by the given benchmark types are taken into account.
+    """
+    resources: set[Resource] = set()
+
+    for benchmark_type in set(benchmark_types):
+        match benchmark_type:
+            case "io":
+                io_config = config.get("io") or {}
+                host = io_config.get("remote") or LOCAL_HOST
+                _add_cpus(resources, host, io_config, _IO_CPUSET_KEYS)
+                if io_config.get("storage_dir") is not None:
+                    resources.add(("storage_dir", host, str(Path(io_config["storage_dir"]).resolve())))
+            case "rpc":
+                rpc_config = config.get("rpc") or {}
+                server_host = rpc_config.get("server_remote") or LOCAL_HOST
+                client_host = rpc_config.get("client_remote") or LOCAL_HOST
+                _add_cpus(resources, server_host, rpc_config, _RPC_SERVER_CPUSET_KEYS)
+                _add_cpus(resources, client_host, rpc_config, _RPC_CLIENT_CPUSET_KEYS)
+                listen_address = rpc_config.get("remote_listen_address", rpc_config.get("ip_address"))
+                listen_port = rpc_config.get("remote_listen_port", DEFAULT_PORT)
+                resources.add(("listen", server_host, listen_address, str(listen_port)))
+            case "simple-query":
+                _add_cpus(resources, LOCAL_HOST, config.get("scylla") or {}, _SCYLLA_CPUSET_KEYS)
+            case other:
+                raise ValueError(f"Unknown benchmark type {other}")
+
+    return resources
+
+
+def local_cpus(resources: Iterable[Resource]) -> set[int]:
+    """Return the CPUs of the local host that appear in the given resources."""
+    return {resource[2] for resource in resources if resource[0] == "cpu" and resource[1] == LOCAL_HOST}
+
+
+def build_conflict_graph(resources: list[set[Resource]]) -> list[set[int]]:
+    """Build the conflict graph of configs as adjacency sets.
+
+    Node i is the config with resources[i]; there is an edge between two configs if they share any resource.
+    """
+    graph: list[set[int]] = [set() for _ in resources]
+    for i, first in enumerate(resources):
+        for j in range(i + 1, len(resources)):
+            if not first.isdisjoint(resources[j]):
+                graph[i].add(j)
+                graph[j].add(i)
+    return graph
+
+
+def schedule_batches(resources: list[set[Resource]]) -> list[list[int]]:
+    """Split configs into batches of pairwise non-conflicting configs.
+
+    Configs are assigned greedily, in order, to the first batch that has no conflicting config,
+    so the batches (and the configs inside them) keep the order in which the configs were given.
+
+    Returns:
+        A list of batches, each being a list of indices into `resources`.
+    """
+    graph = build_conflict_graph(resources)
+    batches: list[list[int]] = []
+    for node in range(len(resources)):
+        for batch in batches:
+            if graph[node].isdisjoint(batch):
+                batch.append(node)
+                break
+        else:
+            batches.append([node])
+    return batches
+
+
+def _add_cpus(resources: set[Resource], host: str, section: dict, keys: list[str]) -> None:
+    for key in keys:
+        cpuset = section.get(key)
+        if cpuset is None:
+            continue
+        for cpu in parse_cpuset(str(cpuset)):
+            resources.add(("cpu", host, cpu))
@@ -0,0 +1,70 @@
+"""YAML loading and dumping backed by libyaml when it is available.
+
+Drop-in replacements for `yaml.safe_load` and `yaml.safe_dump` that reject duplicate keys
+and understand the yamlable tags, falling back to the pure Python implementation without libyaml.
+"""
+
+from typing import Any
+
+import yaml
+from yamlable import YamlAble
+from yamlable.main import YAMLABLE_PREFIX, decode_yamlable, encode_yamlable, read_yaml_node_as_yamlobject
+
+HAS_LIBYAML = yaml.__with_libyaml__
+
+_BaseLoader = yaml.CSafeLoader if HAS_LIBYAML else yaml.SafeLoader
+_BaseDumper = yaml.CSafeDumper if HAS_LIBYAML else yaml.SafeDumper
+
+# Tag suffix -> YamlAble subclass; yamlable itself scans all the subclasses for every tagged node
+_yamlable_classes: dict[str, type[YamlAble]] = {}
+
+
+class FastLoader(_BaseLoader):
+    def construct_mapping(self, node: yaml.nodes.MappingNode, deep: bool = False) -> dict:
+        seen = set()
+        mapping = []
+        for key_node, value_node in node.value:
+            key = self.construct_object(key_node, deep=deep)
+            if key in seen:
+                raise ValueError(f"Duplicate key '{key}' at {key_node.start_mark}")
+            seen.add(key)
+            mapping.append((key, self.construct_object(value_node, deep=deep)))
+        return dict(mapping)
+
+
+class FastDumper(_BaseDumper):
+    pass
+
+
+def safe_load(stream: str | bytes | Any) -> Any:
+    return yaml.load(stream, Loader=FastLoader)
+
+
+def safe_dump(data: Any, stream: Any = None, **kwargs: Any) -> Any:
+    return yaml.dump(data, stream, Dumper=FastDumper, **kwargs)
+
+
+def _decode_yamlable(loader: FastLoader, yaml_tag: str, node: yaml.nodes.Node) -> YamlAble:
+    cls = _yamlable_classes.get(yaml_tag)
+    if cls is None:
+        cls = _find_yamlable_class(yaml_tag)
+        if cls is None:
+            # Let yamlable report the error
+            return decode_yamlable(loader, yaml_tag, node)
+        _yamlable_classes[yaml_tag] = cls
+
+    return read_yaml_node_as_yamlobject(cls=cls, loader=loader, node=node, yaml_tag=yaml_tag)
+
+
+def _find_yamlable_class(yaml_tag: str) -> type[YamlAble] | None:
+    pending = [YamlAble]
+    while pending:
+        cls = pending.pop()
+        if cls is not YamlAble and cls.is_yaml_tag_supported(yaml_tag):
+            return cls
+        pending.extend(cls.__subclasses__())
+    return None
+
+
+FastLoader.add_multi_constructor(YAMLABLE_PREFIX, _decode_yamlable)
+FastDumper.add_multi_representer(YamlAble, encode_yamlable)
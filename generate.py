@@ -1,62 +1,89 @@
 """Generates plots for sharded and shardless metrics."""
 
+import json
+import os
 import pathlib
+import time
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum
 from glob import escape
 from typing import Any
 
-import pandas as pd
-import plotly.express as px
+import numpy as np
+import plotly.graph_objects as go
 import plotly.io as pio
 from plotly.graph_objs import Figure
 
-from benchmark import PerBenchmarkShardedResults, PerBenchmarkShardlessResults, Results
 from log import get_logger
 from metadata import BACKEND_COLORS, BACKENDS_NAMES, BenchmarkMetadataHolder, BenchmarkType, MetricPlotMetadata
+from render_cache import RenderCache
+from renderer import DEFAULT_RENDER_ENGINE, RENDER_ENGINES, get_renderer
 from stats import Stats
+from tree import TreeDict
 
 logger = get_logger()
 
 
+# Number of figures built and rendered at once by `PlotGenerator.plot`
+_RENDER_BATCH_SIZE = 128
+
+
 class PlotGenerator:
     """Generates plots for sharded and shardless metrics."""
 
-    def __init__(self, metadata_holder: BenchmarkMetadataHolder) -> None:
+    def __init__(
+        self,
+        metadata_holder: BenchmarkMetadataHolder,
+        render_jobs: int = 1,
+        render_cache: RenderCache | None = None,
+        render_engine: str = DEFAULT_RENDER_ENGINE,
+    ) -> None:
         self.metadata_holder = metadata_holder
-        self.figs: list[Figure] = []
-        self.file_paths: list[pathlib.Path] = []
+        self.render_jobs = render_jobs
+        self.render_engine = render_engine
+        # Figures that are up to date according to the cache are not rendered again
+        self.render_cache = render_cache
+        # The scheduled figures are only built when they are rendered
+        self.specs: list[FigureSpec] = []
+        # Render worker processes, started on the first parallel `plot` and reused by the next ones
+        self._render_pool: ProcessPoolExecutor | None = None
+        if render_jobs < 1:
+            raise ValueError(f"Invalid number of render jobs: {render_jobs}")
+        if render_engine not in RENDER_ENGINES:
+            raise ValueError(f"Unknown render engine: {render_engine}")
 
     def schedule_graphs_for_run(
         self,
         name: str,
-        results: Results,
+        sharded_metrics: TreeDict[dict[str, dict[int, Any]]],
+        shardless_metrics: TreeDict[dict[str, Any]],
         build_dir: pathlib.Path,
         type: BenchmarkType | None = None,
     ) -> None:
-        """Schedule generating per run"""
-        benchmark_metadata = self.metadata_holder.get_metadata_or_default(type)
+        """Schedule generating per run
 
-        for metric_name, metric_by_backend in results.sharded_metrics.items():
-            plot_metric_data = benchmark_metadata.get_sharded_metric_metadata_or_default(metric_name).plotting
+        The metrics of the run are metric -> backend -> { shard: value } for sharded metrics,
+        and metric -> backend -> value for shardless metrics.
+        """
+        for metric_name, metric_by_backend in sharded_metrics.items():
+            plot_metric_data = self.metadata_holder.get_sharded_metric_metadata_or_default(type, metric_name).plotting
             (metric_file_path, plot) = plot_sharded_metric(
                 name, metric_name, plot_metric_data, metric_by_backend, build_dir
             )
-            self.figs.append(plot)
-            self.file_paths.append(metric_file_path)
+            self.specs.append(FigureSpec(plot, [metric_file_path]))
 
             (total_file_path, total_plot) = plot_total_metric(
                 name, metric_name, plot_metric_data, metric_by_backend, build_dir
             )
-            self.figs.append(total_plot)
-            self.file_paths.append(total_file_path)
+            self.specs.append(FigureSpec(total_plot, [total_file_path]))
 
-        for metric_name, shardless_metric_by_backend in results.shardless_metrics.items():
-            plot_metric_data = benchmark_metadata.get_shardless_metric_metadata_or_default(metric_name).plotting
+        for metric_name, shardless_metric_by_backend in shardless_metrics.items():
+            plot_metric_data = self.metadata_holder.get_shardless_metric_metadata_or_default(type, metric_name).plotting
             (metric_file_path, plot) = plot_shardless_metric(
                 name, metric_name, plot_metric_data, shardless_metric_by_backend, build_dir
             )
-            self.figs.append(plot)
-            self.file_paths.append(metric_file_path)
+            self.specs.append(FigureSpec(plot, [metric_file_path]))
 
     def schedule_graphs_for_summary(
         self,
@@ -64,77 +91,172 @@ class PlotGenerator:
         stats: Stats,
         build_dir: pathlib.Path,
         type: BenchmarkType | None = None,
-        image_format: str = "svg",
+        image_formats: Iterable[str] = ("svg",),
     ) -> None:
+        """Schedule generating the summary graphs, every graph is built once and written in all image_formats."""
         build_dir = pathlib.Path(build_dir)
         build_dir.mkdir(parents=True, exist_ok=True)
 
-        image_format = image_format.removeprefix(".").lower()
-        if image_format not in {"svg", "png", "jpg", "jpeg", "pdf"}:
-            raise ValueError(f"Unsupported image format: {image_format}")
+        image_formats = list(dict.fromkeys(image_format.removeprefix(".").lower() for image_format in image_formats))
+        for image_format in image_formats:
+            if image_format not in {"svg", "png", "jpg", "jpeg", "pdf"}:
+                raise ValueError(f"Unsupported image format: {image_format}")
 
         stat_to_plot = "mean"
         stat_as_error = "stdev"
 
         for metric, per_backend_sharded_metrics in stats.get_sharded_metrics().items():
             rows = summarize_sharded_metrics_by_backend(per_backend_sharded_metrics, stat_to_plot, stat_as_error)
-            df_long = pd.DataFrame(rows)
 
-            plot_metric_data = (
-                self.metadata_holder.get_metadata_or_default(type)
-                .get_sharded_metric_metadata_or_default(metric)
-                .plotting
-            )
-            file_path = build_dir / pathlib.Path(
-                f"{sanitize_filename(MetricPlotMetadata.make_file_name_for_plot(metric))}.{image_format}"
-            )
+            plot_metric_data = self.metadata_holder.get_sharded_metric_metadata_or_default(type, metric).plotting
+            file_name = sanitize_filename(MetricPlotMetadata.make_file_name_for_plot(metric))
 
-            fig = make_plot_with_error(
-                PlotDataWithError(
-                    type=PlotType.Sharded,
-                    display_name=f"{name} - {plot_metric_data.get_title()}",
-                    df=df_long,
-                    value_axis_label=plot_metric_data.get_value_axis_title(),
-                )
+            plot = PlotDataWithError(
+                type=PlotType.Sharded,
+                display_name=f"{name} - {plot_metric_data.get_title()}",
+                rows=rows,
+                value_axis_label=plot_metric_data.get_value_axis_title(),
+            )
+            self.specs.append(
+                FigureSpec(plot, [build_dir / f"{file_name}.{image_format}" for image_format in image_formats])
             )
-
-            self.figs.append(fig)
-            self.file_paths.append(file_path)
 
         for metric, per_backend_shardless_metrics in stats.get_shardless_metrics().items():
             rows = summarize_shardless_metrics_by_backend(per_backend_shardless_metrics, stat_to_plot, stat_as_error)
-            df = pd.DataFrame(rows)
 
-            plot_metric_data = (
-                self.metadata_holder.get_metadata_or_default(type)
-                .get_shardless_metric_metadata_or_default(metric)
-                .plotting
+            plot_metric_data = self.metadata_holder.get_shardless_metric_metadata_or_default(type, metric).plotting
+            file_name = sanitize_filename(MetricPlotMetadata.make_file_name_for_plot(metric))
+
+            plot = PlotDataWithError(
+                type=PlotType.Shardless,
+                display_name=f"{name} - {plot_metric_data.get_title()}",
+                rows=rows,
+                value_axis_label=plot_metric_data.get_value_axis_title(),
             )
-            file_path = build_dir / pathlib.Path(
-                f"{sanitize_filename(MetricPlotMetadata.make_file_name_for_plot(metric))}.{image_format}"
+            self.specs.append(
+                FigureSpec(plot, [build_dir / f"{file_name}.{image_format}" for image_format in image_formats])
             )
 
-            fig = make_plot_with_error(
-                PlotDataWithError(
-                    type=PlotType.Shardless,
-                    display_name=f"{name} - {plot_metric_data.get_title()}",
-                    df=df,
-                    value_axis_label=plot_metric_data.get_value_axis_title(),
-                )
+    def plot(self) -> None:
+        # Only a batch of figures is alive at a time
+        for start in range(0, len(self.specs), _RENDER_BATCH_SIZE):
+            self._plot_batch(self.specs[start : start + _RENDER_BATCH_SIZE])
+        self.specs = []
+
+    def _plot_batch(self, specs: list["FigureSpec"]) -> None:
+        figs = [spec.build() for spec in specs]
+        file_paths = [spec.file_paths for spec in specs]
+        use_render_pool = self.render_jobs > 1 and len(figs) > 1
+        fig_jsons = [fig.to_json() for fig in figs] if use_render_pool or self.render_cache is not None else []
+
+        if self.render_cache is not None:
+            (figs, file_paths, fig_jsons) = _skip_fresh_figures(
+                self.render_cache, self.render_engine, figs, file_paths, fig_jsons
             )
-            self.figs.append(fig)
-            self.file_paths.append(file_path)
 
-    def plot(self) -> None:
-        pio.write_images(fig=self.figs, file=self.file_paths)
-        self.figs = []
-        self.file_paths = []
+        failed = []
+        if use_render_pool and len(figs) > 1:
+            failed = self._plot_in_render_pool(fig_jsons, file_paths)
+        elif figs:
+            failed = _write_images([fig.to_dict() for fig in figs], file_paths, self.render_engine)
+
+        if self.render_cache is not None:
+            # A failed image is rendered again the next time
+            failed = {pathlib.Path(file_path) for file_path in failed}
+            for fig_json, paths in zip(fig_jsons, file_paths, strict=True):
+                for file_path in paths:
+                    if pathlib.Path(file_path) in failed:
+                        continue
+                    self.render_cache.record(
+                        file_path, RenderCache.figure_hash(fig_json, file_path, self.render_engine)
+                    )
+            self.render_cache.save()
+
+    def _plot_in_render_pool(self, fig_jsons: list[str], file_paths: list[list[pathlib.Path]]) -> list[str]:
+        """Split the figures between the render workers, which get them as JSON specs, returns the failed paths."""
+        if self._render_pool is None:
+            self._render_pool = ProcessPoolExecutor(max_workers=self.render_jobs)
+
+        specs = [
+            (fig_json, [str(file_path) for file_path in paths])
+            for fig_json, paths in zip(fig_jsons, file_paths, strict=True)
+        ]
+        jobs = min(self.render_jobs, len(specs))
+        # Every worker renders its part with its own renderer, e.g. a Kaleido session which stays open for the next batches
+        futures = [
+            self._render_pool.submit(_render_figure_specs, specs[job::jobs], self.render_engine) for job in range(jobs)
+        ]
+
+        start = time.perf_counter()
+        failed = []
+        for future in futures:
+            (pid, figures, seconds, worker_failed) = future.result()
+            logger.info(f"Render worker {pid} wrote {figures} figures in {seconds:.2f}s")
+            failed.extend(worker_failed)
+        logger.info(f"Wrote {len(specs)} figures with {jobs} render workers in {time.perf_counter() - start:.2f}s")
+        return failed
+
+    def close(self) -> None:
+        """Plot the pending figures and stop the render workers."""
+        if self.specs:
+            self.plot()
+        if self._render_pool is not None:
+            self._render_pool.shutdown()
+            self._render_pool = None
 
     def __del__(self) -> None:
         # If there are any pending plots, generate them
         # No need for giving possibility to skip it for now
-        if self.figs or self.file_paths:
-            self.plot()
+        self.close()
+
+
+def _skip_fresh_figures(
+    render_cache: RenderCache,
+    render_engine: str,
+    figs: list[Figure],
+    file_paths: list[list[pathlib.Path]],
+    fig_jsons: list[str],
+) -> tuple[list[Figure], list[list[pathlib.Path]], list[str]]:
+    """Drop the paths that are up to date according to the render cache, and the figures left without paths."""
+    (stale_figs, stale_paths, stale_jsons) = ([], [], [])
+    for fig, paths, fig_json in zip(figs, file_paths, fig_jsons, strict=True):
+        stale = [
+            path
+            for path in paths
+            if not render_cache.is_fresh(path, RenderCache.figure_hash(fig_json, path, render_engine))
+        ]
+        if stale:
+            stale_figs.append(fig)
+            stale_paths.append(stale)
+            stale_jsons.append(fig_json)
+
+    images = sum(map(len, file_paths))
+    stale_images = sum(map(len, stale_paths))
+    logger.info(f"Skipping {images - stale_images} up to date images, rendering {stale_images}")
+    return (stale_figs, stale_paths, stale_jsons)
+
+
+def _write_images(
+    fig_dicts: list[dict], file_paths: list[list[pathlib.Path]] | list[list[str]], render_engine: str
+) -> list[pathlib.Path] | list[str]:
+    """Write every figure to all of its paths with the renderer of the process for `render_engine`.
+
+    The figures are given as dicts, so that a figure written in several formats is only converted once.
+    Returns the paths that failed to render.
+    """
+    return get_renderer(render_engine).write_images(fig_dicts, file_paths)
+
+
+def _render_figure_specs(specs: list[tuple[str, list[str]]], render_engine: str) -> tuple[int, int, float, list[str]]:
+    """Write (figure JSON, file paths) pairs in a render worker.
+
+    Returns (pid, number of figures, seconds, failed paths).
+    """
+    start = time.perf_counter()
+    failed = _write_images(
+        [json.loads(fig_json) for fig_json, _ in specs], [file_paths for _, file_paths in specs], render_engine
+    )
+    return (os.getpid(), len(specs), time.perf_counter() - start, failed)
 
 
 def summarize_sharded_metrics_by_backend(
@@ -223,106 +345,185 @@ DF_VALUE_KEY = "Value"
 DF_BACKEND_KEY = "Backend"
 DF_ERROR_KEY = "Error"
 
+# Layout shared by all bar plots, figures only add their title, axes and width to it
+_BAR_LAYOUT = {
+    "legend": {"title": {"text": DF_BACKEND_KEY}, "tracegroupgap": 0},
+    "barmode": "group",
+    "bargap": 0.2,
+    "bargroupgap": 0.1,
+    "margin": {"autoexpand": True},
+}
+
 
 def make_plot(
     data: PlotData,
 ) -> Figure:
     size = len(next(iter(data.data.values())))
-    per_backend_data_with_shardnum = data.data.copy()
-    per_backend_data_with_shardnum[DF_SHARD_KEY] = list(range(0, size))
-
-    df = pd.DataFrame(per_backend_data_with_shardnum)
-    df_long = df.melt(
-        id_vars=DF_SHARD_KEY, value_vars=list(data.data.keys()), var_name=DF_BACKEND_KEY, value_name=DF_VALUE_KEY
-    )
-
-    labels = {
-        DF_SHARD_KEY: "Shard" if data.type == PlotType.Sharded else "",
-        DF_VALUE_KEY: data.value_axis_label,
-        DF_BACKEND_KEY: "Backend",
-    }
-    fig = px.bar(
-        df_long,
-        x=DF_SHARD_KEY,
-        y=DF_VALUE_KEY,
-        color=DF_BACKEND_KEY,
-        color_discrete_map=BACKEND_COLORS,
-        category_orders={DF_BACKEND_KEY: BACKENDS_NAMES},
-        labels=labels,
-        barmode="group",
-        title=data.display_name,
-    )
-
-    apply_bar_template(fig, data.type)
-    fig.update_traces(texttemplate="%{y}", textposition="outside")
+    shards = np.arange(size)
+    x_label = "Shard" if data.type == PlotType.Sharded else ""
+
+    values = _as_plot_arrays(data.data)
+    traces = [
+        _make_bar(
+            backend,
+            color,
+            shards,
+            values[backend],
+            f"{DF_BACKEND_KEY}={backend}<br>{x_label}=%{{x}}<br>{data.value_axis_label}=%{{y}}<extra></extra>",
+            texttemplate="%{y}",
+            textposition="outside",
+        )
+        for backend, color in _backend_colors(data.data.keys()).items()
+    ]
 
-    return fig
+    return _make_bar_figure(traces, data, x_label)
 
 
 class PlotDataWithError(PlotData):
     type: PlotType
     display_name: str
-    df: pd.DataFrame
+    rows: list[dict[str, Any]]
     value_axis_label: str
 
     def __init__(
         self,
         type: PlotType,
         display_name: str,
-        df: pd.DataFrame,
+        rows: list[dict[str, Any]],
         value_axis_label: str | None = None,
     ) -> None:
         self.type = type
         self.display_name = display_name
-        self.df = df
+        self.rows = rows
         self.value_axis_label = value_axis_label if value_axis_label is not None else "Value"
 
 
 def make_plot_with_error(
     data: PlotDataWithError,
 ) -> Figure:
-    labels = {
-        DF_SHARD_KEY: "Shard" if data.type == PlotType.Sharded else "",
-        DF_VALUE_KEY: data.value_axis_label,
-        DF_BACKEND_KEY: "Backend",
-    }
+    rows_by_backend: dict[str, list[dict[str, Any]]] = {}
+    for row in data.rows:
+        rows_by_backend.setdefault(row[DF_BACKEND_KEY], []).append(row)
+    values = _as_plot_arrays(
+        {backend: [row[DF_VALUE_KEY] for row in rows] for backend, rows in rows_by_backend.items()}
+    )
+    errors = _as_plot_arrays(
+        {backend: [row[DF_ERROR_KEY] for row in rows] for backend, rows in rows_by_backend.items()}
+    )
 
-    plot_kwargs = {
-        "y": DF_VALUE_KEY,
-        "error_y": DF_ERROR_KEY,
-        "barmode": "group",
-        "title": data.display_name,
-        "labels": labels,
-        "color": DF_BACKEND_KEY,
-        "color_discrete_map": BACKEND_COLORS,
-        "category_orders": {DF_BACKEND_KEY: BACKENDS_NAMES},
-    }
+    traces = []
+    for backend, color in _backend_colors(rows_by_backend.keys()).items():
+        if data.type == PlotType.Sharded:
+            x = np.asarray([row[DF_SHARD_KEY] for row in rows_by_backend[backend]])
+            hovertemplate = f"{DF_BACKEND_KEY}={backend}<br>Shard=%{{x}}<br>"
+        else:
+            # Every backend is a separate category of the axis
+            x = [backend] * len(rows_by_backend[backend])
+            hovertemplate = f"{DF_BACKEND_KEY}=%{{x}}<br>"
+        hovertemplate += f"{data.value_axis_label}=%{{y}}<extra></extra>"
+        traces.append(
+            _make_bar(
+                backend,
+                color,
+                x,
+                values[backend],
+                hovertemplate,
+                error_y={"array": errors[backend]},
+                textposition="auto",
+            )
+        )
+
+    shards = {row[DF_SHARD_KEY] for row in data.rows}
+    width = find_width_for_min_bar(len(shards), len(rows_by_backend))
     if data.type == PlotType.Sharded:
-        plot_kwargs["x"] = DF_SHARD_KEY
-    else:
-        plot_kwargs["x"] = DF_BACKEND_KEY
+        return _make_bar_figure(traces, data, "Shard", width=width)
+    return _make_bar_figure(
+        traces, data, DF_BACKEND_KEY, width=width, categories=list(dict.fromkeys([*BACKENDS_NAMES, *rows_by_backend]))
+    )
 
-    fig = px.bar(data.df, **plot_kwargs)
 
-    fig.update_layout(
-        width=find_width_for_min_bar(
-            len(data.df[DF_SHARD_KEY].unique()),
-            len(data.df[DF_BACKEND_KEY].unique()) if DF_BACKEND_KEY else 1,
-        )
-    )
-    apply_bar_template(fig, data.type)
+def _as_plot_arrays(per_backend: dict[str, list[Any]]) -> dict[str, np.ndarray]:
+    """Convert the values of all backends to arrays of a common type, like a column of a DataFrame."""
+    dtype = np.asarray([value for values in per_backend.values() for value in values]).dtype
+    if dtype.kind not in "biuf":
+        dtype = np.dtype(object)
+    return {backend: np.asarray(values, dtype=dtype) for backend, values in per_backend.items()}
 
-    return fig
 
+def _backend_colors(backends: Iterable[str]) -> dict[str, str]:
+    """Map the backends, in plotting order, to their colors.
 
-def apply_bar_template(fig: Figure, type: PlotType) -> None:
-    fig.update_layout(bargap=0.2, bargroupgap=0.1)
-    fig.update_layout(margin_autoexpand=True)
+    Known backends come first in the order of BACKENDS_NAMES, the other ones follow in the given order
+    and get colors of the template's colorway.
+    """
+    backends = list(dict.fromkeys(backends))
+    ordered = [backend for backend in BACKENDS_NAMES if backend in backends]
+    ordered += [backend for backend in backends if backend not in BACKENDS_NAMES]
+
+    colors = dict(BACKEND_COLORS)
+    for backend in ordered:
+        if backend not in colors:
+            colorway = pio.templates[pio.templates.default].layout.colorway
+            colors[backend] = colorway[len(colors) % len(colorway)]
+    return {backend: colors[backend] for backend in ordered}
+
+
+def _make_bar(backend: str, color: str, x: Any, y: np.ndarray, hovertemplate: str, **kwargs: Any) -> go.Bar:
+    return go.Bar(
+        x=x,
+        y=y,
+        name=backend,
+        legendgroup=backend,
+        offsetgroup=backend,
+        alignmentgroup="True",
+        marker={"color": color, "pattern": {"shape": ""}},
+        orientation="v",
+        showlegend=True,
+        hovertemplate=hovertemplate,
+        xaxis="x",
+        yaxis="y",
+        **kwargs,
+    )
 
-    if type == PlotType.Sharded:
-        fig.update_xaxes(tickmode="linear", dtick=1)
+
+def _make_bar_figure(
+    traces: list[go.Bar], data: PlotData, x_label: str, width: int | None = None, categories: list[str] | None = None
+) -> Figure:
+    xaxis: dict[str, Any] = {"anchor": "y", "domain": [0.0, 1.0], "title": {"text": x_label}}
+    if categories is not None:
+        xaxis |= {"categoryorder": "array", "categoryarray": categories}
+    if data.type == PlotType.Sharded:
+        xaxis |= {"tickmode": "linear", "dtick": 1}
     else:
-        fig.update_xaxes(showticklabels=False)
+        xaxis["showticklabels"] = False
+
+    layout = {
+        "xaxis": xaxis,
+        "yaxis": {"anchor": "x", "domain": [0.0, 1.0], "title": {"text": data.value_axis_label}},
+        "title": {"text": data.display_name},
+        **_BAR_LAYOUT,
+    }
+    if width is not None:
+        layout["width"] = width
+    return Figure(data=traces, layout=layout)
+
+
+class FigureSpec:
+    """A scheduled figure: the data it's built from and the paths it's written to, one per image format."""
+
+    __slots__ = ("data", "file_paths")
+
+    def __init__(self, data: PlotData, file_paths: list[pathlib.Path]) -> None:
+        self.data = data
+        self.file_paths = file_paths
+
+    def __repr__(self) -> str:
+        return f"FigureSpec(data={self.data}, file_paths={self.file_paths})"
+
+    def build(self) -> Figure:
+        if isinstance(self.data, PlotDataWithError):
+            return make_plot_with_error(self.data)
+        return make_plot(self.data)
 
 
 def find_width_for_min_bar(number_of_groups: int, number_of_bars_per_group: int) -> int:
@@ -338,16 +539,13 @@ def plot_sharded_metric(
     name: str,
     metric_path: tuple[str, ...],
     metric_plot: MetricPlotMetadata,
-    sharded_metric_by_backend: PerBenchmarkShardedResults,
+    sharded_metric_by_backend: dict[str, dict[int, Any]],
     build_dir: pathlib.Path,
-) -> tuple[pathlib.Path, Figure]:
+) -> tuple[pathlib.Path, PlotData]:
     file_basename = sanitize_filename(MetricPlotMetadata.make_file_name_for_plot(metric_path))
 
     # determine max shard index
-    max_shard = -1
-    for backend, result_by_shard in sharded_metric_by_backend.backends.items():
-        for measurement in result_by_shard.shards:
-            max_shard = max(max_shard, measurement.shard)
+    max_shard = max((shard for shards in sharded_metric_by_backend.values() for shard in shards), default=-1)
 
     if max_shard == -1:
         raise ValueError(f"No sharded data found for metric {metric_plot.get_title()}")
@@ -355,23 +553,21 @@ def plot_sharded_metric(
     num_shards = max_shard + 1
 
     per_backend = {}
-    for backend, result_by_shard in sharded_metric_by_backend.backends.items():
+    for backend, shards in sharded_metric_by_backend.items():
         values = [0] * num_shards
-        for measurement in result_by_shard.shards:
-            values[measurement.shard] = measurement.value
+        for shard, value in shards.items():
+            values[shard] = value
         per_backend[backend] = values
 
     file_path = build_dir / pathlib.Path(f"{file_basename}.svg")
     logger.debug(f"Plotting sharded {file_path}")
     return (
         file_path,
-        make_plot(
-            PlotData(
-                type=PlotType.Sharded,
-                display_name=f"{name} - {metric_plot.get_title()}",
-                data=per_backend,
-                value_axis_label=metric_plot.get_value_axis_title(),
-            )
+        PlotData(
+            type=PlotType.Sharded,
+            display_name=f"{name} - {metric_plot.get_title()}",
+            data=per_backend,
+            value_axis_label=metric_plot.get_value_axis_title(),
         ),
     )
 
@@ -380,26 +576,24 @@ def plot_shardless_metric(
     name: str,
     metric_path: tuple[str, ...],
     metric_plot: MetricPlotMetadata,
-    shardless_metric_by_backend: PerBenchmarkShardlessResults,
+    shardless_metric_by_backend: dict[str, Any],
     build_dir: pathlib.Path,
-) -> tuple[pathlib.Path, Figure]:
+) -> tuple[pathlib.Path, PlotData]:
     file_basename = sanitize_filename(MetricPlotMetadata.make_file_name_for_plot(metric_path))
 
     per_backend = {}
-    for backend, measurement in shardless_metric_by_backend.backends.items():
-        per_backend[backend] = [measurement.value]
+    for backend, value in shardless_metric_by_backend.items():
+        per_backend[backend] = [value]
 
     file_path = build_dir / pathlib.Path(f"{file_basename}.svg")
     logger.debug(f"Plotting shardless metric {file_path}")
     return (
         file_path,
-        make_plot(
-            PlotData(
-                type=PlotType.Shardless,
-                display_name=f"{name} - {metric_plot.get_title()}",
-                data=per_backend,
-                value_axis_label=metric_plot.get_value_axis_title(),
-            )
+        PlotData(
+            type=PlotType.Shardless,
+            display_name=f"{name} - {metric_plot.get_title()}",
+            data=per_backend,
+            value_axis_label=metric_plot.get_value_axis_title(),
         ),
     )
 
@@ -408,9 +602,9 @@ def plot_total_metric(
     name: str,
     metric_path: tuple[str, ...],
     metric_plot: MetricPlotMetadata,
-    sharded_metric_by_backend: PerBenchmarkShardedResults,
+    sharded_metric_by_backend: dict[str, dict[int, Any]],
     build_dir: pathlib.Path,
-) -> tuple[pathlib.Path, Figure]:
+) -> tuple[pathlib.Path, PlotData]:
     """Plot a sharded metric as total values per backend.
 
     Produces a single bar chart.
@@ -418,23 +612,18 @@ def plot_total_metric(
     file_basename = sanitize_filename(MetricPlotMetadata.make_file_name_for_plot(metric_path))
 
     per_backend = {}
-    for backend, result_by_shard in sharded_metric_by_backend.backends.items():
-        total = 0
-        for measurement in result_by_shard.shards:
-            total += measurement.value
-        per_backend[backend] = [total]
+    for backend, shards in sharded_metric_by_backend.items():
+        per_backend[backend] = [sum(shards.values())]
 
     file_path = build_dir / pathlib.Path(f"total_{file_basename}.svg")
     logger.debug(f"Plotting total metric {file_path}")
     return (
         file_path,
-        make_plot(
-            PlotData(
-                type=PlotType.Shardless,
-                display_name=f"{name} - {metric_plot.get_title()} - Total",
-                data=per_backend,
-                value_axis_label=metric_plot.get_value_axis_title(),
-            )
+        PlotData(
+            type=PlotType.Shardless,
+            display_name=f"{name} - {metric_plot.get_title()} - Total",
+            data=per_backend,
+            value_axis_label=metric_plot.get_value_axis_title(),
         ),
     )
 
@@ -0,0 +1,119 @@
+"""Decides how many iterations of a benchmark to run."""
+
+import math
+
+from stats import RunningStats, StatsAggregator
+
+STOP_REASON_FIXED = "fixed"
+STOP_REASON_CONVERGED = "converged"
+STOP_REASON_MAX_ITERATIONS = "max_iterations"
+
+_MIN_ITERATIONS_FOR_CI = 2
+
+# Two-sided 95% quantiles of Student's t-distribution, indexed by degrees of freedom
+_T_95 = [
+    12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+    2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+    2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042,
+]  # fmt: skip
+_Z_95 = 1.960
+
+
+class IterationPolicy:
+    """Iteration count of a benchmark, parsed from the `iterations` field of the suite.
+
+    The field is either a fixed number of iterations, or a mapping:
+        min: iterations always run
+        max: iterations never exceeded
+        target_rel_ci: stop once the 95% confidence interval half-width of every tracked metric
+            is at most this fraction of its mean
+        metrics: optional list of tracked metric names (metric path joined with "_"), all metrics by default
+    """
+
+    def __init__(
+        self,
+        min_iterations: int,
+        max_iterations: int,
+        target_rel_ci: float | None = None,
+        metrics: list[str] | None = None,
+    ) -> None:
+        if min_iterations < 1 or max_iterations < min_iterations:
+            raise ValueError(f"Invalid iteration bounds: min={min_iterations}, max={max_iterations}")
+        if target_rel_ci is not None and min_iterations < _MIN_ITERATIONS_FOR_CI:
+            raise ValueError(f"At least {_MIN_ITERATIONS_FOR_CI} iterations are needed to estimate the CI")
+
+        self.min_iterations = min_iterations
+        self.max_iterations = max_iterations
+        self.target_rel_ci = target_rel_ci
+        self.metrics = set(metrics) if metrics is not None else None
+
+    def __repr__(self) -> str:
+        return f"IterationPolicy(min_iterations={self.min_iterations}, max_iterations={self.max_iterations}, target_rel_ci={self.target_rel_ci}, metrics={self.metrics})"
+
+    @staticmethod
+    def from_config(iterations: int | dict | None) -> "IterationPolicy":
+        if iterations is None:
+            return IterationPolicy(1, 1)
+        if isinstance(iterations, int):
+            return IterationPolicy(iterations, iterations)
+
+        for field in ("min", "max", "target_rel_ci"):
+            if field not in iterations:
+                raise ValueError(f"Missing '{field}' in iterations: {iterations}")
+        return IterationPolicy(
+            min_iterations=int(iterations["min"]),
+            max_iterations=int(iterations["max"]),
+            target_rel_ci=float(iterations["target_rel_ci"]),
+            metrics=iterations.get("metrics"),
+        )
+
+    def is_fixed(self) -> bool:
+        return self.target_rel_ci is None
+
+    def stop_reason(self, runs: StatsAggregator) -> str | None:
+        """Return the reason to stop after the given runs, or None if another iteration should be run."""
+        iterations = runs.run_count
+        if self.is_fixed():
+            return STOP_REASON_FIXED if iterations >= self.max_iterations else None
+        if iterations > 0:
+            self._check_tracked_metrics(runs)
+        if iterations < self.min_iterations:
+            return None
+        if self.relative_ci(runs) <= self.target_rel_ci:
+            return STOP_REASON_CONVERGED
+        if iterations >= self.max_iterations:
+            return STOP_REASON_MAX_ITERATIONS
+        return None
+
+    def relative_ci(self, runs: StatsAggregator) -> float:
+        """The largest relative 95% CI half-width among the tracked metrics (per backend and shard)."""
+        worst = 0.0
+        for (metric_path, _, _), running in runs.running_stats.items():
+            if self._is_tracked(metric_path):
+                worst = max(worst, _relative_ci_half_width(running))
+        return worst
+
+    def _is_tracked(self, metric_path: tuple[str, ...]) -> bool:
+        return self.metrics is None or "_".join(metric_path) in self.metrics
+
+    def _check_tracked_metrics(self, runs: StatsAggregator) -> None:
+        """Fail on tracked metrics that the runs don't have, which would otherwise never hold back convergence."""
+        if self.metrics is None:
+            return
+        missing = self.metrics - {"_".join(metric_path) for (metric_path, _, _) in runs.running_stats}
+        if missing:
+            raise ValueError(f"Tracked metrics {sorted(missing)} not found in the results of the benchmark")
+
+
+def _relative_ci_half_width(running: RunningStats) -> float:
+    samples = running.count
+    if samples < _MIN_ITERATIONS_FOR_CI:
+        return 0.0
+
+    t = _T_95[samples - 2] if samples - 2 < len(_T_95) else _Z_95
+    half_width = t * running.stdev() / math.sqrt(samples)
+    if half_width == 0:
+        return 0.0
+    if running.mean == 0:
+        return math.inf
+    return half_width / abs(running.mean)
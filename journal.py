@@ -0,0 +1,79 @@
+"""Append-only journal of finished tester runs, used to resume interrupted benchmark suites."""
+
+import os
+from pathlib import Path
+from typing import Any
+
+from fast_yaml import safe_dump, safe_load
+from log import get_logger
+from tree import TreeDict
+
+JOURNAL_FILENAME = "journal.yaml"
+
+# Every entry is written as a separate YAML document terminated with the explicit document end marker,
+# so an entry cut short by a crash can be recognized and dropped.
+_DOCUMENT_END = "\n...\n"
+
+logger = get_logger()
+
+type DataPoints = tuple[TreeDict[Any], TreeDict[dict[int, Any]]]
+type JournalKey = tuple[str, int, str]
+
+
+class SuiteJournal:
+    """Records the parsed results of every (benchmark, iteration, backend) run of a suite.
+
+    Entries are appended to the journal file right after a tester run finishes,
+    so after a crash the suite can be resumed by skipping the runs that have an entry.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.entries: dict[JournalKey, DataPoints] = {}
+
+        if self.path.exists():
+            self._load()
+
+    def get(self, benchmark_name: str, iteration: int, backend: str) -> DataPoints | None:
+        """Return the recorded (shardless, sharded) data points for the run, or None if it hasn't completed."""
+        return self.entries.get((benchmark_name, iteration, backend))
+
+    def record(self, benchmark_name: str, iteration: int, backend: str, data_points: DataPoints) -> None:
+        """Append the (shardless, sharded) data points of a finished run to the journal."""
+        (shardless, sharded) = data_points
+        entry = {
+            "benchmark": benchmark_name,
+            "iteration": iteration,
+            "backend": backend,
+            "shardless": shardless,
+            "sharded": sharded,
+        }
+
+        with open(self.path, "a") as f:
+            f.write(safe_dump(entry, explicit_start=True, explicit_end=True))
+            f.flush()
+            os.fsync(f.fileno())
+
+        self.entries[(benchmark_name, iteration, backend)] = data_points
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _load(self) -> None:
+        content = self.path.read_bytes()
+        document_end = _DOCUMENT_END.encode()
+        last_end = content.rfind(document_end)
+        complete = last_end + len(document_end) if last_end >= 0 else 0
+
+        # Everything after the last document end marker is either empty or an unfinished entry, which is cut off,
+        # so that the next entry isn't appended to it
+        if content[complete:].strip():
+            logger.warning(f"Dropping incomplete last entry of journal {self.path}")
+            os.truncate(self.path, complete)
+
+        for document in content[:complete].decode().split(_DOCUMENT_END)[:-1]:
+            entry = safe_load(document)
+            key = (entry["benchmark"], int(entry["iteration"]), entry["backend"])
+            self.entries[key] = (entry["shardless"], entry["sharded"])
+
+        logger.info(f"Loaded {len(self.entries)} completed runs from journal {self.path}")
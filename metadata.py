@@ -1,8 +1,8 @@
-from typing import IO
+from typing import IO, Any
 
-from yaml import safe_load
 from yamlable import YamlAble, yaml_info
 
+from fast_yaml import safe_load
 from tree import TreeDict
 
 BACKENDS_NAMES = ["epoll", "linux-aio", "io_uring", "asymmetric_io_uring"]
@@ -77,6 +77,49 @@ class MetricMetadata(YamlAble):
         return MetricMetadata(MetricPlotMetadata.default(path))
 
 
+class _WildcardMatcher:
+    """Trie of the metric paths of a metadata tree, where a `*` key matches any key of a metric path.
+
+    Gives the same results as `TreeDict.get` with `_asterix_compare` and `_asterix_resolver`: at every level
+    the exact key wins over `*`, without backtracking if the rest of the path doesn't match.
+    """
+
+    __slots__ = ("children", "is_leaf", "value")
+
+    def __init__(self, node: Any) -> None:
+        self.is_leaf = not isinstance(node, dict)
+        self.value = node.value if self.is_leaf else None
+        self.children: dict[str, _WildcardMatcher] = (
+            {} if self.is_leaf else {key: _WildcardMatcher(child) for key, child in node.items()}
+        )
+
+    def match(self, path: tuple[str, ...]) -> Any:
+        node = self
+        for part in path:
+            if node.is_leaf:
+                return None
+
+            if part == "*":
+                # Every key matches, let the resolver pick one or report the ambiguity
+                candidates = list(node.children)
+                if not candidates:
+                    return None
+                key = candidates[0] if len(candidates) == 1 else _asterix_resolver(path, candidates)
+                if key is None:
+                    raise ValueError(f"Multiple matching keys for at path {path}: {candidates}")
+                node = node.children[key]
+                continue
+
+            next_node = node.children.get(part)
+            if next_node is None:
+                next_node = node.children.get("*")
+                if next_node is None:
+                    return None
+            node = next_node
+
+        return node.value if node.is_leaf else None
+
+
 @yaml_info("metadata")
 class BenchmarkMetadata(YamlAble):
     sharded_metrics: TreeDict[MetricMetadata]
@@ -89,19 +132,24 @@ class BenchmarkMetadata(YamlAble):
     ) -> None:
         self.sharded_metrics = sharded_metrics or TreeDict()
         self.shardless_metrics = shardless_metrics or TreeDict()
+        self._sharded_matcher = _WildcardMatcher(self.sharded_metrics.get_metrics())
+        self._shardless_matcher = _WildcardMatcher(self.shardless_metrics.get_metrics())
 
     def __repr__(self) -> str:
         return f"BenchmarkMetadata(sharded_metrics={self.sharded_metrics}, shardless_metrics={self.shardless_metrics})"
 
     def get_sharded_metric_metadata_or_default(self, metric_name: tuple[str, ...]) -> MetricMetadata:
-        return self._get_metadata_or_default(self.sharded_metrics, metric_name)
+        return self._get_metadata_or_default(self._sharded_matcher, metric_name)
 
     def get_shardless_metric_metadata_or_default(self, metric_name: tuple[str, ...]) -> MetricMetadata:
-        return self._get_metadata_or_default(self.shardless_metrics, metric_name)
+        return self._get_metadata_or_default(self._shardless_matcher, metric_name)
+
+    def __to_yaml_dict__(self) -> dict[str, Any]:
+        return {"sharded_metrics": self.sharded_metrics, "shardless_metrics": self.shardless_metrics}
 
     @staticmethod
-    def _get_metadata_or_default(tree: TreeDict[MetricMetadata], metric_name: tuple[str, ...]) -> MetricMetadata:
-        value = tree.get(metric_name, _asterix_compare, _asterix_resolver)
+    def _get_metadata_or_default(matcher: _WildcardMatcher, metric_name: tuple[str, ...]) -> MetricMetadata:
+        value = matcher.match(metric_name)
         if value is None:
             return MetricMetadata.default(metric_name)
         return value
@@ -120,14 +168,36 @@ BenchmarkType = str
 class BenchmarkMetadataHolder:
     def __init__(self) -> None:
         self._metadata: dict[BenchmarkType, BenchmarkMetadata] = {}
+        self._default_metadata = BenchmarkMetadata()
+        # (benchmark_type, sharded, metric_path) -> resolved metadata
+        self._resolved: dict[tuple[BenchmarkType | None, bool, tuple[str, ...]], MetricMetadata] = {}
 
     def set_metadata(self, benchmark_type: BenchmarkType, metadata: BenchmarkMetadata) -> None:
         self._metadata[benchmark_type] = metadata
+        self._resolved.clear()
 
     def get_metadata_or_default(self, benchmark_type: BenchmarkType | None) -> BenchmarkMetadata:
         if benchmark_type is None:
-            return BenchmarkMetadata()
-        return self._metadata.get(benchmark_type, BenchmarkMetadata())
+            return self._default_metadata
+        return self._metadata.get(benchmark_type, self._default_metadata)
+
+    def get_sharded_metric_metadata_or_default(
+        self, benchmark_type: BenchmarkType | None, metric_name: tuple[str, ...]
+    ) -> MetricMetadata:
+        key = (benchmark_type, True, metric_name)
+        if key not in self._resolved:
+            metadata = self.get_metadata_or_default(benchmark_type)
+            self._resolved[key] = metadata.get_sharded_metric_metadata_or_default(metric_name)
+        return self._resolved[key]
+
+    def get_shardless_metric_metadata_or_default(
+        self, benchmark_type: BenchmarkType | None, metric_name: tuple[str, ...]
+    ) -> MetricMetadata:
+        key = (benchmark_type, False, metric_name)
+        if key not in self._resolved:
+            metadata = self.get_metadata_or_default(benchmark_type)
+            self._resolved[key] = metadata.get_shardless_metric_metadata_or_default(metric_name)
+        return self._resolved[key]
 
     def __len__(self) -> int:
         return len(self._metadata)
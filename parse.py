@@ -1,12 +1,15 @@
 from collections.abc import Callable
+from pathlib import Path
 from typing import Any
 
-from yaml import safe_load
-
+from fast_yaml import safe_load
 from tree import TreeDict
 
 type RawBackendData = list[dict]
 
+_DOCUMENT_START = "---"
+_DOCUMENT_END = "..."
+
 
 def load_data(raw_output: str) -> RawBackendData:
     """Extract embedded YAML from a client output text and parse it.
@@ -27,6 +30,40 @@ def load_data(raw_output: str) -> RawBackendData:
     yaml_part = raw_output.split("---\n")[1]
     yaml_part = yaml_part.removesuffix("...\n")
 
+    return _parse_payload(yaml_part)
+
+
+def load_data_from_file(path: Path) -> RawBackendData:
+    """Extract embedded YAML from a client output file and parse it.
+
+    Same as `load_data`, but the file is read line by line and only the YAML payload
+    (between the `---` line and the following `...` or `---` line) is kept in memory,
+    so the output may be arbitrarily large.
+
+    Args:
+            path: file with the stdout of a client run.
+
+    Returns:
+            A Python object loaded from the YAML payload.
+    """
+
+    payload: list[str] = []
+    with open(path) as f:
+        for line in f:
+            if line.rstrip("\n") == _DOCUMENT_START:
+                break
+        else:
+            raise ValueError(f"No YAML payload found in {path}")
+
+        for line in f:
+            if line.rstrip("\n") in (_DOCUMENT_START, _DOCUMENT_END):
+                break
+            payload.append(line)
+
+    return _parse_payload("".join(payload))
+
+
+def _parse_payload(yaml_part: str) -> RawBackendData:
     loaded = safe_load(yaml_part)
     if not isinstance(loaded, list):
         raise ValueError("Expected the YAML payload to be a list of dicts")
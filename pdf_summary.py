@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import re
 import struct
+import xml.etree.ElementTree as ET
 from collections.abc import Iterable
 from dataclasses import dataclass
 from pathlib import Path
@@ -8,6 +10,13 @@ from pathlib import Path
 from fpdf import FPDF
 from pypdf import PdfReader, PdfWriter
 
+from log import get_logger
+
+logger = get_logger()
+
+# Formats of the chart images, in the order of preference
+CHART_IMAGE_SUFFIXES = (".svg", ".png")
+
 
 @dataclass(frozen=True)
 class PdfRenderOptions:
@@ -15,6 +24,29 @@ class PdfRenderOptions:
     title_font_size: int = 24
     title_margin_top_mm: float = 40.0
     page_margin_mm: float = 10.0
+    # Charts per page, in a grid of rows x columns. With more than one, every chart gets a caption with its name and
+    # each page is portrait or landscape, whichever fits its charts larger.
+    grid_rows: int = 1
+    grid_columns: int = 1
+    grid_gap_mm: float = 4.0
+    caption_font_size: int = 8
+
+    @property
+    def charts_per_page(self) -> int:
+        return self.grid_rows * self.grid_columns
+
+    @property
+    def caption_height_mm(self) -> float:
+        # A line of the caption font, a point is ~0.35mm
+        return self.caption_font_size * 0.6
+
+
+def parse_pdf_grid(value: str) -> tuple[int, int]:
+    """Parse a grid of charts per page given as ROWSxCOLUMNS, e.g. `2x3`, into (rows, columns)."""
+    match = re.fullmatch(r"\s*(\d+)\s*[x×]\s*(\d+)\s*", value.lower())
+    if match is None or int(match[1]) < 1 or int(match[2]) < 1:
+        raise ValueError(f"Invalid PDF grid: {value}, expected ROWSxCOLUMNS, e.g. 2x3")
+    return int(match[1]), int(match[2])
 
 
 def _sorted_existing(paths: Iterable[Path]) -> list[Path]:
@@ -22,6 +54,34 @@ def _sorted_existing(paths: Iterable[Path]) -> list[Path]:
     return sorted(existing, key=lambda p: p.name)
 
 
+def find_chart_images(directory: Path) -> list[Path]:
+    """All chart images in `directory`, to be passed to `generate_benchmark_summary_pdf`."""
+    return sorted(path for path in Path(directory).iterdir() if path.suffix.lower() in CHART_IMAGE_SUFFIXES)
+
+
+def _charts(image_paths: list[Path]) -> list[tuple[Path, Path | None]]:
+    """Group the images of the same chart in different formats, the ones with the same name but another suffix.
+
+    Returns:
+        (image, fallback image or None) for every chart, sorted by name. SVGs are preferred, they are embedded as
+        vector graphics which stay sharp at any zoom, with the PNG of the chart as the fallback.
+    """
+    by_chart: dict[str, list[Path]] = {}
+    for path in image_paths:
+        by_chart.setdefault(path.stem, []).append(path)
+
+    charts = []
+    for stem in sorted(by_chart):
+        paths = sorted(by_chart[stem], key=_image_preference)
+        charts.append((paths[0], paths[1] if len(paths) > 1 else None))
+    return charts
+
+
+def _image_preference(path: Path) -> int:
+    suffix = path.suffix.lower()
+    return CHART_IMAGE_SUFFIXES.index(suffix) if suffix in CHART_IMAGE_SUFFIXES else len(CHART_IMAGE_SUFFIXES)
+
+
 def _read_png_size(path: Path) -> tuple[int, int]:
     """Return (width, height) in pixels for a PNG file."""
 
@@ -38,36 +98,165 @@ def _read_png_size(path: Path) -> tuple[int, int]:
         return int(width), int(height)
 
 
-def _add_image_page(pdf: FPDF, image_path: Path, options: PdfRenderOptions) -> None:
+def _read_svg_size(path: Path) -> tuple[float, float]:
+    """Return (width, height) of an SVG file, in its own units, from the root element."""
+
+    _, root = next(ET.iterparse(path, events=("start",)))
+    width = _svg_length(root.get("width"))
+    height = _svg_length(root.get("height"))
+    if (width <= 0 or height <= 0) and root.get("viewBox"):
+        _, _, width, height = (float(v) for v in root.get("viewBox").replace(",", " ").split())
+    return width, height
+
+
+def _svg_has_text(path: Path) -> bool:
+    """Whether the SVG has `<text>` elements, which fpdf2 skips without an error.
+
+    Kaleido writes the labels of the charts as text, matplotlib draws them as paths.
+    """
+    try:
+        return any(element.tag.rpartition("}")[2] == "text" for _, element in ET.iterparse(path))
+    except (OSError, ET.ParseError):
+        # Embedding the SVG fails as well, and falls back to the PNG
+        return False
+
+
+def _svg_length(value: str | None) -> float:
+    match = re.match(r"\s*([\d.]+)", value or "")
+    return float(match[1]) if match else 0.0
+
+
+def _read_image_size(path: Path) -> tuple[float, float]:
+    """Return (width, height) of a chart image, or (0, 0) if it can't be read."""
+
+    try:
+        if path.suffix.lower() == ".png":
+            return _read_png_size(path)
+        if path.suffix.lower() == ".svg":
+            return _read_svg_size(path)
+    except (OSError, ValueError, ET.ParseError, StopIteration) as e:
+        logger.warning(f"Failed to read the size of {path}: {e}")
+    return 0, 0
+
+
+def _fit(size: tuple[float, float], w: float, h: float) -> tuple[float, float]:
+    """The largest (width, height) of an image of `size` that fits into w x h, keeping its aspect ratio."""
+
+    px_w, px_h = size
+    if px_w <= 0 or px_h <= 0:
+        return 0, 0
+    scale = min(w / px_w, h / px_h)
+    return px_w * scale, px_h * scale
+
+
+def _add_image_page(pdf: FPDF, image_path: Path, options: PdfRenderOptions, fallback_path: Path | None = None) -> None:
     """Add a single page to `pdf` containing `image_path`, centered and scaled.
 
     If the image can't be read or has non-positive dimensions, the function
-    will leave the PDF unchanged.
+    will leave the page empty.
     """
     pdf.add_page()
 
     margin = float(options.page_margin_mm)
-    available_w = pdf.w - 2 * margin
-    available_h = pdf.h - 2 * margin
+    _draw_image(pdf, image_path, fallback_path, (margin, margin, pdf.w - 2 * margin, pdf.h - 2 * margin))
+
+
+def _add_grid_page(pdf: FPDF, charts: list[tuple[Path, Path | None]], options: PdfRenderOptions) -> None:
+    """Add a page with `charts` in a grid of `options`, each with a caption under it, bookmarked by its name.
+
+    The page is landscape if that fits its charts larger than portrait, judging by their image sizes.
+    """
+    sizes = [_read_image_size(image_path) for image_path, _ in charts]
+    orientation = max(("P", "L"), key=lambda orientation: _grid_area(pdf, orientation, sizes, options))
+    pdf.add_page(orientation=orientation)
+
+    margin = float(options.page_margin_mm)
+    gap = float(options.grid_gap_mm)
+    caption_h = options.caption_height_mm
+    cell_w, cell_h = _grid_cell(pdf.w, pdf.h, options)
+    pdf.set_font(options.title_font_family, size=options.caption_font_size)
+
+    for index, (image_path, fallback_path) in enumerate(charts):
+        row, column = divmod(index, options.grid_columns)
+        x = margin + column * (cell_w + gap)
+        y = margin + row * (cell_h + gap)
+
+        pdf.set_y(y)
+        pdf.start_section(_chart_name(image_path), level=1)
+        _draw_image(pdf, image_path, fallback_path, (x, y, cell_w, cell_h - caption_h))
+
+        caption = _fit_text(pdf, _chart_name(image_path), cell_w)
+        pdf.set_xy(x, y + cell_h - caption_h)
+        pdf.cell(cell_w, caption_h, caption, align="C")
+
+
+def _grid_cell(page_w: float, page_h: float, options: PdfRenderOptions) -> tuple[float, float]:
+    """(width, height) of a cell of the grid, including the caption, on a page of the given size."""
+
+    margin = float(options.page_margin_mm)
+    gap = float(options.grid_gap_mm)
+    cell_w = (page_w - 2 * margin - (options.grid_columns - 1) * gap) / options.grid_columns
+    cell_h = (page_h - 2 * margin - (options.grid_rows - 1) * gap) / options.grid_rows
+    return cell_w, cell_h
+
+
+def _grid_area(pdf: FPDF, orientation: str, sizes: list[tuple[float, float]], options: PdfRenderOptions) -> float:
+    """Total area of the charts of `sizes` on a grid page of the given orientation."""
+
+    page_w, page_h = sorted((pdf.w, pdf.h), reverse=orientation == "L")
+    cell_w, cell_h = _grid_cell(page_w, page_h, options)
+    image_h = cell_h - options.caption_height_mm
+    return sum(w * h for w, h in (_fit(size, cell_w, image_h) for size in sizes))
+
+
+def _chart_name(image_path: Path) -> str:
+    """The name of the chart in `image_path`, undoing the glob escaping of `generate.sanitize_filename`."""
+    return re.sub(r"\[([*?[])\]", r"\1", image_path.stem)
+
+
+def _fit_text(pdf: FPDF, text: str, width: float) -> str:
+    """`text`, shortened with an ellipsis to fit into `width` in the current font."""
+
+    if pdf.get_string_width(text) <= width:
+        return text
+    while text and pdf.get_string_width(text + "...") > width:
+        text = text[:-1]
+    return text + "..."
+
+
+def _draw_image(
+    pdf: FPDF, image_path: Path, fallback_path: Path | None, box: tuple[float, float, float, float]
+) -> None:
+    """Draw `image_path` scaled to fit into `box`, (x, y, w, h), centered in it.
+
+    SVGs are embedded as vector graphics, if that fails `fallback_path` is drawn instead. It's also drawn instead of
+    SVGs with text, which would be embedded without it.
+    """
+    x, y, w, h = box
+    if image_path.suffix.lower() == ".svg" and _svg_has_text(image_path):
+        if fallback_path is not None:
+            image_path = fallback_path
+        else:
+            logger.warning(f"The text of {image_path} is left out of the PDF, there's no PNG of the chart")
+    if image_path.suffix.lower() == ".svg":
+        try:
+            pdf.image(str(image_path), x=x, y=y, w=w, h=h, keep_aspect_ratio=True)
+            return
+        except Exception as e:
+            logger.warning(f"Failed to embed {image_path} in the PDF: {e}")
+            if fallback_path is None:
+                return
+            image_path = fallback_path
 
     px_w = px_h = 0
     if image_path.suffix.lower() == ".png":
         px_w, px_h = _read_png_size(image_path)
 
-    if px_w <= 0 or px_h <= 0:
+    target_w, target_h = _fit((px_w, px_h), w, h)
+    if target_w <= 0 or target_h <= 0:
         return
 
-    aspect = px_h / px_w
-    target_w = available_w
-    target_h = target_w * aspect
-
-    if target_h > available_h:
-        target_h = available_h
-        target_w = target_h / aspect
-
-    x = (pdf.w - target_w) / 2
-    y = (pdf.h - target_h) / 2
-    pdf.image(str(image_path), x=x, y=y, w=target_w, h=target_h)
+    pdf.image(str(image_path), x=x + (w - target_w) / 2, y=y + (h - target_h) / 2, w=target_w, h=target_h)
 
 
 def generate_benchmark_summary_pdf(
@@ -77,43 +266,64 @@ def generate_benchmark_summary_pdf(
     output_pdf: Path,
     options: PdfRenderOptions | None = None,
 ) -> Path:
-    """Create a PDF with a title page + one image per subsequent page."""
+    """Create a PDF with a title page + one chart per subsequent page, bookmarked by the benchmark and chart names.
+
+    With a grid in `options`, the pages after the title page hold as many charts as the grid has cells.
+
+    A chart can be given as images in several formats, e.g. `find_chart_images`, see `_charts`.
+    """
 
     options = options or PdfRenderOptions()
     output_pdf = Path(output_pdf)
     output_pdf.parent.mkdir(parents=True, exist_ok=True)
 
-    image_paths = _sorted_existing(images)
+    charts = _charts(_sorted_existing(images))
 
     pdf = FPDF(orientation="P", unit="mm", format="A4")
     pdf.set_auto_page_break(auto=False)
+    pdf.set_title(benchmark_name)
 
     # Title page
     pdf.add_page()
+    pdf.start_section(benchmark_name)
     pdf.set_font(options.title_font_family, style="B", size=options.title_font_size)
     pdf.set_y(options.title_margin_top_mm)
     pdf.multi_cell(0, 12, benchmark_name, align="C")
 
     # Image pages
-    for image_path in image_paths:
-        _add_image_page(pdf, image_path, options)
+    if options.charts_per_page == 1:
+        for image_path, fallback_path in charts:
+            _add_image_page(pdf, image_path, options, fallback_path)
+            pdf.start_section(_chart_name(image_path), level=1)
+    else:
+        for start in range(0, len(charts), options.charts_per_page):
+            _add_grid_page(pdf, charts[start : start + options.charts_per_page], options)
 
     pdf.output(str(output_pdf))
     return output_pdf
 
 
 def merge_pdfs(*, input_pdfs: Iterable[Path], output_pdf: Path) -> Path:
-    """Concatenate PDFs in-order into output_pdf."""
+    """Concatenate PDFs in-order into output_pdf.
+
+    The bookmarks of every PDF are kept, a PDF without them gets one named after its directory, which is the
+    benchmark's. Objects that are identical in several PDFs, like fonts and images, are written once.
+
+    The merged PDF is held in memory until it's written, pypdf can't stream pages to the file, so the memory used
+    grows with the total size of the input PDFs.
+    """
 
     output_pdf = Path(output_pdf)
     output_pdf.parent.mkdir(parents=True, exist_ok=True)
 
     writer = PdfWriter()
     for pdf_path in _sorted_existing(input_pdfs):
+        # Only one input is parsed at a time, its reader is dropped once its pages and bookmarks are copied
         reader = PdfReader(str(pdf_path))
-        for page in reader.pages:
-            writer.add_page(page)
+        writer.append(reader, outline_item=None if reader.outline else pdf_path.parent.name)
 
+    writer.compress_identical_objects(remove_identicals=True, remove_orphans=True)
+    writer.page_mode = "/UseOutlines"
     with open(output_pdf, "wb") as f:
         writer.write(f)
 
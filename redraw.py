@@ -1,35 +1,25 @@
 import argparse
 from pathlib import Path
 
-from benchmark import BenchmarkInfo, compute_benchmark_summary
+from benchmark import BenchmarkInfo
 from generate import PlotGenerator
 from metadata import BACKENDS_NAMES, BenchmarkMetadataHolder
-from parse import auto_generate_data_points, join_metrics, load_data
-from stats import join_stats
+from parse import auto_generate_data_points, join_metrics, load_data_from_file
 
 
 def run_redraw(metadata_holder: BenchmarkMetadataHolder, backend_paths: dict, output_dir: Path) -> None:
-    backends_data_raw = {}
-    for backend, path in backend_paths.items():
-        with open(Path(path)) as f:
-            backends_data_raw[backend] = f.read()
-
     # Convert raw outputs to metrics mapping expected by generate_graphs
     backends_parsed = {}
-    for backend, raw in backends_data_raw.items():
-        parsed = load_data(raw)
+    for backend, path in backend_paths.items():
+        parsed = load_data_from_file(Path(path))
         backends_parsed[backend] = auto_generate_data_points(parsed)
 
     (shardless_metrics, sharded_metrics) = join_metrics(backends_parsed)
-    metrics_runs = [{"run_id": 0, "sharded": sharded_metrics, "shardless": shardless_metrics}]
-
-    (combined_sharded, combined_shardless) = join_stats(metrics_runs)
     benchmark_info = BenchmarkInfo(id="redraw")
-    summary = compute_benchmark_summary(combined_sharded, combined_shardless, benchmark_info)
 
     plot_generator = PlotGenerator(metadata_holder)
     plot_generator.schedule_graphs_for_run(
-        summary.get_info().id, summary.runs[0].results, output_dir, type=summary.get_info().type
+        benchmark_info.id, sharded_metrics, shardless_metrics, output_dir, type=benchmark_info.type
     )
     plot_generator.plot()
 
@@ -1,44 +1,60 @@
 import argparse
 from pathlib import Path
 
-from benchmark import Benchmark
-from benchmarks import BENCHMARK_SUMMARY_FILENAME, SUITE_SUMMARY_PDF_FILENAME
+from benchmarks import BENCHMARK_SUMMARY_FILENAME, SUITE_SUMMARY_PDF_FILENAME, load_summary
+from columnar_summary import COLUMNAR_SUMMARY_FILENAME
 from generate import PlotGenerator
 from log import get_logger
 from metadata import BenchmarkMetadataHolder
-from pdf_summary import generate_benchmark_summary_pdf, merge_pdfs
+from pdf_summary import PdfRenderOptions, find_chart_images, generate_benchmark_summary_pdf, merge_pdfs, parse_pdf_grid
+from render_cache import RENDER_CACHE_FILENAME, RenderCache
+from renderer import DEFAULT_RENDER_ENGINE, RENDER_ENGINES, SVG_TEXT_AS_PATHS_ENGINES, close_renderers
+from stats import split_by_run
 
 logger = get_logger()
 
 
 class RedrawSuiteRunner:
-    def __init__(self, metadata_holder: BenchmarkMetadataHolder) -> None:
-        self.plot_generator = PlotGenerator(metadata_holder)
+    def __init__(
+        self,
+        metadata_holder: BenchmarkMetadataHolder,
+        render_jobs: int = 1,
+        force: bool = False,
+        render_engine: str = DEFAULT_RENDER_ENGINE,
+        pdf_grid: tuple[int, int] = (1, 1),
+    ) -> None:
+        self.plot_generator = PlotGenerator(metadata_holder, render_jobs=render_jobs, render_engine=render_engine)
+        self.force = force
+        self.pdf_options = PdfRenderOptions(grid_rows=pdf_grid[0], grid_columns=pdf_grid[1])
 
     def run_redraw_suite(self, dir: Path) -> None:
+        # Without force, the figures rendered by a previous redraw from the same spec are kept
+        self.plot_generator.render_cache = RenderCache(dir / RENDER_CACHE_FILENAME, load=not self.force)
         benchmark_dirs_to_render: list[tuple[str, Path]] = []
         for benchmark_dir in sorted(dir.iterdir()):
             if not benchmark_dir.is_dir():
                 continue
             summary_file = benchmark_dir / BENCHMARK_SUMMARY_FILENAME
-            if not summary_file.is_file():
+            if not summary_file.is_file() and not (benchmark_dir / COLUMNAR_SUMMARY_FILENAME).is_file():
                 logger.warning(f"Missing summary file {summary_file} in benchmark directory {benchmark_dir}, skipping")
                 continue
 
-            benchmark_name = self.redraw_summary(summary_file, benchmark_dir)
+            benchmark_name = self.redraw_summary(benchmark_dir, benchmark_dir)
             benchmark_dirs_to_render.append((benchmark_name, benchmark_dir))
 
         if benchmark_dirs_to_render:
-            self.plot_generator.plot()
+            self.plot_generator.close()
+            close_renderers()
 
         per_benchmark_pdfs: list[Path] = []
         for benchmark_name, benchmark_dir in benchmark_dirs_to_render:
             logger.info(f"Generating PDF for {benchmark_name}")
-            summary_images = sorted(benchmark_dir.glob("*.png"))
+            summary_images = find_chart_images(benchmark_dir)
             pdf_path = generate_benchmark_summary_pdf(
                 benchmark_name=benchmark_name,
                 images=summary_images,
                 output_pdf=benchmark_dir / "summary.pdf",
+                options=self.pdf_options,
             )
             per_benchmark_pdfs.append(pdf_path)
 
@@ -46,38 +62,58 @@ class RedrawSuiteRunner:
             logger.info("Merging benchmark PDFs")
             merge_pdfs(input_pdfs=per_benchmark_pdfs, output_pdf=dir / SUITE_SUMMARY_PDF_FILENAME)
 
-    def redraw_summary(self, summary_file: Path, output_dir: Path) -> str:
-        logger.info(f"Redrawing summary from {summary_file}")
+    def redraw_summary(self, benchmark_dir: Path, output_dir: Path) -> str:
+        logger.info(f"Redrawing summary from {benchmark_dir}")
 
-        with open(summary_file) as file:
-            summary = Benchmark.load_from_file(file)
-        self.plot_generator.schedule_graphs_for_summary(
-            summary.get_info().id, summary.get_stats(), output_dir, type=summary.get_info().type
-        )
+        summary = load_summary(benchmark_dir)
         self.plot_generator.schedule_graphs_for_summary(
             summary.get_info().id,
             summary.get_stats(),
             output_dir,
             type=summary.get_info().type,
-            image_format="png",
+            # The PDFs need PNGs for the text of SVGs which isn't drawn as paths
+            image_formats=("svg",)
+            if self.plot_generator.render_engine in SVG_TEXT_AS_PATHS_ENGINES
+            else ("svg", "png"),
         )
 
-        for run in summary.get_runs():
-            run_id = run.id
+        for run_id, (sharded, shardless) in split_by_run(*summary.get_samples()).items():
             run_output_dir = output_dir / f"run_{run_id}"
             run_output_dir.mkdir(exist_ok=True, parents=True)
             self.plot_generator.schedule_graphs_for_run(
-                summary.get_info().id, run.results, run_output_dir, type=summary.get_info().type
+                summary.get_info().id, sharded, shardless, run_output_dir, type=summary.get_info().type
             )
 
         return summary.get_info().id
 
 
 def run_redraw_suite_args(args: argparse.Namespace, metadata_holder: BenchmarkMetadataHolder) -> None:
-    runner = RedrawSuiteRunner(metadata_holder)
+    runner = RedrawSuiteRunner(
+        metadata_holder,
+        render_jobs=args.render_jobs,
+        force=args.force,
+        render_engine=args.render_engine,
+        pdf_grid=args.pdf_grid,
+    )
     runner.run_redraw_suite(Path(args.dir))
 
 
 def configure_redraw_suite_parser(parser: argparse.ArgumentParser) -> None:
     parser.add_argument("--dir", help="directory to save the output to", required=True)
+    parser.add_argument(
+        "--render-jobs", help="number of processes rendering the graphs in parallel", type=int, default=1
+    )
+    parser.add_argument("--force", help="render all graphs, even those that are up to date", action="store_true")
+    parser.add_argument(
+        "--render-engine",
+        help="how graphs are rendered, agg draws them with matplotlib without a browser",
+        choices=RENDER_ENGINES,
+        default=DEFAULT_RENDER_ENGINE,
+    )
+    parser.add_argument(
+        "--pdf-grid",
+        help="charts per page of the summary PDFs as ROWSxCOLUMNS, e.g. 2x3",
+        type=parse_pdf_grid,
+        default="1x1",
+    )
     parser.set_defaults(func=run_redraw_suite_args)
@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from pathlib import Path
 
 import requests
 
@@ -17,6 +18,10 @@ class CmdOutput:
     def from_json(data: dict) -> "CmdOutput":
         return CmdOutput(stdout=data["stdout"], stderr=data["stderr"], returncode=data["return_code"])
 
+    def write_to(self, stdout_path: Path, stderr_path: Path) -> None:
+        stdout_path.write_text(self.stdout)
+        stderr_path.write_text(self.stderr)
+
 
 class RemoteProcess:
     def __init__(self, remote: "Remote", pid: int):
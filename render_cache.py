@@ -0,0 +1,73 @@
+"""Index of rendered figures, used to skip rendering figures whose output is up to date."""
+
+import hashlib
+import os
+from pathlib import Path
+
+import plotly
+
+from fast_yaml import safe_dump, safe_load
+from log import get_logger
+from renderer import DEFAULT_RENDER_ENGINE
+
+RENDER_CACHE_FILENAME = "render_cache.yaml"
+
+logger = get_logger()
+
+
+class RenderCache:
+    """Maps every rendered file to the hash of the figure spec and image format it was rendered from.
+
+    Paths are stored relative to the directory of the index file when they are inside of it.
+    """
+
+    def __init__(self, path: Path, load: bool = True) -> None:
+        """Open the index at path, which is only read when `load` is set, otherwise it starts empty."""
+        self.path = path
+        self.hashes: dict[str, str] = {}
+
+        if load and self.path.exists():
+            self._load()
+
+    @staticmethod
+    def figure_hash(fig_json: str, file_path: Path, render_engine: str = DEFAULT_RENDER_ENGINE) -> str:
+        """Hash of what a figure renders from: its JSON spec, the image format, the render engine and the plotly version."""
+        digest = hashlib.sha256()
+        for part in (plotly.__version__, render_engine, file_path.suffix.lower(), fig_json):
+            digest.update(part.encode())
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def is_fresh(self, file_path: Path, figure_hash: str) -> bool:
+        """Whether file_path exists and was rendered from a figure with the given hash."""
+        return self.hashes.get(self._key(file_path)) == figure_hash and file_path.is_file()
+
+    def record(self, file_path: Path, figure_hash: str) -> None:
+        self.hashes[self._key(file_path)] = figure_hash
+
+    def save(self) -> None:
+        """Write the index, replacing the previous one atomically."""
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w") as f:
+            f.write(safe_dump(self.hashes))
+        os.replace(tmp_path, self.path)
+
+    def __len__(self) -> int:
+        return len(self.hashes)
+
+    def _key(self, file_path: Path) -> str:
+        file_path = Path(os.path.abspath(file_path))
+        index_dir = Path(os.path.abspath(self.path.parent))
+        if file_path.is_relative_to(index_dir):
+            return file_path.relative_to(index_dir).as_posix()
+        return file_path.as_posix()
+
+    def _load(self) -> None:
+        with open(self.path) as f:
+            hashes = safe_load(f)
+
+        if not isinstance(hashes, dict):
+            logger.warning(f"Ignoring malformed render cache {self.path}")
+            return
+        self.hashes = {str(key): str(value) for key, value in hashes.items()}
+        logger.debug(f"Loaded {len(self.hashes)} entries from render cache {self.path}")
@@ -0,0 +1,122 @@
+"""Background stage for work that shouldn't run on the critical path of the benchmarks."""
+
+import multiprocessing
+import os
+import pickle
+import queue
+import traceback
+from collections.abc import Callable
+from multiprocessing.reduction import ForkingPickler
+from typing import Any
+
+from log import get_logger
+
+logger = get_logger()
+
+_RESULT_POLL_INTERVAL_SECONDS = 1.0
+
+
+class BackgroundWorker:
+    """Calls `handler` on every submitted task in a separate process, in submission order.
+
+    The worker process can be pinned to a set of CPUs, so that it doesn't disturb processes running
+    on other CPUs (e.g. the benchmarked testers). The arguments of a task are copied when it's submitted,
+    so the caller may go on changing them.
+    """
+
+    def __init__(self, handler: Callable[..., Any], cpus: set[int] | None = None) -> None:
+        self.handler = handler
+        self.cpus = cpus
+        self._tasks: multiprocessing.Queue = multiprocessing.Queue()
+        self._results: multiprocessing.Queue = multiprocessing.Queue()
+        self._process: multiprocessing.Process | None = None
+        self._submitted = 0
+
+    def start(self) -> None:
+        self._process = multiprocessing.Process(
+            target=_worker_loop,
+            args=(self.handler, self.cpus, get_logger().level, self._tasks, self._results),
+            name="background-worker",
+        )
+        self._process.start()
+        logger.debug(f"Started background worker pid={self._process.pid}, cpus={self.cpus}")
+
+    def submit(self, *args: Any) -> None:
+        if self._process is None:
+            raise RuntimeError("Background worker is not started")
+        # The queue would pickle the arguments later, on its own thread
+        self._tasks.put(bytes(ForkingPickler.dumps(args)))
+        self._submitted += 1
+
+    def close(self) -> list[Any]:
+        """Wait until all submitted tasks are handled and stop the worker.
+
+        Returns:
+            Results of the handler, in submission order.
+
+        Raises:
+            RuntimeError: if any of the tasks failed or the worker process died.
+        """
+        if self._process is None:
+            return []
+
+        self._tasks.put(None)
+
+        results: list[Any] = []
+        errors: list[str] = []
+        while len(results) + len(errors) < self._submitted:
+            try:
+                (ok, value) = self._results.get(timeout=_RESULT_POLL_INTERVAL_SECONDS)
+            except queue.Empty:
+                if not self._process.is_alive():
+                    errors.append(f"Background worker exited with code {self._process.exitcode}")
+                    break
+                continue
+
+            if ok:
+                results.append(value)
+            else:
+                errors.append(value)
+
+        self._process.join()
+        self._process = None
+
+        if errors:
+            raise RuntimeError("Background worker failed:\n" + "\n".join(errors))
+
+        return results
+
+    def terminate(self) -> None:
+        """Stop the worker without handling the pending tasks, e.g. when the suite is interrupted."""
+        if self._process is None:
+            return
+
+        self._process.terminate()
+        self._process.join()
+        self._process = None
+        # The pending tasks are dropped, exiting shouldn't wait for them to be flushed into the queue
+        self._tasks.cancel_join_thread()
+        logger.warning("Stopped the background worker, its pending tasks are not handled")
+
+
+def _worker_loop(
+    handler: Callable[..., Any],
+    cpus: set[int] | None,
+    log_level: int,
+    tasks: multiprocessing.Queue,
+    results: multiprocessing.Queue,
+) -> None:
+    # Worker processes don't necessarily inherit the logger configuration of the parent
+    get_logger().setLevel(log_level)
+
+    if cpus:
+        os.sched_setaffinity(0, cpus)
+
+    while (task := tasks.get()) is not None:
+        try:
+            results.put((True, handler(*pickle.loads(task))))
+        except Exception:
+            error = traceback.format_exc()
+            # Reported right away, not only when the worker is closed at the end of the suite
+            logger.error(f"Background task failed:\n{error}")
+            results.put((False, error))
@@ -0,0 +1,190 @@
+"""Renders figures to image files with a Kaleido session that is kept open for the whole process."""
+
+import asyncio
+import atexit
+import os
+import threading
+import time
+from collections.abc import Coroutine
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, ClassVar
+
+import kaleido
+import plotly.io as pio
+
+from log import get_logger
+
+if TYPE_CHECKING:
+    from agg_renderer import AggRenderer
+
+logger = get_logger()
+
+
+class KaleidoRenderer:
+    """Owns a Kaleido session, which is a headless Chromium, started on the first render and kept until `close`.
+
+    `pio.write_images` starts a new Chromium on every call unless a session is running, which takes seconds.
+    Kaleido is asynchronous, so the session lives in an event loop running on a thread of the renderer.
+    """
+
+    def __init__(self) -> None:
+        self.startups = 0
+        self.rendered_images = 0
+        self._session: kaleido.Kaleido | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+
+    def write_images(
+        self, fig_dicts: list[dict], file_paths: list[list[Path]] | list[list[str]]
+    ) -> list[Path] | list[str]:
+        """Write every figure to all of its paths, the image format is taken from the suffix of the path.
+
+        Returns:
+            The paths that failed to render, their files are left as they were.
+        """
+        targets = [file_path for paths in file_paths for file_path in paths]
+        specs = [
+            _kaleido_spec(fig_dict, Path(file_path))
+            for fig_dict, paths in zip(fig_dicts, file_paths, strict=True)
+            for file_path in paths
+        ]
+        if not specs:
+            return []
+
+        self._start()
+        start = time.perf_counter()
+        try:
+            errors = self._run(self._session.write_fig_from_object(specs))
+        except BaseException:
+            # The session may be broken, the next render starts a new one
+            self.close()
+            for spec in specs:
+                spec["path"].unlink(missing_ok=True)
+            raise
+        seconds = time.perf_counter() - start
+
+        for error in errors:
+            logger.error(f"Failed to render an image: {error}")
+        # Kaleido doesn't tell which images the errors are for, only the rendered ones have been written
+        failed = []
+        for target, spec in zip(targets, specs, strict=True):
+            if spec["path"].is_file():
+                os.replace(spec["path"], target)
+            else:
+                failed.append(target)
+
+        self.rendered_images += len(specs) - len(failed)
+        figures = sum(1 for paths in file_paths if paths)
+        logger.info(
+            f"Rendered {figures} figures to {len(specs)} images in {seconds:.2f}s, {seconds / figures * 1000:.1f}ms per figure"
+        )
+        return failed
+
+    def close(self) -> None:
+        if self._session is None:
+            return
+
+        try:
+            self._run(self._session.close())
+        finally:
+            self._session = None
+            self._stop_loop()
+        logger.info(
+            f"Closed Kaleido session of process {os.getpid()}, sessions started: {self.startups}, images rendered: {self.rendered_images}"
+        )
+
+    def _start(self) -> None:
+        if self._session is not None:
+            return
+
+        start = time.perf_counter()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="kaleido-renderer", daemon=True)
+        self._thread.start()
+        try:
+            self._session = self._run(_open_session())
+        except BaseException:
+            self._stop_loop()
+            raise
+
+        self.startups += 1
+        logger.info(f"Started Kaleido session #{self.startups} in {time.perf_counter() - start:.2f}s")
+
+    def _run(self, coroutine: Coroutine[Any, Any, Any]) -> Any:
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def _stop_loop(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        (self._loop, self._thread) = (None, None)
+
+
+async def _open_session() -> kaleido.Kaleido:
+    options = {}
+    if pio.defaults.plotlyjs:
+        options["plotlyjs"] = pio.defaults.plotlyjs
+    if pio.defaults.mathjax:
+        options["mathjax"] = pio.defaults.mathjax
+
+    session = kaleido.Kaleido(**options)
+    await session.open()
+    return session
+
+
+def _kaleido_spec(fig_dict: dict, file_path: Path) -> dict:
+    """The same spec as `pio.write_images` passes to Kaleido, but writing to a temporary path next to `file_path`.
+
+    An image is moved to `file_path` only once it is rendered, a failed render keeps the previous file.
+    """
+    return {
+        "fig": fig_dict,
+        "path": file_path.with_name(f".{file_path.stem}.rendering{file_path.suffix}"),
+        "opts": {
+            "format": file_path.suffix.removeprefix(".") or pio.defaults.default_format,
+            "width": pio.defaults.default_width,
+            "height": pio.defaults.default_height,
+            "scale": pio.defaults.default_scale,
+        },
+        "topojson": pio.defaults.topojson,
+    }
+
+
+# Engines drawing the images, "agg" draws them with matplotlib in the process instead of in a browser
+RENDER_ENGINES = ("kaleido", "agg")
+DEFAULT_RENDER_ENGINE = "kaleido"
+# Engines writing the text of SVGs as paths, the PDFs embed them as they are, the others need PNGs for their text
+SVG_TEXT_AS_PATHS_ENGINES = ("agg",)
+
+
+class _ProcessRenderers:
+    renderers: ClassVar[dict[str, "KaleidoRenderer | AggRenderer"]] = {}
+
+
+def get_renderer(engine: str = DEFAULT_RENDER_ENGINE) -> "KaleidoRenderer | AggRenderer":
+    """The renderer of the current process for the given engine, it's closed when the process exits."""
+    if engine not in _ProcessRenderers.renderers:
+        if engine == "kaleido":
+            _ProcessRenderers.renderers[engine] = KaleidoRenderer()
+        elif engine == "agg":
+            # matplotlib is only needed by this engine
+            from agg_renderer import AggRenderer  # noqa: PLC0415
+
+            _ProcessRenderers.renderers[engine] = AggRenderer()
+        else:
+            raise ValueError(f"Unknown render engine: {engine}")
+        atexit.register(close_renderers)
+    return _ProcessRenderers.renderers[engine]
+
+
+def close_renderers() -> None:
+    while _ProcessRenderers.renderers:
+        _ProcessRenderers.renderers.popitem()[1].close()
+
+
+def _forget_renderers() -> None:
+    # A forked process doesn't get the thread of a Kaleido session, so it starts its own
+    _ProcessRenderers.renderers = {}
+
+
+os.register_at_fork(after_in_child=_forget_renderers)
@@ -3,8 +3,8 @@ from os import PathLike
 from pathlib import Path
 
 from log import get_logger, warn_if_not_release
-from parse import RawBackendData, load_data
-from remote import CmdOutput, IoTesterParams, Remote
+from parse import RawBackendData, load_data_from_file
+from remote import IoTesterParams, Remote
 
 logger = get_logger()
 
@@ -32,7 +32,9 @@ class IOTestRunner:
 
         warn_if_not_release(self.tester_path)
 
-    def __run_test_process(self, backend: str, cpuset: str, async_worker_cpuset: str | None) -> CmdOutput:
+    def __run_test_process(
+        self, backend: str, cpuset: str, async_worker_cpuset: str | None, stdout_path: Path, stderr_path: Path
+    ) -> int | None:
         opts_argv = [
             "--reactor-backend",
             backend,
@@ -52,25 +54,25 @@ class IOTestRunner:
                 self.storage_dir,
             ] + opts_argv
 
-            result: subprocess.CompletedProcess | CmdOutput = subprocess.run(
-                argv,
-                check=False,
-                capture_output=True,
-                text=True,
-            )
+            # The output goes straight to the files, so it's never held in memory
+            with open(stdout_path, "w") as stdout, open(stderr_path, "w") as stderr:
+                result = subprocess.run(argv, check=False, stdout=stdout, stderr=stderr)
 
-            return CmdOutput(stdout=result.stdout, stderr=result.stderr, returncode=result.returncode)
+            return result.returncode
         else:
             try:
                 with open(self.config_path) as f:
                     process = self.remote.run_io_tester(IoTesterParams(config=f.read(), argv=opts_argv))
-                return process.wait()
+                output = process.wait()
             except KeyboardInterrupt:
                 logger.warning("remote io_tester interrupted")
                 process.kill()
                 process.wait()  # Clear zombie
                 raise
 
+            output.write_to(stdout_path, stderr_path)
+            return output.returncode
+
     def __run_test(
         self, backend: str, output_filename: str, cpuset: str, async_worker_cpuset: str | None
     ) -> RawBackendData:
@@ -80,24 +82,19 @@ class IOTestRunner:
         self.run_output_dir.mkdir(parents=True, exist_ok=True)
         self.storage_dir.mkdir(parents=True, exist_ok=True)
 
-        result = self.__run_test_process(backend, cpuset, async_worker_cpuset)
-
         stdout_output_path: Path = self.run_output_dir / (output_filename + ".out")
-
-        with open(stdout_output_path, "w") as f:
-            print(result.stdout, file=f)
-
         stderr_output_path: Path = self.run_output_dir / (output_filename + ".err")
 
-        with open(stderr_output_path, "w") as f:
-            print(result.stderr, file=f)
+        returncode = self.__run_test_process(
+            backend, cpuset, async_worker_cpuset, stdout_output_path, stderr_output_path
+        )
 
         self.storage_dir.rmdir()
 
-        if (err := result.returncode) != 0:
-            raise RuntimeError(f"Tester failed with exit code {err}")
+        if returncode != 0:
+            raise RuntimeError(f"Tester failed with exit code {returncode}")
 
-        return load_data(result.stdout)
+        return load_data_from_file(stdout_output_path)
 
     def run(self, backend: str) -> RawBackendData:
         if backend == "asymmetric_io_uring":
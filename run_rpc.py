@@ -1,16 +1,25 @@
+import socket
 import subprocess
 from pathlib import Path
-from time import sleep
-
-from yaml import safe_dump, safe_load
+from time import monotonic, sleep
 
+from fast_yaml import safe_dump, safe_load
 from log import get_logger, warn_if_not_release
-from parse import RawBackendData, load_data
-from remote import CmdOutput, Remote, RemoteProcess, RpcTesterParams
+from parse import RawBackendData, load_data_from_file
+from remote import Remote, RemoteProcess, RpcTesterParams
 
 logger = get_logger()
 
 DEFAULT_PORT = "9123"
+DEFAULT_SERVER_READY_TIMEOUT = 30.0
+DEFAULT_SHUTDOWN_TIMEOUT = 5.0
+DEFAULT_SETTLE_TIME = 0.0
+# With a remote, the server can't be checked to listen from here, so the client is started after the settle time
+DEFAULT_REMOTE_SETTLE_TIME = 1.0
+
+_INITIAL_POLL_INTERVAL = 0.01
+_MAX_POLL_INTERVAL = 0.5
+_CONNECT_TIMEOUT = 0.5
 
 
 class RpcTestRunner:
@@ -63,12 +72,26 @@ class RpcTestRunner:
         self.extra_client_options: list[str] = rpc_runner_config.get("extra_client_options", [])
         self.server_backend_override: str | None = rpc_runner_config.get("server_backend_override", None)
         self.client_backend_override: str | None = rpc_runner_config.get("client_backend_override", None)
+        self.server_ready_timeout: float = float(
+            rpc_runner_config.get("server_ready_timeout", DEFAULT_SERVER_READY_TIMEOUT)
+        )
+        self.shutdown_timeout: float = float(rpc_runner_config.get("shutdown_timeout", DEFAULT_SHUTDOWN_TIMEOUT))
+        self.settle_time: float = float(
+            rpc_runner_config.get(
+                "settle_time", DEFAULT_SETTLE_TIME if not self.__has_remote() else DEFAULT_REMOTE_SETTLE_TIME
+            )
+        )
 
         warn_if_not_release(self.tester_path)
 
     def __run_server(
-        self, backend: str, server_cpuset: str, server_async_worker_cpuset: str | None
-    ) -> subprocess.Popen[str] | RemoteProcess:  # Creates a process
+        self,
+        backend: str,
+        server_cpuset: str,
+        server_async_worker_cpuset: str | None,
+        stdout_path: Path,
+        stderr_path: Path,
+    ) -> subprocess.Popen | RemoteProcess:  # Creates a process
         opts_argv = [
             "--listen",
             self.remote_listen_address,
@@ -90,12 +113,9 @@ class RpcTestRunner:
                 str(self.server_config_path),
             ] + opts_argv
 
-            return subprocess.Popen(
-                argv,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-            )
+            # The child process gets its own copies of the file descriptors
+            with open(stdout_path, "w") as stdout, open(stderr_path, "w") as stderr:
+                return subprocess.Popen(argv, stdout=stdout, stderr=stderr)
         else:
             with open(self.server_config_path) as f:
                 if self.remote_listen_address is None:
@@ -106,7 +126,14 @@ class RpcTestRunner:
                 assert isinstance(self.remote_listen_port, str)
                 return self.server_remote.run_rpc_tester(RpcTesterParams(f.read(), opts_argv))
 
-    def __run_client(self, backend: str, client_cpuset: str, client_async_worker_cpuset: str | None) -> CmdOutput:
+    def __run_client(
+        self,
+        backend: str,
+        client_cpuset: str,
+        client_async_worker_cpuset: str | None,
+        stdout_path: Path,
+        stderr_path: Path,
+    ) -> int | None:
         opts_argv = [
             "--connect",
             self.remote_connect_address,
@@ -128,14 +155,8 @@ class RpcTestRunner:
                 str(self.client_config_path),
             ] + opts_argv
 
-            output = subprocess.run(
-                argv,
-                check=False,
-                capture_output=True,
-                text=True,
-            )
-
-            return CmdOutput(stdout=output.stdout, stderr=output.stderr, returncode=output.returncode)
+            with open(stdout_path, "w") as stdout, open(stderr_path, "w") as stderr:
+                return subprocess.run(argv, check=False, stdout=stdout, stderr=stderr).returncode
         else:
             with open(self.client_config_path) as f:
                 if self.remote_connect_address is None:
@@ -144,52 +165,57 @@ class RpcTestRunner:
                     raise RuntimeError("Remote connect port not specified")
                 assert isinstance(self.remote_connect_address, str)
                 assert isinstance(self.remote_connect_port, str)
-                return self.client_remote.run_rpc_tester(RpcTesterParams(f.read(), opts_argv)).wait()
-
-    def ___run_test(
-        self,
-        backend: str,
-        server_cpuset: str,
-        server_async_worker_cpuset: str | None,
-        client_cpuset: str,
-        client_async_worker_cpuset: str | None,
-    ) -> tuple[CmdOutput, CmdOutput]:
-        server_process = self.__run_server(backend, server_cpuset, server_async_worker_cpuset)
+                output = self.client_remote.run_rpc_tester(RpcTesterParams(f.read(), opts_argv)).wait()
+            output.write_to(stdout_path, stderr_path)
+            return output.returncode
+
+    def __has_remote(self) -> bool:
+        return self.server_remote is not None or self.client_remote is not None
+
+    def __wait_for_server(self, server_process: subprocess.Popen | RemoteProcess) -> None:
+        """Wait until the server listens, then for the settle time."""
+        if self.__has_remote():
+            # The connect address is the one of the remote client, it may not be reachable from here
+            logger.info(
+                f"Not checking that the server listens on the remote connect address, waiting settle_time={self.settle_time}s instead"
+            )
+        elif self.remote_connect_address is None:
+            logger.warning("Connect address not specified, not waiting for the server to start listening")
+        else:
+            ready = _wait_until_listening(
+                self.remote_connect_address, int(self.remote_connect_port), server_process, self.server_ready_timeout
+            )
+            if ready is None:
+                raise RuntimeError(f"Server exited with code {server_process.poll()} before accepting connections")
+            if not ready:
+                raise RuntimeError(
+                    f"Server didn't accept connections on {self.remote_connect_address}:{self.remote_connect_port} within {self.server_ready_timeout}s"
+                )
 
-        sleep(1)
+        sleep(self.settle_time)
+        if (returncode := server_process.poll()) is not None:
+            raise RuntimeError(f"Server exited with code {returncode} before the client was started")
 
-        try:
-            client_output = self.__run_client(backend, client_cpuset, client_async_worker_cpuset)
-        except KeyboardInterrupt:
+    def __stop_server(
+        self, server_process: subprocess.Popen | RemoteProcess, stdout_path: Path, stderr_path: Path
+    ) -> int | None:
+        if server_process.poll() is None:
             server_process.terminate()
 
-            if server_process.poll() is None:
-                sleep(1)
-
-            if server_process.poll() is None:
+        if isinstance(server_process, subprocess.Popen):
+            try:
+                return server_process.wait(timeout=self.shutdown_timeout)
+            except subprocess.TimeoutExpired:
                 logger.warning("Force killing server")
                 server_process.kill()
-
-            raise
-
-        sleep(1)
-
-        server_process.terminate()
-
-        sleep(1)
-
-        if self.server_remote is None and server_process.poll() is None:
-            server_process.kill()
-
-        if self.server_remote is None:
-            assert isinstance(server_process, subprocess.Popen)
-            server_stdout, server_stderr = server_process.communicate()
-            return client_output, CmdOutput(
-                stdout=server_stdout, stderr=server_stderr, returncode=server_process.poll()
-            )
+                return server_process.wait()
         else:
-            assert isinstance(server_process, RemoteProcess)
-            return client_output, server_process.wait()
+            if not _wait_for_exit(server_process, self.shutdown_timeout):
+                logger.warning("Force killing server")
+                server_process.kill()
+            output = server_process.wait()
+            output.write_to(stdout_path, stderr_path)
+            return output.returncode
 
     def __run_test(
         self,
@@ -205,37 +231,35 @@ class RpcTestRunner:
         )
         self.run_output_dir.mkdir(parents=True, exist_ok=True)
 
-        client, server = self.___run_test(
-            backend, server_cpuset, server_async_worker_cpuset, client_cpuset, client_async_worker_cpuset
-        )
-
         server_stdout_output_path: Path = self.run_output_dir / (output_filename + ".server.out")
-
-        with open(server_stdout_output_path, "w") as f:
-            print(server.stdout, file=f)
-
         server_stderr_output_path: Path = self.run_output_dir / (output_filename + ".server.err")
-
-        with open(server_stderr_output_path, "w") as f:
-            print(server.stderr, file=f)
-
         client_stdout_output_path: Path = self.run_output_dir / (output_filename + ".client.out")
+        client_stderr_output_path: Path = self.run_output_dir / (output_filename + ".client.err")
 
-        with open(client_stdout_output_path, "w") as f:
-            print(client.stdout, file=f)
+        server_process = self.__run_server(
+            backend, server_cpuset, server_async_worker_cpuset, server_stdout_output_path, server_stderr_output_path
+        )
 
-        client_stderr_output_path: Path = self.run_output_dir / (output_filename + ".client.err")
+        try:
+            self.__wait_for_server(server_process)
+            client_returncode = self.__run_client(
+                backend, client_cpuset, client_async_worker_cpuset, client_stdout_output_path, client_stderr_output_path
+            )
+        except BaseException:
+            self.__stop_server(server_process, server_stdout_output_path, server_stderr_output_path)
+            raise
+
+        sleep(self.settle_time)
 
-        with open(client_stderr_output_path, "w") as f:
-            print(client.stderr, file=f)
+        server_returncode = self.__stop_server(server_process, server_stdout_output_path, server_stderr_output_path)
 
-        if server.returncode is not None and server.returncode != 0:
-            raise RuntimeError(f"Server failed with exit code {server.returncode}")
+        if server_returncode is not None and server_returncode != 0:
+            raise RuntimeError(f"Server failed with exit code {server_returncode}")
 
-        if client.returncode is not None and client.returncode != 0:
-            raise RuntimeError(f"Client failed with exit code {client.returncode}")
+        if client_returncode is not None and client_returncode != 0:
+            raise RuntimeError(f"Client failed with exit code {client_returncode}")
 
-        return load_data(client.stdout)
+        return load_data_from_file(client_stdout_output_path)
 
     def run(self, backend: str) -> RawBackendData:
         if backend == "asymmetric_io_uring":
@@ -263,6 +287,46 @@ class RpcTestRunner:
             )
 
 
+def _wait_for_exit(process: subprocess.Popen | RemoteProcess, timeout: float) -> bool:
+    """Poll the process with exponential backoff until it exits. Returns False on timeout."""
+    deadline = monotonic() + timeout
+    interval = _INITIAL_POLL_INTERVAL
+    while process.poll() is None:
+        remaining = deadline - monotonic()
+        if remaining <= 0:
+            return False
+        sleep(min(interval, remaining))
+        interval = min(interval * 2, _MAX_POLL_INTERVAL)
+    return True
+
+
+def _wait_until_listening(
+    address: str, port: int, process: subprocess.Popen | RemoteProcess, timeout: float
+) -> bool | None:
+    """Poll the address with exponential backoff until it accepts TCP connections.
+
+    Returns:
+        True if the address accepts connections, False on timeout, None if the process exited first.
+    """
+    deadline = monotonic() + timeout
+    interval = _INITIAL_POLL_INTERVAL
+    while True:
+        try:
+            with socket.create_connection((address, port), timeout=_CONNECT_TIMEOUT):
+                return True
+        except OSError:
+            pass
+
+        if process.poll() is not None:
+            return None
+
+        remaining = deadline - monotonic()
+        if remaining <= 0:
+            return False
+        sleep(min(interval, remaining))
+        interval = min(interval * 2, _MAX_POLL_INTERVAL)
+
+
 def run_rpc_test(
     rpc_runner_config: dict, config_path: Path, run_output_dir: Path, backend: str, skip_async_workers_cpuset: bool
 ) -> RawBackendData:
@@ -5,8 +5,7 @@ from pathlib import Path
 from subprocess import CompletedProcess
 from typing import override
 
-from yaml import safe_load
-
+from fast_yaml import safe_load
 from log import get_logger, warn_if_not_release
 from parse import RawBackendData
 
@@ -59,25 +58,13 @@ class OneExecutableTestRunner(ABC):
         if async_worker_cpuset is not None:
             argv.extend(["--async-workers-cpuset", async_worker_cpuset])
 
-        logger.debug(f"Running {argv=}")
-        result = subprocess.run(
-            argv,
-            check=False,
-            capture_output=True,
-            text=True,
-        )
-
         stdout_output_path: Path = self.run_output_dir / (backend + ".out")
-
-        with open(stdout_output_path, "w") as f:
-            print(result.stdout, file=f)
-
         stderr_output_path: Path = self.run_output_dir / (backend + ".err")
 
-        with open(stderr_output_path, "w") as f:
-            print(result.stderr, file=f)
-
-        return result
+        logger.debug(f"Running {argv=}")
+        # The output goes straight to the files, so it's never held in memory
+        with open(stdout_output_path, "w") as stdout, open(stderr_output_path, "w") as stderr:
+            return subprocess.run(argv, check=False, stdout=stdout, stderr=stderr)
 
     @abstractmethod
     def _run_test(self, backend: str, cpuset: str, async_worker_cpuset: str | None):
@@ -1,104 +1,359 @@
-import statistics
-from collections.abc import Iterable
+import math
+from array import array
+from collections.abc import Iterable, Iterator
 from typing import Any
 
+import numpy as np
 from yamlable import YamlAble, yaml_info
 
 from tree import TreeDict
 
+NO_SHARD = -1
 
-class ShardlessMetricRunMeasurement:
-    def __init__(self, run_id: int, value: Any) -> None:
-        self.run_id = run_id
-        self.value = value
+# Ints above this magnitude can't be stored exactly as doubles
+_MAX_EXACT_INT = 2**53
 
-    def __repr__(self) -> str:
-        return f"ShardlessMetricRunMeasurement(run_id={self.run_id}, value={self.value})"
 
+class MetricSamples:
+    """All samples of one metric of one backend, across runs (and shards), stored in flat typed arrays.
+
+    Numeric values are stored as doubles, with a flag telling whether they were ints, so they are restored exactly.
+    Any other value is kept aside and stored as NaN in `values`. Shardless samples have shard `NO_SHARD`.
+    """
 
-class ShardedMetricRunMeasurement:
-    def __init__(self, run_id: int, shard: int, value: Any) -> None:
-        self.run_id = run_id
-        self.value = value
-        self.shard = shard
+    __slots__ = ("is_int", "other_values", "run_ids", "shards", "values")
+
+    def __init__(self) -> None:
+        self.run_ids = array("i")
+        self.shards = array("i")
+        self.values = array("d")
+        self.is_int = array("b")
+        self.other_values: dict[int, Any] = {}
+
+    def append(self, run_id: int, shard: int, value: Any) -> None:
+        if isinstance(value, float) or (
+            isinstance(value, int) and not isinstance(value, bool) and abs(value) <= _MAX_EXACT_INT
+        ):
+            self.values.append(value)
+            self.is_int.append(isinstance(value, int))
+        else:
+            self.other_values[len(self.values)] = value
+            self.values.append(math.nan)
+            self.is_int.append(False)
+        self.run_ids.append(run_id)
+        self.shards.append(shard)
+
+    def value(self, index: int) -> Any:
+        if index in self.other_values:
+            return self.other_values[index]
+        if self.is_int[index]:
+            return int(self.values[index])
+        return self.values[index]
+
+    def numeric_values(self) -> np.ndarray:
+        """The values as doubles, with NaN in place of non-numeric values."""
+        values = np.frombuffer(self.values, dtype=np.float64)
+        if self.other_values:
+            values = values.copy()
+            for index, value in self.other_values.items():
+                values[index] = _to_float(value)
+        return values
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __iter__(self) -> Iterator[tuple[int, int, Any]]:
+        """Iterate over (run_id, shard, value) of all samples, in insertion order."""
+        for index in range(len(self.values)):
+            yield (self.run_ids[index], self.shards[index], self.value(index))
 
     def __repr__(self) -> str:
-        return f"ShardedMetricRunMeasurement(run_id={self.run_id}, shard={self.shard}, value={self.value})"
+        return f"MetricSamples({list(self)})"
+
+
+type SamplesTree = TreeDict[dict[str, MetricSamples]]
 
 
-def join_stats(
-    metrics_runs: list[dict],
-) -> tuple[
-    TreeDict[dict[str, list[ShardedMetricRunMeasurement]]], TreeDict[dict[str, list[ShardlessMetricRunMeasurement]]]
-]:
-    """Aggregate per-run metrics into a run-oriented structure.
+def join_stats(metrics_runs: list[dict]) -> tuple[SamplesTree, SamplesTree]:
+    """Aggregate per-run metrics into (sharded, shardless) metric -> backend -> samples trees.
 
     Expected input: list of dicts with keys:
-        - 'run_id': arbitrary run identifier (int or str)
+        - 'run_id': arbitrary run identifier (int)
         - 'sharded': mapping metric -> backend -> { shard: value }
         - 'shardless': mapping metric -> backend -> value
     """
 
-    sharded_out: TreeDict[dict[str, list[ShardedMetricRunMeasurement]]] = TreeDict()
-    shardless_out: TreeDict[dict[str, list[ShardlessMetricRunMeasurement]]] = TreeDict()
+    sharded_out: SamplesTree = TreeDict()
+    shardless_out: SamplesTree = TreeDict()
 
     for run in metrics_runs:
-        run_id = run["run_id"]
-        if run_id is None:
-            raise ValueError(f"Missing run_id in run entry: {run}")
+        _append_run(sharded_out, shardless_out, run)
 
-        # sharded metrics: iterate over metrics and backends and record each shard as a run entry
-        for metric_name, backend_map in run["sharded"].items():
-            if metric_name not in sharded_out:
-                sharded_out.setdefault(metric_name, {})
+    return (sharded_out, shardless_out)
+
+
+def _append_run(sharded_out: SamplesTree, shardless_out: SamplesTree, run: dict) -> None:
+    run_id = run["run_id"]
+    if run_id is None:
+        raise ValueError(f"Missing run_id in run entry: {run}")
+
+    # sharded metrics: iterate over metrics and backends and record each shard as a sample
+    for metric_name, backend_map in run["sharded"].items():
+        samples_by_backend = sharded_out.setdefault(metric_name, {})
+        for backend, shard_map in backend_map.items():
+            samples = samples_by_backend.setdefault(backend, MetricSamples())
+            for shard, value in shard_map.items():
+                samples.append(run_id, shard, value)
+
+    # shardless metrics: record single value per run per backend
+    for metric_name, backend_map in run["shardless"].items():
+        samples_by_backend = shardless_out.setdefault(metric_name, {})
+        for backend, value in backend_map.items():
+            samples_by_backend.setdefault(backend, MetricSamples()).append(run_id, NO_SHARD, value)
+
+
+class RunningStats:
+    """Count, mean, variance (with Welford's online algorithm), min and max of a stream of numeric values."""
+
+    __slots__ = ("count", "max", "mean", "min", "sum_sq_dev")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.mean = 0.0
+        # Sum of squared deviations from the mean
+        self.sum_sq_dev = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.sum_sq_dev += delta * (value - self.mean)
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+    def variance(self) -> float:
+        """Sample variance, 0 for less than two values."""
+        return self.sum_sq_dev / (self.count - 1) if self.count > 1 else 0.0
+
+    def stdev(self) -> float:
+        return math.sqrt(self.variance())
 
+    def __repr__(self) -> str:
+        return f"RunningStats(count={self.count}, mean={self.mean}, variance={self.variance()}, min={self.min}, max={self.max})"
+
+
+class StatsAggregator:
+    """Joins the runs of a benchmark into the sample store one at a time, as they finish (see `join_stats`).
+
+    Besides the samples, it keeps the running stats of the numeric values of every metric, backend and shard,
+    so that e.g. convergence can be checked after every run without going over all the samples again.
+    """
+
+    def __init__(self) -> None:
+        self.sharded_samples: SamplesTree = TreeDict()
+        self.shardless_samples: SamplesTree = TreeDict()
+        self.run_count = 0
+        # (metric path, backend, shard) -> running stats, shardless metrics have shard NO_SHARD
+        self.running_stats: dict[tuple[tuple[str, ...], str, int], RunningStats] = {}
+
+    def add_run(self, run: dict) -> None:
+        """Add a run, in the format expected by `join_stats`."""
+        _append_run(self.sharded_samples, self.shardless_samples, run)
+        for metric_name, backend_map in run["sharded"].items():
             for backend, shard_map in backend_map.items():
-                sharded_out[metric_name].setdefault(backend, [])
                 for shard, value in shard_map.items():
-                    sharded_out[metric_name][backend].append(ShardedMetricRunMeasurement(run_id, shard, value))
-
-        # shardless metrics: record single value per run per backend
+                    self._observe(metric_name, backend, shard, value)
         for metric_name, backend_map in run["shardless"].items():
-            shardless_out.setdefault(metric_name, {})
-
             for backend, value in backend_map.items():
-                shardless_out[metric_name].setdefault(backend, [])
-                shardless_out[metric_name][backend].append(ShardlessMetricRunMeasurement(run_id, value))
+                self._observe(metric_name, backend, NO_SHARD, value)
+        self.run_count += 1
+
+    def _observe(self, metric_name: tuple[str, ...], backend: str, shard: int, value: Any) -> None:
+        value = _to_float(value)
+        if math.isnan(value):
+            # Skipped like in `compute_stats`
+            return
+        key = (metric_name, backend, shard)
+        running = self.running_stats.get(key)
+        if running is None:
+            running = self.running_stats[key] = RunningStats()
+        running.add(value)
+
+    def get_samples(self) -> tuple[SamplesTree, SamplesTree]:
+        return (self.sharded_samples, self.shardless_samples)
+
+
+def split_by_run(
+    sharded_samples: SamplesTree, shardless_samples: SamplesTree
+) -> dict[int, tuple[TreeDict[dict[str, dict[int, Any]]], TreeDict[dict[str, Any]]]]:
+    """Inverse of `join_stats`: run_id -> (sharded, shardless) metrics of the run, sorted by run_id.
+
+    The sharded metrics are metric -> backend -> { shard: value }, the shardless metric -> backend -> value.
+    """
+    runs: dict[int, tuple[TreeDict[dict[str, dict[int, Any]]], TreeDict[dict[str, Any]]]] = {}
 
-    return (sharded_out, shardless_out)
+    def run_trees(run_id: int) -> tuple[TreeDict[dict[str, dict[int, Any]]], TreeDict[dict[str, Any]]]:
+        if run_id not in runs:
+            runs[run_id] = (TreeDict(), TreeDict())
+        return runs[run_id]
+
+    for metric_name, samples_by_backend in sharded_samples.items():
+        for backend, samples in samples_by_backend.items():
+            for run_id, shard, value in samples:
+                run_trees(run_id)[0].setdefault(metric_name, {}).setdefault(backend, {})[shard] = value
+
+    for metric_name, samples_by_backend in shardless_samples.items():
+        for backend, samples in samples_by_backend.items():
+            for run_id, _, value in samples:
+                run_trees(run_id)[1].setdefault(metric_name, {})[backend] = value
+
+    return {run_id: runs[run_id] for run_id in sorted(runs)}
 
 
 _SAMPLES_FOR_STDEV_AND_VARIANCE = 2
+# 2^27 + 1, splits a double into two halves whose products are exact
+_DEKKER_SPLITTER = 134217729.0
 
 
 def compute_stats(samples: Iterable[Any]) -> dict[str, Any] | None:
-    nums = []
-    for s in samples:
-        try:
-            nums.append(float(s))
-        except Exception:
-            # skip non-numeric values
-            continue
-
-    if not nums:
-        return None
-
-    stats = {}
-    stats["min"] = min(nums)
-    stats["max"] = max(nums)
-    stats["mean"] = statistics.mean(nums)
-    stats["median"] = statistics.median(nums)
-    stats["range"] = stats["max"] - stats["min"]
-    if len(nums) >= _SAMPLES_FOR_STDEV_AND_VARIANCE:
-        stats["stdev"] = statistics.stdev(nums)
-        stats["variance"] = statistics.variance(nums)
-    else:
-        stats["stdev"] = 0.0
-        stats["variance"] = 0.0
+    values = np.array([_to_float(sample) for sample in samples], dtype=np.float64)
+    return compute_stats_batch(values.reshape(-1, 1))[0]
+
+
+def compute_stats_batch(matrix: np.ndarray) -> list[dict[str, Any] | None]:
+    """Compute the stats of every column of a (samples x columns) matrix at once.
 
+    NaN entries (non-numeric or missing samples) are skipped, a column without any numeric sample has None stats.
+    The sums are computed in double-double precision, so that the mean, stdev and variance are rounded
+    the same way as by the `statistics` module, which computes them exactly.
+    """
+    matrix_columns = matrix.shape[1]
+    valid = ~np.isnan(matrix)
+    count = valid.sum(axis=0)
+    numeric_columns = np.flatnonzero(count)
+    if len(numeric_columns) == 0:
+        return [None] * matrix_columns
+
+    valid = valid[:, numeric_columns]
+    count = count[numeric_columns].astype(np.float64)
+    matrix = matrix[:, numeric_columns]
+    values = np.where(valid, matrix, 0.0)
+
+    minimum = np.where(valid, matrix, np.inf).min(axis=0)
+    maximum = np.where(valid, matrix, -np.inf).max(axis=0)
+    median = np.nanmedian(matrix, axis=0)
+
+    (mean_hi, mean_lo) = _dd_divide(*_dd_sum(values, np.zeros_like(values)), count)
+
+    (deviation_hi, deviation_lo) = _two_sum(values, -mean_hi)
+    (deviation_hi, deviation_lo) = _two_sum(deviation_hi, deviation_lo - mean_lo)
+    (square_hi, square_lo) = _two_product(deviation_hi, deviation_hi)
+    square_lo += 2 * deviation_hi * deviation_lo
+    (squares_hi, squares_lo) = _dd_sum(np.where(valid, square_hi, 0.0), np.where(valid, square_lo, 0.0))
+
+    with_variance = count >= _SAMPLES_FOR_STDEV_AND_VARIANCE
+    (variance_hi, variance_lo) = _dd_divide(squares_hi, squares_lo, np.where(with_variance, count - 1, 1.0))
+    variance_hi = np.where(with_variance, variance_hi, 0.0)
+    variance_lo = np.where(with_variance, variance_lo, 0.0)
+    stdev = _dd_sqrt(variance_hi, variance_lo)
+
+    stats: list[dict[str, Any] | None] = [None] * matrix_columns
+    for column, column_stats in zip(
+        numeric_columns.tolist(),
+        zip(
+            minimum.tolist(), maximum.tolist(), mean_hi.tolist(), median.tolist(), stdev.tolist(), variance_hi.tolist()
+        ),
+        strict=True,
+    ):
+        (min_value, max_value, mean_value, median_value, stdev_value, variance_value) = column_stats
+        stats[column] = {
+            "min": min_value,
+            "max": max_value,
+            "mean": mean_value,
+            "median": median_value,
+            "range": max_value - min_value,
+            "stdev": stdev_value,
+            "variance": variance_value,
+        }
     return stats
 
 
+def compute_grouped_stats(groups: np.ndarray, values: np.ndarray) -> dict[int, dict[str, Any] | None]:
+    """Compute the stats of the values of every group, in the order of the first sample of each group.
+
+    All the groups are reduced at once, as the columns of a (samples x groups) matrix.
+    """
+    if len(values) == 0:
+        return {}
+
+    (unique_groups, first_indices, columns) = np.unique(groups, return_index=True, return_inverse=True)
+    counts = np.bincount(columns)
+    # Row of each sample: its position among the samples of its group
+    order = np.argsort(columns, kind="stable")
+    rows = np.empty_like(columns)
+    rows[order] = np.arange(len(columns)) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    matrix = np.full((counts.max(), len(unique_groups)), np.nan)
+    matrix[rows, columns] = values
+    stats = compute_stats_batch(matrix)
+    return {int(unique_groups[column]): stats[column] for column in np.argsort(first_indices).tolist()}
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except Exception:
+        # non-numeric values are skipped
+        return math.nan
+
+
+# Error-free transformations: the results are (hi, lo) pairs with hi + lo exactly equal to the real result
+
+
+def _two_sum(a: np.ndarray, b: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    total = a + b
+    b_virtual = total - a
+    return (total, (a - (total - b_virtual)) + (b - b_virtual))
+
+
+def _split(a: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    scaled = _DEKKER_SPLITTER * a
+    hi = scaled - (scaled - a)
+    return (hi, a - hi)
+
+
+def _two_product(a: np.ndarray, b: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    product = a * b
+    (a_hi, a_lo) = _split(a)
+    (b_hi, b_lo) = _split(b)
+    return (product, ((a_hi * b_hi - product) + a_hi * b_lo + a_lo * b_hi) + a_lo * b_lo)
+
+
+def _dd_sum(hi: np.ndarray, lo: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Sum the rows of the (hi, lo) matrices."""
+    total = np.zeros(hi.shape[1])
+    error = np.zeros(hi.shape[1])
+    for row_hi, row_lo in zip(hi, lo, strict=True):
+        (total, row_error) = _two_sum(total, row_hi)
+        error += row_error + row_lo
+    return _two_sum(total, error)
+
+
+def _dd_divide(hi: np.ndarray, lo: np.ndarray, divisor: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    quotient = hi / divisor
+    (product, product_error) = _two_product(quotient, divisor)
+    return _two_sum(quotient, ((hi - product) - product_error + lo) / divisor)
+
+
+def _dd_sqrt(hi: np.ndarray, lo: np.ndarray) -> np.ndarray:
+    root = np.sqrt(hi)
+    (square, square_error) = _two_product(root, root)
+    correction = np.divide((hi - square) - square_error + lo, 2 * root, out=np.zeros_like(root), where=root > 0)
+    return root + correction
+
+
 @yaml_info("stats")
 class Stats(YamlAble):
     def __init__(
@@ -117,51 +372,42 @@ class Stats(YamlAble):
         return f"Stats(sharded_metrics={self.sharded_metrics}, shardless_metrics={self.shardless_metrics})"
 
 
-def summarize_stats(
-    sharded_metrics: TreeDict[dict[str, list[ShardedMetricRunMeasurement]]],
-    shardless_metrics: TreeDict[dict[str, list[ShardlessMetricRunMeasurement]]],
-) -> Stats:
-    sharded_stats: TreeDict[dict[str, dict[int, Any]]] = __summarize_sharded_stats(sharded_metrics)
-    shardless_stats: TreeDict[dict[str, Any]] = __summarize_shardless_stats(shardless_metrics)
-    return Stats(sharded_stats, shardless_stats)
-
-
-def __summarize_sharded_stats(
-    sharded_metrics: TreeDict[dict[str, list[ShardedMetricRunMeasurement]]],
-) -> TreeDict[dict[str, dict[int, Any]]]:
-    summarized: TreeDict[dict[str, dict[int, Any]]] = TreeDict()
+def summarize_stats(sharded_metrics: SamplesTree, shardless_metrics: SamplesTree) -> Stats:
+    """Compute the stats of every metric, backend and shard, in a single batch."""
+    sharded_stats: TreeDict[dict[str, dict[int, Any]]] = TreeDict()
+    shardless_stats: TreeDict[dict[str, Any]] = TreeDict()
 
+    entries: list[tuple[tuple[str, ...], str, MetricSamples]] = []
     for metric_name, backends in sharded_metrics.items():
-        summarized.setdefault(metric_name, {})
-        for backend_name, items in backends.items():
-            summarized[metric_name].setdefault(backend_name, {})
-            shard_map: dict[int, list[Any]] = summarized[metric_name][backend_name]
-            for item in items:
-                shard_map.setdefault(item.shard, [])
-                shard_map[item.shard].append(item.value)
-
-    for metric_name, backends in summarized.items():
-        for backend_name, shard_map in backends.items():
-            for shard, samples in shard_map.items():
-                shard_map[shard] = compute_stats(samples)
-
-    return summarized
-
-
-def __summarize_shardless_stats(
-    shardless_metrics: TreeDict[dict[str, list[ShardlessMetricRunMeasurement]]],
-) -> TreeDict[dict[str, Any]]:
-    summarized: TreeDict[dict[str, Any]] = TreeDict()
-
+        summarized = sharded_stats.setdefault(metric_name, {})
+        for backend_name, samples in backends.items():
+            summarized[backend_name] = {}
+            entries.append((metric_name, backend_name, samples))
+    sharded_entries = len(entries)
     for metric_name, backends in shardless_metrics.items():
-        summarized.setdefault(metric_name, {})
-        for backend_name, items in backends.items():
-            summarized[metric_name].setdefault(backend_name, [])
-            for item in items:
-                summarized[metric_name][backend_name].append(item.value)
-
-    for metric_name, backends in summarized.items():
+        shardless_stats.setdefault(metric_name, {})
         for backend_name, samples in backends.items():
-            backends[backend_name] = compute_stats(samples)
+            entries.append((metric_name, backend_name, samples))
+
+    if not entries:
+        return Stats(sharded_stats, shardless_stats)
+
+    # Every (entry, shard) pair is a group, shards are shifted by one to make NO_SHARD non-negative
+    stride = max((max(samples.shards, default=NO_SHARD) for _, _, samples in entries), default=NO_SHARD) + 2
+    groups = np.concatenate(
+        [
+            index * stride + np.frombuffer(samples.shards, dtype=np.int32).astype(np.int64) + 1
+            for index, (_, _, samples) in enumerate(entries)
+        ]
+    )
+    values = np.concatenate([samples.numeric_values() for _, _, samples in entries])
+
+    for group, stats in compute_grouped_stats(groups, values).items():
+        (index, shard) = divmod(group, stride)
+        (metric_name, backend_name, _) = entries[index]
+        if index < sharded_entries:
+            sharded_stats[metric_name][backend_name][shard - 1] = stats
+        else:
+            shardless_stats[metric_name][backend_name] = stats
 
-    return summarized
+    return Stats(sharded_stats, shardless_stats)
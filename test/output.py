@@ -4,7 +4,7 @@ from typing import Any
 
 from yaml import safe_dump
 
-from benchmark import compute_benchmark_summary
+from benchmark import Benchmark, BenchmarkInfo, compute_benchmark_summary
 from benchmarks import BENCHMARK_SUMMARY_FILENAME
 from parse import auto_generate_data_points, join_metrics
 from stats import join_stats
@@ -105,6 +105,34 @@ def generate_fake_benchmark_results(
         f.write(safe_dump(summary))
 
 
+def generate_fake_benchmark_summary(
+    runs_count: int,
+    shards_count: int,
+    sharded_metrics: list[list[str]],
+    shardless_metrics: list[list[str]],
+    backends: list[str],
+) -> Benchmark:
+    """Generate an in-memory benchmark summary of the given size, without writing any files."""
+    metrics_runs = []
+    for run_idx in range(runs_count):
+        backends_results = {}
+        for backend_idx, backend in enumerate(backends):
+            backend_results = generate_fake_output(
+                shards_count=shards_count,
+                sharded_metrics=sharded_metrics,
+                shardless_metrics=shardless_metrics,
+                seed=run_idx * 1000 + backend_idx,
+            )
+            backends_results[backend] = auto_generate_data_points(backend_results)
+
+        [shardless, sharded] = join_metrics(backends_results)
+        metrics_runs.append({"run_id": run_idx, "sharded": sharded, "shardless": shardless})
+
+    (combined_sharded, combined_shardless) = join_stats(metrics_runs)
+    benchmark_info = BenchmarkInfo(id="fake", type="io", properties={"iterations": runs_count})
+    return compute_benchmark_summary(combined_sharded, combined_shardless, benchmark_info)
+
+
 def generate_fake_run_results(
     output_dir: Path,
     sharded_metrics: list[list[str]],
@@ -0,0 +1,145 @@
+"""Compares building the figures of a benchmark with `generate` and with the previous plotly.express builders,
+which melted the data into a DataFrame first.
+
+Run with:
+    python -m test.perf.bench_figures [--runs 2] [--shards 64] [--metrics 50]
+"""
+
+import argparse
+import json
+import pathlib
+import tempfile
+import time
+
+import pandas as pd
+import plotly.express as px
+from plotly.graph_objs import Figure
+
+from generate import (
+    DF_BACKEND_KEY,
+    DF_ERROR_KEY,
+    DF_SHARD_KEY,
+    DF_VALUE_KEY,
+    FigureSpec,
+    PlotData,
+    PlotDataWithError,
+    PlotGenerator,
+    PlotType,
+    find_width_for_min_bar,
+)
+from metadata import BACKEND_COLORS, BACKENDS_NAMES, BenchmarkMetadataHolder
+from stats import split_by_run
+from test.output import generate_fake_benchmark_summary
+
+
+def apply_bar_template(fig: Figure, type: PlotType) -> None:
+    fig.update_layout(bargap=0.2, bargroupgap=0.1)
+    fig.update_layout(margin_autoexpand=True)
+
+    if type == PlotType.Sharded:
+        fig.update_xaxes(tickmode="linear", dtick=1)
+    else:
+        fig.update_xaxes(showticklabels=False)
+
+
+def px_make_plot(data: PlotData) -> Figure:
+    size = len(next(iter(data.data.values())))
+    per_backend_data_with_shardnum = data.data.copy()
+    per_backend_data_with_shardnum[DF_SHARD_KEY] = list(range(0, size))
+
+    df = pd.DataFrame(per_backend_data_with_shardnum)
+    df_long = df.melt(
+        id_vars=DF_SHARD_KEY, value_vars=list(data.data.keys()), var_name=DF_BACKEND_KEY, value_name=DF_VALUE_KEY
+    )
+
+    labels = {
+        DF_SHARD_KEY: "Shard" if data.type == PlotType.Sharded else "",
+        DF_VALUE_KEY: data.value_axis_label,
+        DF_BACKEND_KEY: "Backend",
+    }
+    fig = px.bar(
+        df_long,
+        x=DF_SHARD_KEY,
+        y=DF_VALUE_KEY,
+        color=DF_BACKEND_KEY,
+        color_discrete_map=BACKEND_COLORS,
+        category_orders={DF_BACKEND_KEY: BACKENDS_NAMES},
+        labels=labels,
+        barmode="group",
+        title=data.display_name,
+    )
+
+    apply_bar_template(fig, data.type)
+    fig.update_traces(texttemplate="%{y}", textposition="outside")
+    return fig
+
+
+def px_make_plot_with_error(data: PlotDataWithError) -> Figure:
+    labels = {
+        DF_SHARD_KEY: "Shard" if data.type == PlotType.Sharded else "",
+        DF_VALUE_KEY: data.value_axis_label,
+        DF_BACKEND_KEY: "Backend",
+    }
+
+    df = pd.DataFrame(data.rows)
+    fig = px.bar(
+        df,
+        x=DF_SHARD_KEY if data.type == PlotType.Sharded else DF_BACKEND_KEY,
+        y=DF_VALUE_KEY,
+        error_y=DF_ERROR_KEY,
+        barmode="group",
+        title=data.display_name,
+        labels=labels,
+        color=DF_BACKEND_KEY,
+        color_discrete_map=BACKEND_COLORS,
+        category_orders={DF_BACKEND_KEY: BACKENDS_NAMES},
+    )
+    fig.update_layout(width=find_width_for_min_bar(len(df[DF_SHARD_KEY].unique()), len(df[DF_BACKEND_KEY].unique())))
+    apply_bar_template(fig, data.type)
+    return fig
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=2)
+    parser.add_argument("--shards", type=int, default=64)
+    parser.add_argument("--metrics", type=int, default=50, help="number of sharded metrics")
+    args = parser.parse_args()
+
+    sharded_metrics = [["group", f"metric_{i}"] for i in range(args.metrics)]
+    shardless_metrics = [["total", f"metric_{i}"] for i in range(args.metrics // 10)]
+    summary = generate_fake_benchmark_summary(
+        args.runs, args.shards, sharded_metrics, shardless_metrics, backends=["io_uring", "epoll"]
+    )
+
+    plot_generator = PlotGenerator(BenchmarkMetadataHolder())
+    with tempfile.TemporaryDirectory() as tmp:
+        build_dir = pathlib.Path(tmp)
+        plot_generator.schedule_graphs_for_summary("bench", summary.get_stats(), build_dir)
+        for run_id, (sharded, shardless) in split_by_run(*summary.get_samples()).items():
+            plot_generator.schedule_graphs_for_run("bench", sharded, shardless, build_dir / f"run_{run_id}")
+    plots = [spec.data for spec in plot_generator.specs]
+    # Only the figures are built, nothing is rendered
+    plot_generator.specs = []
+
+    start = time.perf_counter()
+    expected = [
+        px_make_plot_with_error(plot) if isinstance(plot, PlotDataWithError) else px_make_plot(plot) for plot in plots
+    ]
+    px_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    figs = [FigureSpec(plot, []).build() for plot in plots]
+    go_time = time.perf_counter() - start
+
+    for plot, expected_fig, fig in zip(plots, expected, figs, strict=True):
+        assert json.loads(fig.to_json()) == json.loads(expected_fig.to_json()), plot.display_name
+
+    print(
+        f"{len(plots)} figures, plotly.express: {px_time:.2f}s, graph_objects: {go_time:.2f}s, "
+        f"speedup: {px_time / go_time:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""Measures the memory used by the per-run view of a large benchmark summary, before and after dumping it to YAML,
+and the peak memory of loading the summary back, with and without its runs.
+
+Run with:
+    python -m test.perf.bench_memory [--runs 10] [--shards 256] [--metrics 50]
+"""
+
+import argparse
+import gc
+import io
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from benchmark import Benchmark
+from fast_yaml import safe_dump
+from test.output import generate_fake_benchmark_summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--shards", type=int, default=256)
+    parser.add_argument("--metrics", type=int, default=50, help="number of sharded metrics")
+    args = parser.parse_args()
+
+    sharded_metrics = [["group", f"metric_{i}"] for i in range(args.metrics)]
+    shardless_metrics = [["total", f"metric_{i}"] for i in range(args.metrics // 10)]
+    backends = ["io_uring", "epoll"]
+    summary = generate_fake_benchmark_summary(args.runs, args.shards, sharded_metrics, shardless_metrics, backends)
+    measurements = args.runs * len(backends) * (args.shards * len(sharded_metrics) + len(shardless_metrics))
+    yaml_text = safe_dump(summary)
+    gc.collect()
+
+    tracemalloc.start()
+    runs = summary.get_runs()
+    view_size = tracemalloc.get_traced_memory()[0]
+    print(
+        f"per-run view of {measurements} measurements: {view_size / 2**20:.1f} MiB "
+        f"({view_size / measurements:.0f} B per measurement)"
+    )
+
+    # Dumping must not grow the objects of the view (e.g. by materializing their __dict__)
+    safe_dump(runs)
+    gc.collect()
+    print(f"per-run view after dumping it: {tracemalloc.get_traced_memory()[0] / 2**20:.1f} MiB")
+    del runs
+    gc.collect()
+
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    Benchmark.load_from_file(io.StringIO(yaml_text))
+    print(f"peak while loading the summary: {(tracemalloc.get_traced_memory()[1] - base) / 2**20:.1f} MiB")
+    tracemalloc.stop()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        summary.dump_split(Path(tmp) / "metrics_summary.yaml", Path(tmp) / "runs.yaml")
+        gc.collect()
+        tracemalloc.start()
+        with open(Path(tmp) / "metrics_summary.yaml") as f:
+            Benchmark.load_from_file(f)
+        print(f"peak while loading the summary without its runs: {tracemalloc.get_traced_memory()[1] / 2**20:.1f} MiB")
+        tracemalloc.stop()
+
+
+if __name__ == "__main__":
+    main()
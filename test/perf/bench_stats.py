@@ -0,0 +1,81 @@
+"""Compares the batched `stats.summarize_stats` with computing the stats of every shard with the `statistics` module.
+
+Run with:
+    python -m test.perf.bench_stats [--runs 20] [--shards 64] [--metrics 200]
+"""
+
+import argparse
+import statistics
+import time
+from typing import Any
+
+from stats import SamplesTree, summarize_stats
+from test.output import generate_fake_benchmark_summary
+
+
+def statistics_stats(values: list[float]) -> dict[str, Any]:
+    return {
+        "min": min(values),
+        "max": max(values),
+        "mean": statistics.mean(values),
+        "median": statistics.median(values),
+        "range": max(values) - min(values),
+        "stdev": statistics.stdev(values) if len(values) > 1 else 0.0,
+        "variance": statistics.variance(values) if len(values) > 1 else 0.0,
+    }
+
+
+def summarize_with_statistics(sharded: SamplesTree, shardless: SamplesTree) -> tuple[dict, dict]:
+    sharded_stats: dict = {}
+    for metric_name, backends in sharded.items():
+        for backend_name, samples in backends.items():
+            shard_map: dict[int, list[float]] = {}
+            for _, shard, value in samples:
+                shard_map.setdefault(shard, []).append(float(value))
+            sharded_stats[(metric_name, backend_name)] = {
+                shard: statistics_stats(values) for shard, values in shard_map.items()
+            }
+
+    shardless_stats: dict = {}
+    for metric_name, backends in shardless.items():
+        for backend_name, samples in backends.items():
+            shardless_stats[(metric_name, backend_name)] = statistics_stats([float(value) for _, _, value in samples])
+
+    return (sharded_stats, shardless_stats)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--shards", type=int, default=64)
+    parser.add_argument("--metrics", type=int, default=200, help="number of sharded metrics")
+    args = parser.parse_args()
+
+    sharded_metrics = [["group", f"metric_{i}"] for i in range(args.metrics)]
+    shardless_metrics = [["total", f"metric_{i}"] for i in range(args.metrics // 10)]
+    (sharded_samples, shardless_samples) = generate_fake_benchmark_summary(
+        args.runs, args.shards, sharded_metrics, shardless_metrics, backends=["io_uring", "epoll"]
+    ).get_samples()
+
+    start = time.perf_counter()
+    (expected_sharded, expected_shardless) = summarize_with_statistics(sharded_samples, shardless_samples)
+    statistics_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    stats = summarize_stats(sharded_samples, shardless_samples)
+    batched_time = time.perf_counter() - start
+
+    for metric_name, backends in stats.get_sharded_metrics().items():
+        for backend_name, shards in backends.items():
+            assert shards == expected_sharded[(metric_name, backend_name)], (metric_name, backend_name)
+    for metric_name, backends in stats.get_shardless_metrics().items():
+        for backend_name, metric_stats in backends.items():
+            assert metric_stats == expected_shardless[(metric_name, backend_name)], (metric_name, backend_name)
+
+    print(
+        f"statistics: {statistics_time:.2f}s, batched: {batched_time:.2f}s, speedup: {statistics_time / batched_time:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Compares loading a large benchmark summary from `metrics_summary.yaml` and from its columnar copy.
+
+Run with:
+    python -m test.perf.bench_summary_load [--runs 20] [--shards 64] [--metrics 200]
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+from benchmark import Benchmark
+from benchmarks import BENCHMARK_SUMMARY_FILENAME, dump_summary
+from columnar_summary import COLUMNAR_SUMMARY_FILENAME, load_columnar_summary
+from test.output import generate_fake_benchmark_summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--shards", type=int, default=64)
+    parser.add_argument("--metrics", type=int, default=200, help="number of sharded metrics")
+    args = parser.parse_args()
+
+    sharded_metrics = [["group", f"metric_{i}"] for i in range(args.metrics)]
+    shardless_metrics = [["total", f"metric_{i}"] for i in range(args.metrics // 10)]
+    summary = generate_fake_benchmark_summary(
+        args.runs, args.shards, sharded_metrics, shardless_metrics, backends=["io_uring", "epoll"]
+    )
+
+    with tempfile.TemporaryDirectory() as tmp:
+        benchmark_dir = Path(tmp)
+        dump_summary(benchmark_dir, summary)
+        yaml_path = benchmark_dir / BENCHMARK_SUMMARY_FILENAME
+        columnar_path = benchmark_dir / COLUMNAR_SUMMARY_FILENAME
+        print(f"yaml: {yaml_path.stat().st_size / 2**20:.1f} MiB, npz: {columnar_path.stat().st_size / 2**20:.1f} MiB")
+
+        start = time.perf_counter()
+        with open(yaml_path) as f:
+            Benchmark.load_from_file(f)
+        yaml_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        load_columnar_summary(columnar_path)
+        columnar_time = time.perf_counter() - start
+
+    print(
+        f"yaml load: {yaml_time:.2f}s, columnar load: {columnar_time:.2f}s, speedup: {yaml_time / columnar_time:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Compares loading and dumping a large benchmark summary with PyYAML and with `fast_yaml`.
+
+Run with:
+    python -m test.perf.bench_yaml [--runs 20] [--shards 64] [--metrics 200]
+"""
+
+import argparse
+import time
+from collections.abc import Callable
+from typing import Any
+
+import yaml
+
+import fast_yaml
+from test.output import generate_fake_benchmark_summary
+
+
+def measure(name: str, fn: Callable[[], Any]) -> tuple[float, Any]:
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<24} {elapsed:8.2f}s")
+    return elapsed, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--shards", type=int, default=64)
+    parser.add_argument("--metrics", type=int, default=200, help="number of sharded metrics")
+    args = parser.parse_args()
+
+    sharded_metrics = [["group", f"metric_{i}"] for i in range(args.metrics)]
+    shardless_metrics = [["total", f"metric_{i}"] for i in range(args.metrics // 10)]
+    summary = generate_fake_benchmark_summary(
+        args.runs, args.shards, sharded_metrics, shardless_metrics, backends=["io_uring", "epoll"]
+    )
+
+    print(f"libyaml available: {fast_yaml.HAS_LIBYAML}")
+    (pyyaml_dump, text) = measure("yaml.safe_dump", lambda: yaml.safe_dump(summary))
+    (fast_dump, fast_text) = measure("fast_yaml.safe_dump", lambda: fast_yaml.safe_dump(summary))
+    print(f"summary size: {len(text) / 2**20:.1f} MiB")
+
+    (pyyaml_load, _) = measure("yaml.safe_load", lambda: yaml.safe_load(text))
+    (fast_load, _) = measure("fast_yaml.safe_load", lambda: fast_yaml.safe_load(fast_text))
+
+    print(f"dump speedup: {pyyaml_dump / fast_dump:.1f}x, load speedup: {pyyaml_load / fast_load:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
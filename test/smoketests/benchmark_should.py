@@ -1,8 +1,7 @@
 from glob import escape
 from pathlib import Path
 
-from yaml import safe_load
-
+from fast_yaml import safe_load
 from parse import load_data
 
 
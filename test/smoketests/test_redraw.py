@@ -83,3 +83,71 @@ def test_redraw_suite(invoke_main, tmp_path, suite_name: str, runs_count: int):
         generate_summary_graphs=True,
         generate_pdf=True,
     )
+
+
+def test_redraw_suite_with_render_jobs(invoke_main, tmp_path):
+    suite_name = "rpc_vecho"
+    runs_count = 2
+    generate_fake_benchmark_results(
+        tmp_path, suite_name, runs_count, SHARDED_METRICS_PATHS, SHARDLESS_METRICS_PATHS, BACKENDS_NAMES
+    )
+
+    _, _ = invoke_main(["redraw_suite", "--dir", str(tmp_path), "--render-jobs", "3"])
+
+    benchmark_should = BenchmarkShould(
+        output_dir=tmp_path,
+        backends=["io_uring"],
+        sharded_metrics=SHARDED_METRICS_PATHS,
+        shardless_metrics=SHARDLESS_METRICS_PATHS,
+    )
+    benchmark_should.verify_media_for_benchmarks(
+        benchmarks=[{"name": suite_name, "iterations": runs_count}],
+        generate_graphs=True,
+        generate_summary_graphs=True,
+        generate_pdf=True,
+    )
+
+
+def test_redraw_suite_with_agg_render_engine(invoke_main, tmp_path):
+    suite_name = "rpc_vecho"
+    runs_count = 2
+    generate_fake_benchmark_results(
+        tmp_path, suite_name, runs_count, SHARDED_METRICS_PATHS, SHARDLESS_METRICS_PATHS, BACKENDS_NAMES
+    )
+
+    _, _ = invoke_main(["redraw_suite", "--dir", str(tmp_path), "--render-engine", "agg", "--render-jobs", "2"])
+
+    benchmark_should = BenchmarkShould(
+        output_dir=tmp_path,
+        backends=["io_uring"],
+        sharded_metrics=SHARDED_METRICS_PATHS,
+        shardless_metrics=SHARDLESS_METRICS_PATHS,
+    )
+    benchmark_should.verify_media_for_benchmarks(
+        benchmarks=[{"name": suite_name, "iterations": runs_count}],
+        generate_graphs=True,
+        generate_summary_graphs=True,
+        generate_pdf=True,
+    )
+
+
+def test_redraw_suite_skips_up_to_date_graphs(invoke_main, tmp_path):
+    generate_fake_benchmark_results(
+        tmp_path, "rpc_vecho", 2, SHARDED_METRICS_PATHS, SHARDLESS_METRICS_PATHS, BACKENDS_NAMES
+    )
+    _, _ = invoke_main(["redraw_suite", "--dir", str(tmp_path)])
+    images = sorted((tmp_path / "rpc_vecho").rglob("*.svg"))
+    assert images
+    mtimes = {image: image.stat().st_mtime_ns for image in images}
+
+    _, _ = invoke_main(["redraw_suite", "--dir", str(tmp_path)])
+    assert {image: image.stat().st_mtime_ns for image in images} == mtimes
+
+    # A missing graph is rendered again, the others are kept
+    images[0].unlink()
+    _, _ = invoke_main(["redraw_suite", "--dir", str(tmp_path)])
+    assert images[0].is_file()
+    assert all(image.stat().st_mtime_ns == mtimes[image] for image in images[1:])
+
+    _, _ = invoke_main(["redraw_suite", "--dir", str(tmp_path), "--force"])
+    assert all(image.stat().st_mtime_ns != mtimes[image] for image in images[1:])
@@ -22,6 +22,8 @@ def _write_executable(path: Path, content: str):
 def generate_dummy_script(output: str, where_to_print_args: Path) -> str:
     return textwrap.dedent(f"""\
 #!/usr/bin/env python3
+import signal
+import socket
 import sys
 print("client: running")
 with open(r"{where_to_print_args}", "w") as f:
@@ -30,7 +32,15 @@ with open(r"{where_to_print_args}", "w") as f:
     f.flush()
 print("---")
 print('''{output}''')
-print("...")""")
+print("...")
+if "--listen" in sys.argv:
+    # The rpc server listens until it's terminated, the servers of concurrent tests share the port
+    server = socket.socket()
+    server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    server.bind((sys.argv[sys.argv.index("--listen") + 1], int(sys.argv[sys.argv.index("--port") + 1])))
+    server.listen()
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    signal.pause()""")
 
 
 sharded_metrics = [["latency", "p50"], ["latency", "p99"], ["throughput"]]
@@ -38,7 +48,11 @@ shardless_metrics = [["errors", "total"]]
 shards_count = 3
 
 
-def generate_simple_config(name: str, output_dir: Path, rpc_tester_path: Path, io_tester_path: Path) -> dict:
+def generate_simple_config(
+    name: str, output_dir: Path, rpc_tester_path: Path, io_tester_path: Path, first_cpu: int = 0
+) -> dict:
+    app_cpuset = str(first_cpu)
+    async_worker_cpuset = str(first_cpu + 1)
     cfg = {
         "config_version": 2,
         "output_dir": str(output_dir / name.replace(".yaml", "")),
@@ -47,19 +61,19 @@ def generate_simple_config(name: str, output_dir: Path, rpc_tester_path: Path, i
         "io": {
             "tester_path": str(io_tester_path),
             "storage_dir": str(output_dir / "storage"),
-            "asymmetric_app_cpuset": "0",
-            "asymmetric_async_worker_cpuset": "1",
-            "symmetric_cpuset": "0",
+            "asymmetric_app_cpuset": app_cpuset,
+            "asymmetric_async_worker_cpuset": async_worker_cpuset,
+            "symmetric_cpuset": app_cpuset,
         },
         "rpc": {
             "tester_path": str(rpc_tester_path),
             "ip_address": "127.0.0.1",
-            "asymmetric_server_app_cpuset": "0",
-            "asymmetric_server_async_worker_cpuset": "1",
-            "symmetric_server_cpuset": "0",
-            "asymmetric_client_app_cpuset": "0",
-            "asymmetric_client_async_worker_cpuset": "1",
-            "symmetric_client_cpuset": "0",
+            "asymmetric_server_app_cpuset": app_cpuset,
+            "asymmetric_server_async_worker_cpuset": async_worker_cpuset,
+            "symmetric_server_cpuset": app_cpuset,
+            "asymmetric_client_app_cpuset": app_cpuset,
+            "asymmetric_client_async_worker_cpuset": async_worker_cpuset,
+            "symmetric_client_cpuset": app_cpuset,
         },
         "scylla": {},
     }
@@ -177,6 +191,142 @@ def test_suite_runs_io_and_rpc(
         )
 
 
+def test_suite_runs_configs_in_parallel(invoke_main, tmp_path):
+    # Arrange: two configs with disjoint cpusets, storage directories and listen ports
+    base = tmp_path / "suite_test"
+    base.mkdir()
+
+    tester = base / "dummy_tester.py"
+    fake_output = generate_fake_output(
+        shards_count=shards_count,
+        sharded_metrics=sharded_metrics,
+        shardless_metrics=shardless_metrics,
+    )
+    _write_executable(tester, generate_dummy_script(safe_dump(fake_output), base / "args.txt"))
+
+    __prepare_env_dump_dir(base)
+
+    configs_on_disk = []
+    for i in range(2):
+        config_name = f"config_{i}.yaml"
+        cfg = generate_simple_config(
+            name=config_name,
+            output_dir=base / "output",
+            rpc_tester_path=tester,
+            io_tester_path=tester,
+            first_cpu=2 * i,
+        )
+        cfg["io"]["storage_dir"] = str(base / "output" / f"storage_{i}")
+        cfg["rpc"]["remote_listen_port"] = str(9200 + i)
+        cfg["rpc"]["remote_connect_port"] = str(9200 + i)
+
+        cfg_path = base / config_name
+        with open(cfg_path, "w") as f:
+            f.write(safe_dump(cfg))
+        configs_on_disk.append({"path": cfg_path, "content": cfg})
+
+    suite = [
+        {"type": "io", "name": "test_io", "iterations": 2, "config": {}},
+        {"type": "rpc", "name": "test_rpc", "iterations": 1, "config": {}},
+    ]
+
+    benchmark_path = base / "suite.yaml"
+    with open(benchmark_path, "w") as f:
+        f.write(safe_dump(suite))
+
+    # Act
+    _, _ = invoke_main(
+        ["suite", "--benchmark", str(benchmark_path), "--config"]
+        + [str(config["path"]) for config in configs_on_disk]
+        + ["--parallel-configs"]
+    )
+
+    # Assert
+    timestamp_dir = None
+    for config in configs_on_disk:
+        timestamp_dir, out_dir = __assert_for_config(
+            name=config["path"].stem,
+            expected_out_dir=config["content"]["output_dir"],
+            timestamp=timestamp_dir,
+        )
+
+        benchmark_should = BenchmarkShould(
+            output_dir=out_dir,
+            backends=config["content"]["backends"],
+            sharded_metrics=sharded_metrics,
+            shardless_metrics=shardless_metrics,
+        )
+        benchmark_should.verify_summary_files_exists_for_benchmarks(benchmarks=suite)
+        benchmark_should.verify_outputs_for_benchmarks(benchmarks=suite)
+
+
+def test_suite_resume_rejects_benchmark(invoke_main, tmp_path, capsys):
+    for argv in (
+        ["--resume", str(tmp_path), "--benchmark", "suite.yaml"],
+        ["--benchmark", "suite.yaml", "--resume", str(tmp_path)],
+    ):
+        with pytest.raises(SystemExit) as exc_info:
+            invoke_main(["suite", *argv])
+
+        assert exc_info.value.code != 0
+        assert "not allowed with argument --resume" in capsys.readouterr().err
+
+
+def test_suite_resume_skips_journaled_runs(invoke_main, tmp_path):
+    # Arrange: run the suite once, so that every run is recorded in the journal
+    base = tmp_path / "suite_test"
+    base.mkdir()
+
+    tester = base / "dummy_tester.py"
+    fake_output = generate_fake_output(
+        shards_count=shards_count,
+        sharded_metrics=sharded_metrics,
+        shardless_metrics=shardless_metrics,
+    )
+    _write_executable(tester, generate_dummy_script(safe_dump(fake_output), base / "args.txt"))
+
+    __prepare_env_dump_dir(base)
+
+    cfg = generate_simple_config(
+        name="config.yaml",
+        output_dir=base / "output",
+        rpc_tester_path=tester,
+        io_tester_path=tester,
+    )
+    cfg_path = base / "config.yaml"
+    with open(cfg_path, "w") as f:
+        f.write(safe_dump(cfg))
+
+    suite = [
+        {"type": "io", "name": "test_io", "iterations": 2, "config": {}},
+        {"type": "rpc", "name": "test_rpc", "iterations": 1, "config": {}},
+    ]
+    benchmark_path = base / "suite.yaml"
+    with open(benchmark_path, "w") as f:
+        f.write(safe_dump(suite))
+
+    _, _ = invoke_main(["suite", "--benchmark", str(benchmark_path), "--config", str(cfg_path)])
+    _, out_dir = __assert_for_config(name=cfg_path.stem, expected_out_dir=cfg["output_dir"], timestamp=None)
+
+    # Any tester run from now on would fail the suite
+    _write_executable(tester, "#!/usr/bin/env python3\nimport sys\nsys.exit(1)\n")
+    for summary_file in Path(out_dir).glob("*/metrics_summary.yaml"):
+        summary_file.unlink()
+
+    # Act
+    _, _ = invoke_main(["suite", "--resume", out_dir])
+
+    # Assert
+    benchmark_should = BenchmarkShould(
+        output_dir=out_dir,
+        backends=cfg["backends"],
+        sharded_metrics=sharded_metrics,
+        shardless_metrics=shardless_metrics,
+    )
+    benchmark_should.verify_summary_files_exists_for_benchmarks(benchmarks=suite)
+    benchmark_should.verify_outputs_for_benchmarks(benchmarks=suite)
+
+
 def __prepare_env_dump_dir(base: Path) -> Path:
     # initialize a git repo in base so dump_environment's git log succeeds
     subprocess.run(["git", "init"], cwd=base, check=True)
@@ -0,0 +1,70 @@
+import json
+import struct
+
+import plotly.io as pio
+
+import generate
+from agg_renderer import AggRenderer, draw_figure
+
+
+def png_size(path) -> tuple[int, int]:
+    header = path.read_bytes()[:24]
+    assert header.startswith(b"\x89PNG")
+    return struct.unpack(">II", header[16:24])
+
+
+def make_figures() -> list:
+    sharded = generate.PlotData(generate.PlotType.Sharded, "sharded", {"io_uring": [1, 2, 3], "epoll": [2.5, 1, 0]})
+    total = generate.PlotData(generate.PlotType.Shardless, "total", {"io_uring": [6], "epoll": [3.5]})
+    rows = [
+        {"Backend": backend, "Value": value, "Error": 0.5, "Shard": None}
+        for backend, value in [("io_uring", 2.0), ("epoll", 3.0), ("custom", 1.0)]
+    ]
+    shardless = generate.PlotDataWithError(generate.PlotType.Shardless, "shardless", rows, "ops")
+    return [generate.make_plot(sharded), generate.make_plot(total), generate.make_plot_with_error(shardless)]
+
+
+def test_figures_are_written_in_all_formats(tmp_path) -> None:
+    figs = make_figures()
+    file_paths = [[tmp_path / f"{index}.png", tmp_path / f"{index}.svg"] for index in range(len(figs))]
+
+    agg_renderer = AggRenderer()
+    agg_renderer.write_images([fig.to_dict() for fig in figs], file_paths)
+
+    assert agg_renderer.rendered_images == sum(map(len, file_paths))
+    for png_path, svg_path in file_paths:
+        assert png_size(png_path) == (pio.defaults.default_width, pio.defaults.default_height)
+        assert svg_path.read_text().lstrip().startswith("<?xml")
+
+
+def test_figures_from_json_are_drawn_the_same(tmp_path) -> None:
+    for fig in make_figures():
+        from_dict = draw_figure(fig.to_dict())
+        from_json = draw_figure(json.loads(fig.to_json()))
+
+        assert [text.get_text() for text in from_dict.axes[0].texts] == [
+            text.get_text() for text in from_json.axes[0].texts
+        ]
+        assert [patch.get_height() for patch in from_dict.axes[0].patches] == [
+            patch.get_height() for patch in from_json.axes[0].patches
+        ]
+        assert [patch.get_x() for patch in from_dict.axes[0].patches] == [
+            patch.get_x() for patch in from_json.axes[0].patches
+        ]
+
+
+def test_bars_are_grouped_by_category() -> None:
+    (sharded, _, shardless) = make_figures()
+
+    ax = draw_figure(sharded.to_dict()).axes[0]
+    assert [tick.get_text() for tick in ax.get_xticklabels()] == ["0", "1", "2"]
+    # epoll is drawn first, left of io_uring in every shard
+    assert [patch.get_height() for patch in ax.patches] == [2.5, 1, 0, 1, 2, 3]
+    assert ax.patches[0].get_x() < ax.patches[3].get_x() < ax.patches[1].get_x()
+    assert [text.get_text() for text in ax.texts] == ["2.5", "1", "0", "1", "2", "3"]
+
+    ax = draw_figure(shardless.to_dict()).axes[0]
+    assert ax.get_xticks().size == 0
+    assert ax.get_ylabel() == "ops"
+    # Every backend is its own category
+    assert [round(patch.get_x() + patch.get_width() / 2) for patch in ax.patches] == [0, 1, 2]
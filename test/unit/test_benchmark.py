@@ -0,0 +1,64 @@
+from pathlib import Path
+
+import pytest
+
+from benchmark import Benchmark
+from fast_yaml import safe_dump, safe_load
+from test.output import generate_fake_benchmark_summary
+
+OLD_STRUCTURE_PATH = Path(__file__).parent / "assets" / "benchmark_old_structure.yaml"
+
+
+def make_summary() -> Benchmark:
+    return generate_fake_benchmark_summary(
+        runs_count=3,
+        shards_count=4,
+        sharded_metrics=[["latency", "p50"], ["latency", "p99"]],
+        shardless_metrics=[["errors", "total"]],
+        backends=["io_uring", "epoll"],
+    )
+
+
+def test_split_dump_loads_runs_lazily(tmp_path):
+    summary = make_summary()
+    summary.dump_split(tmp_path / "summary.yaml", tmp_path / "runs.yaml")
+
+    header = safe_load((tmp_path / "summary.yaml").read_text())
+    assert isinstance(header, Benchmark)
+    assert "runs:" not in (tmp_path / "summary.yaml").read_text()
+
+    with open(tmp_path / "summary.yaml") as f:
+        loaded = Benchmark.load_from_file(f)
+    assert loaded.get_run_count() == summary.get_run_count()
+    assert safe_dump(loaded.get_stats()) == safe_dump(summary.get_stats())
+
+    # The runs file is only read when the measurements are accessed
+    (tmp_path / "runs.yaml").rename(tmp_path / "moved.yaml")
+    with pytest.raises(FileNotFoundError):
+        loaded.get_samples()
+    (tmp_path / "moved.yaml").rename(tmp_path / "runs.yaml")
+    assert safe_dump(loaded) == safe_dump(summary)
+
+
+def test_lazy_inline_runs_match_eager_loading():
+    with open(OLD_STRUCTURE_PATH) as f:
+        eager = Benchmark.load_from_file(f)
+    with open(OLD_STRUCTURE_PATH) as f:
+        lazy = Benchmark.load_from_file(f, lazy_runs=True)
+
+    assert lazy._runs_loader is not None
+    assert lazy.get_run_count() == eager.get_run_count()
+    assert safe_dump(lazy) == safe_dump(eager)
+    assert lazy._runs_loader is None
+
+
+def test_load_rejects_other_documents(tmp_path):
+    path = tmp_path / "list.yaml"
+    path.write_text(safe_dump([1, 2]))
+
+    with open(path) as f, pytest.raises(TypeError):
+        Benchmark.load_from_file(f)
+
+    path.write_text("benchmark: {id: a}\nbenchmark: {id: b}\n")
+    with open(path) as f, pytest.raises(ValueError, match="Duplicate key"):
+        Benchmark.load_from_file(f)
@@ -0,0 +1,87 @@
+import pytest
+
+import benchmarks
+import generate
+from benchmark import BenchmarkInfo
+from benchmarks import BenchmarkOutputRenderer, BenchmarkSuiteRunner, load_summary
+from generate import PlotGenerator
+from metadata import BenchmarkMetadataHolder
+from test.output import generate_fake_benchmark_summary
+from test.unit.test_config_scheduling import make_config
+
+
+class RecordingProcess:
+    """Records the arguments of the config processes instead of starting them."""
+
+    started: list[tuple] = []
+
+    def __init__(self, target, args: tuple, name: str) -> None:
+        self.args = args
+        self.name = name
+        self.exitcode = 0
+
+    def start(self) -> None:
+        RecordingProcess.started.append(self.args)
+
+    def join(self) -> None:
+        pass
+
+
+def test_concurrent_configs_render_off_the_testers_of_all_configs(monkeypatch) -> None:
+    RecordingProcess.started = []
+    monkeypatch.setattr(benchmarks.multiprocessing, "Process", RecordingProcess)
+    monkeypatch.setattr(benchmarks.os, "sched_getaffinity", lambda pid: set(range(12)))
+    configs = [
+        ("first", make_config("0-1", "2", "3", "/tmp/a", "1")),
+        ("second", make_config("4-5", "6", "7", "/tmp/b", "2")),
+    ]
+    plotting_config = BenchmarkSuiteRunner.PlottingConfig(
+        generate_graphs=False, generate_summary_graph=False, generate_pdf=False
+    )
+
+    benchmarks._run_configs_in_parallel(
+        configs, plotting_config, BenchmarkMetadataHolder(), "[{type: io}, {type: rpc}]", "info"
+    )
+
+    # Both configs run in one batch
+    assert [args[3] for args in RecordingProcess.started] == [config for _, config in configs]
+    assert [args[0].render_cpus for args in RecordingProcess.started] == [{8, 9, 10, 11}] * 2
+    assert plotting_config.render_cpus is None
+
+
+def make_samples() -> tuple:
+    return generate_fake_benchmark_summary(
+        runs_count=2, shards_count=2, sharded_metrics=[["latency"]], shardless_metrics=[["total"]], backends=["epoll"]
+    ).get_samples()
+
+
+def test_partial_summary_is_only_dumped(tmp_path) -> None:
+    samples = make_samples()
+    plotting_config = BenchmarkSuiteRunner.PlottingConfig(
+        generate_graphs=True, generate_summary_graph=True, generate_pdf=True
+    )
+    renderer = BenchmarkOutputRenderer(plotting_config, PlotGenerator(BenchmarkMetadataHolder()))
+    info = BenchmarkInfo(id="bench", type="io", properties={"iterations": 2, "partial": True})
+
+    assert renderer(*samples, info, tmp_path) is None
+
+    assert load_summary(tmp_path).get_info().properties["partial"]
+    assert not list(tmp_path.glob("**/*.svg"))
+    assert not list(tmp_path.glob("**/*.pdf"))
+
+
+@pytest.mark.parametrize(("render_engine", "image_formats"), [("kaleido", [".svg", ".png"]), ("agg", [".svg"])])
+def test_pdf_gets_pngs_of_svgs_with_text(tmp_path, monkeypatch, render_engine, image_formats) -> None:
+    written = []
+    monkeypatch.setattr(
+        generate, "_write_images", lambda fig_dicts, file_paths, render_engine: written.extend(file_paths) or []
+    )
+    plotting_config = BenchmarkSuiteRunner.PlottingConfig(
+        generate_graphs=False, generate_summary_graph=True, generate_pdf=True, render_engine=render_engine
+    )
+    renderer = BenchmarkOutputRenderer(plotting_config, PlotGenerator(BenchmarkMetadataHolder()))
+
+    renderer(*make_samples(), BenchmarkInfo(id="bench", type="io", properties={"iterations": 2}), tmp_path)
+
+    assert written
+    assert all([path.suffix for path in paths] == image_formats for paths in written)
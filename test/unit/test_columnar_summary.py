@@ -0,0 +1,81 @@
+import os
+
+import pytest
+
+from benchmark import BenchmarkInfo, compute_benchmark_summary
+from benchmarks import BENCHMARK_SUMMARY_FILENAME, dump_summary, load_summary
+from columnar_summary import (
+    COLUMNAR_SUMMARY_FILENAME,
+    UnsupportedSummaryError,
+    load_columnar_summary,
+    write_columnar_summary,
+)
+from fast_yaml import safe_dump
+from stats import join_stats
+from test.output import generate_fake_benchmark_summary
+from tree import TreeDict
+
+
+def make_summary():
+    return generate_fake_benchmark_summary(
+        runs_count=3,
+        shards_count=4,
+        sharded_metrics=[["latency", "p50"], ["latency", "p99"]],
+        shardless_metrics=[["errors", "total"]],
+        backends=["io_uring", "epoll"],
+    )
+
+
+def make_summary_with_values(value) -> object:
+    shardless: TreeDict = TreeDict()
+    shardless[("errors",)] = {"epoll": value}
+    sharded: TreeDict = TreeDict()
+    sharded[("requests",)] = {"epoll": {0: 10, 1: 12}}
+    (combined_sharded, combined_shardless) = join_stats([{"run_id": 0, "sharded": sharded, "shardless": shardless}])
+    return compute_benchmark_summary(combined_sharded, combined_shardless, BenchmarkInfo(id="ints", type="rpc"))
+
+
+def test_round_trip_matches_yaml(tmp_path):
+    summary = make_summary()
+    path = tmp_path / COLUMNAR_SUMMARY_FILENAME
+
+    write_columnar_summary(summary, path)
+
+    assert safe_dump(load_columnar_summary(path)) == safe_dump(summary)
+
+
+def test_int_values_stay_ints(tmp_path):
+    summary = make_summary_with_values(3)
+    path = tmp_path / COLUMNAR_SUMMARY_FILENAME
+
+    write_columnar_summary(summary, path)
+
+    assert safe_dump(load_columnar_summary(path)) == safe_dump(summary)
+
+
+def test_non_numeric_values_are_not_supported(tmp_path):
+    with pytest.raises(UnsupportedSummaryError):
+        write_columnar_summary(make_summary_with_values("n/a"), tmp_path / COLUMNAR_SUMMARY_FILENAME)
+
+
+def test_load_summary_prefers_fresh_columnar_copy(tmp_path):
+    summary = make_summary()
+    dump_summary(tmp_path, summary)
+    assert (tmp_path / COLUMNAR_SUMMARY_FILENAME).is_file()
+
+    # Without the YAML, the columnar copy alone is enough
+    yaml_text = (tmp_path / BENCHMARK_SUMMARY_FILENAME).read_text()
+    (tmp_path / BENCHMARK_SUMMARY_FILENAME).unlink()
+    assert safe_dump(load_summary(tmp_path)) == safe_dump(summary)
+
+    # A YAML newer than the columnar copy wins
+    other = make_summary_with_values(1.5)
+    (tmp_path / BENCHMARK_SUMMARY_FILENAME).write_text(safe_dump(other))
+    columnar_mtime = (tmp_path / COLUMNAR_SUMMARY_FILENAME).stat().st_mtime
+    os.utime(tmp_path / BENCHMARK_SUMMARY_FILENAME, (columnar_mtime + 10, columnar_mtime + 10))
+    assert safe_dump(load_summary(tmp_path)) == safe_dump(other)
+
+    # Without the columnar copy, the YAML is used
+    (tmp_path / BENCHMARK_SUMMARY_FILENAME).write_text(yaml_text)
+    (tmp_path / COLUMNAR_SUMMARY_FILENAME).unlink()
+    assert safe_dump(load_summary(tmp_path)) == safe_dump(summary)
@@ -0,0 +1,78 @@
+from config_scheduling import LOCAL_HOST, build_conflict_graph, config_resources, local_cpus, schedule_batches
+
+
+def make_config(io_cpus: str, rpc_server_cpus: str, rpc_client_cpus: str, storage_dir: str, port: str) -> dict:
+    return {
+        "io": {
+            "storage_dir": storage_dir,
+            "asymmetric_app_cpuset": io_cpus,
+            "asymmetric_async_worker_cpuset": io_cpus,
+            "symmetric_cpuset": io_cpus,
+        },
+        "rpc": {
+            "ip_address": "127.0.0.1",
+            "remote_listen_port": port,
+            "asymmetric_server_app_cpuset": rpc_server_cpus,
+            "asymmetric_server_async_worker_cpuset": rpc_server_cpus,
+            "symmetric_server_cpuset": rpc_server_cpus,
+            "asymmetric_client_app_cpuset": rpc_client_cpus,
+            "asymmetric_client_async_worker_cpuset": rpc_client_cpus,
+            "symmetric_client_cpuset": rpc_client_cpus,
+        },
+        "scylla": {},
+    }
+
+
+def test_config_resources_only_include_used_sections() -> None:
+    config = make_config("0-1", "2", "3", "/tmp/storage", "9123")
+
+    io_resources = config_resources(config, ["io"])
+    assert local_cpus(io_resources) == {0, 1}
+    assert any(resource[0] == "storage_dir" for resource in io_resources)
+    assert not any(resource[0] == "listen" for resource in io_resources)
+
+    rpc_resources = config_resources(config, ["rpc"])
+    assert local_cpus(rpc_resources) == {2, 3}
+    assert ("listen", LOCAL_HOST, "127.0.0.1", "9123") in rpc_resources
+
+
+def test_config_resources_on_remote_host_are_not_local() -> None:
+    config = make_config("0-1", "2", "3", "/tmp/storage", "9123")
+    config["io"]["remote"] = "10.0.0.1:8000"
+
+    assert local_cpus(config_resources(config, ["io"])) == set()
+
+
+def test_build_conflict_graph() -> None:
+    resources = [
+        config_resources(make_config("0-1", "2", "3", "/tmp/a", "1"), ["io", "rpc"]),
+        config_resources(make_config("4-5", "6", "7", "/tmp/b", "2"), ["io", "rpc"]),
+        config_resources(make_config("1", "8", "9", "/tmp/c", "3"), ["io", "rpc"]),
+    ]
+
+    assert build_conflict_graph(resources) == [{2}, set(), {0}]
+
+
+def test_shared_storage_dir_and_listen_address_conflict() -> None:
+    shared_storage = [
+        config_resources(make_config("0", "1", "2", "/tmp/a", "1"), ["io"]),
+        config_resources(make_config("3", "4", "5", "/tmp/a", "2"), ["io"]),
+    ]
+    shared_port = [
+        config_resources(make_config("0", "1", "2", "/tmp/a", "1"), ["rpc"]),
+        config_resources(make_config("3", "4", "5", "/tmp/b", "1"), ["rpc"]),
+    ]
+
+    assert schedule_batches(shared_storage) == [[0], [1]]
+    assert schedule_batches(shared_port) == [[0], [1]]
+
+
+def test_schedule_batches_keeps_order() -> None:
+    resources = [
+        config_resources(make_config("0-6", "8-14", "0-6", "/tmp/a", "1"), ["io", "rpc"]),
+        config_resources(make_config("16-22", "24-30", "16-22", "/tmp/b", "2"), ["io", "rpc"]),
+        config_resources(make_config("0-6", "8-14", "0-6", "/tmp/c", "3"), ["io", "rpc"]),
+        config_resources(make_config("32", "33", "34", "/tmp/d", "4"), ["io", "rpc"]),
+    ]
+
+    assert schedule_batches(resources) == [[0, 1, 3], [2]]
@@ -0,0 +1,50 @@
+import pytest
+import yaml
+
+import fast_yaml
+from benchmark import Benchmark
+from test.output import generate_fake_benchmark_summary
+from tree import TreeDict
+
+
+def test_duplicate_keys_are_rejected() -> None:
+    with pytest.raises(ValueError, match="Duplicate key 'a'"):
+        fast_yaml.safe_load("b:\n  a: 1\n  a: 2\n")
+
+
+def test_pyyaml_loader_is_left_as_it_is() -> None:
+    # Only the loader of fast_yaml rejects duplicate keys, importing the tree doesn't change yaml.SafeLoader
+    assert yaml.safe_load("a: 1\na: 2\n") == {"a": 1 + 1}
+
+
+def test_tree_dict_round_trip() -> None:
+    tree: TreeDict[int] = TreeDict()
+    tree[("io", "read", "256kb")] = 123
+    tree[("io", "write")] = 7
+
+    loaded = fast_yaml.safe_load(fast_yaml.safe_dump(tree))
+
+    assert isinstance(loaded, TreeDict)
+    assert list(loaded.items()) == list(tree.items())
+
+
+def test_compatible_with_pyyaml() -> None:
+    summary = generate_fake_benchmark_summary(
+        runs_count=2,
+        shards_count=2,
+        sharded_metrics=[["latency", "p50"]],
+        shardless_metrics=[["errors"]],
+        backends=["epoll"],
+    )
+
+    dumped = fast_yaml.safe_dump(summary)
+    assert dumped == yaml.safe_dump(summary)
+
+    loaded = fast_yaml.safe_load(dumped)
+    assert isinstance(loaded, Benchmark)
+    assert repr(loaded) == repr(yaml.safe_load(dumped))
+
+
+def test_unknown_tag_is_reported() -> None:
+    with pytest.raises(TypeError, match="unknown_tag"):
+        fast_yaml.safe_load("!yamlable/unknown_tag {a: 1}\n")
@@ -0,0 +1,108 @@
+import pytest
+
+import generate
+from generate import PlotGenerator
+from metadata import BACKEND_COLORS, BACKENDS_NAMES, BenchmarkMetadataHolder
+from render_cache import RenderCache
+from test.output import generate_fake_benchmark_summary
+
+
+def make_stats():
+    return generate_fake_benchmark_summary(
+        runs_count=2,
+        shards_count=3,
+        sharded_metrics=[["latency", "p50"], ["throughput"]],
+        shardless_metrics=[["errors", "total"]],
+        backends=["io_uring", "epoll"],
+    ).get_stats()
+
+
+def test_summary_graph_is_built_once_for_all_formats(tmp_path) -> None:
+    stats = make_stats()
+    plot_generator = PlotGenerator(BenchmarkMetadataHolder())
+    plot_generator.schedule_graphs_for_summary("bench", stats, tmp_path, image_formats=("svg", ".PNG", "svg"))
+
+    assert len(plot_generator.specs) == len(stats.get_sharded_metrics()) + len(stats.get_shardless_metrics())
+    for spec in plot_generator.specs:
+        assert [path.suffix for path in spec.file_paths] == [".svg", ".png"]
+        assert spec.file_paths[0].with_suffix(".png") == spec.file_paths[1]
+
+    # Nothing to render in the test
+    plot_generator.specs = []
+
+
+def test_figures_are_built_and_written_in_batches(tmp_path, monkeypatch) -> None:
+    written: list[list[str]] = []
+    monkeypatch.setattr(generate, "_RENDER_BATCH_SIZE", 2)
+    monkeypatch.setattr(
+        generate,
+        "_write_images",
+        lambda fig_dicts, file_paths, render_engine: (
+            written.append([fig_dict["layout"]["title"]["text"] for fig_dict in fig_dicts]) or []
+        ),
+    )
+
+    plot_generator = PlotGenerator(BenchmarkMetadataHolder())
+    plot_generator.schedule_graphs_for_summary("bench", make_stats(), tmp_path)
+    titles = [spec.data.display_name for spec in plot_generator.specs]
+    plot_generator.plot()
+
+    assert written == [titles[:2], titles[2:]]
+    assert plot_generator.specs == []
+
+
+def test_failed_images_are_not_recorded_in_the_render_cache(tmp_path, monkeypatch) -> None:
+    def write_images(fig_dicts, file_paths, render_engine) -> list:
+        for paths in file_paths:
+            for path in paths:
+                path.write_text("image")
+        # The first figure fails in one of its formats
+        return [file_paths[0][1]]
+
+    monkeypatch.setattr(generate, "_write_images", write_images)
+    render_cache = RenderCache(tmp_path / "render_cache.yaml")
+    plot_generator = PlotGenerator(BenchmarkMetadataHolder(), render_cache=render_cache)
+    plot_generator.schedule_graphs_for_summary("bench", make_stats(), tmp_path, image_formats=("svg", "png"))
+    file_paths = [spec.file_paths for spec in plot_generator.specs]
+    plot_generator.plot()
+
+    # The saved index has every image but the failed one
+    loaded = RenderCache(render_cache.path)
+    assert len(loaded) == sum(map(len, file_paths)) - 1
+    assert file_paths[0][1].relative_to(tmp_path).as_posix() not in loaded.hashes
+
+
+def test_unsupported_image_format(tmp_path) -> None:
+    plot_generator = PlotGenerator(BenchmarkMetadataHolder())
+    with pytest.raises(ValueError):
+        plot_generator.schedule_graphs_for_summary("bench", make_stats(), tmp_path, image_formats=("svg", "bmp"))
+
+
+def test_traces_follow_backend_order_and_colors() -> None:
+    data = generate.PlotData(
+        generate.PlotType.Sharded, "bench", {"custom": [1, 2], "io_uring": [3, 4], "epoll": [5.5, 6]}, "ops"
+    )
+    fig = generate.make_plot(data)
+
+    assert [trace.name for trace in fig.data] == ["epoll", "io_uring", "custom"]
+    assert fig.data[0].marker.color == BACKEND_COLORS["epoll"]
+    assert fig.data[1].marker.color == BACKEND_COLORS["io_uring"]
+    assert fig.data[2].marker.color not in BACKEND_COLORS.values()
+    # The values of all backends share a type
+    assert fig.data[1].y.dtype == fig.data[0].y.dtype
+    assert list(fig.data[1].x) == [0, 1]
+    assert fig.layout.yaxis.title.text == "ops"
+    assert fig.layout.barmode == "group"
+
+
+def test_shardless_summary_has_backend_categories() -> None:
+    rows = [
+        {"Backend": backend, "Value": value, "Error": 1.0, "Shard": None}
+        for backend, value in [("io_uring", 2.0), ("custom", 3.0)]
+    ]
+    fig = generate.make_plot_with_error(generate.PlotDataWithError(generate.PlotType.Shardless, "bench", rows))
+
+    assert [trace.name for trace in fig.data] == ["io_uring", "custom"]
+    assert [list(trace.x) for trace in fig.data] == [["io_uring"], ["custom"]]
+    assert list(fig.layout.xaxis.categoryarray) == [*BACKENDS_NAMES, "custom"]
+    assert fig.layout.width == generate.find_width_for_min_bar(1, len(rows))
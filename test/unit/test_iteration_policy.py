@@ -0,0 +1,97 @@
+import math
+
+import pytest
+
+from iteration_policy import (
+    STOP_REASON_CONVERGED,
+    STOP_REASON_FIXED,
+    STOP_REASON_MAX_ITERATIONS,
+    IterationPolicy,
+)
+from stats import StatsAggregator
+from tree import TreeDict
+
+
+def make_run(run_id: int, throughput: float, latency_per_shard: dict[int, float]) -> dict:
+    shardless: TreeDict = TreeDict()
+    shardless[("throughput",)] = {"io_uring": throughput}
+    sharded: TreeDict = TreeDict()
+    sharded[("latency",)] = {"io_uring": latency_per_shard}
+    return {"run_id": run_id, "shardless": shardless, "sharded": sharded}
+
+
+def aggregate(runs: list[dict]) -> StatsAggregator:
+    aggregator = StatsAggregator()
+    for run in runs:
+        aggregator.add_run(run)
+    return aggregator
+
+
+def test_fixed_iterations() -> None:
+    policy = IterationPolicy.from_config(3)
+    runs = [make_run(i, 100.0, {0: 1.0}) for i in range(3)]
+
+    assert policy.is_fixed()
+    assert policy.stop_reason(aggregate(runs[:2])) is None
+    assert policy.stop_reason(aggregate(runs)) == STOP_REASON_FIXED
+    assert IterationPolicy.from_config(None).stop_reason(aggregate(runs[:1])) == STOP_REASON_FIXED
+
+
+def test_stops_when_converged() -> None:
+    policy = IterationPolicy.from_config({"min": 3, "max": 20, "target_rel_ci": 0.02})
+    stable_runs = [make_run(i, 100.0 + i % 2, {0: 10.0, 1: 10.0}) for i in range(4)]
+
+    assert policy.stop_reason(aggregate(stable_runs[:2])) is None
+    assert policy.stop_reason(aggregate(stable_runs[:3])) == STOP_REASON_CONVERGED
+    assert policy.relative_ci(aggregate(stable_runs[:3])) < 0.02  # noqa: PLR2004
+
+
+def test_stops_at_max_iterations_when_noisy() -> None:
+    policy = IterationPolicy.from_config({"min": 2, "max": 4, "target_rel_ci": 0.02})
+    noisy_runs = [make_run(i, 100.0, {0: 10.0 * (i + 1)}) for i in range(4)]
+
+    assert policy.stop_reason(aggregate(noisy_runs[:3])) is None
+    assert policy.stop_reason(aggregate(noisy_runs)) == STOP_REASON_MAX_ITERATIONS
+
+
+def test_only_selected_metrics_are_tracked() -> None:
+    noisy_latency = [make_run(i, 100.0, {0: 10.0 * (i + 1)}) for i in range(3)]
+
+    tracking_all = IterationPolicy.from_config({"min": 2, "max": 10, "target_rel_ci": 0.02})
+    tracking_throughput = IterationPolicy.from_config(
+        {"min": 2, "max": 10, "target_rel_ci": 0.02, "metrics": ["throughput"]}
+    )
+
+    assert tracking_all.stop_reason(aggregate(noisy_latency)) is None
+    assert tracking_throughput.stop_reason(aggregate(noisy_latency)) == STOP_REASON_CONVERGED
+
+
+def test_zero_mean_with_spread_never_converges() -> None:
+    policy = IterationPolicy.from_config({"min": 2, "max": 10, "target_rel_ci": 0.02})
+    runs = [make_run(i, (-1.0) ** i, {0: 1.0}) for i in range(2)]
+
+    assert math.isinf(policy.relative_ci(aggregate(runs)))
+
+
+def test_invalid_bounds() -> None:
+    with pytest.raises(ValueError):
+        IterationPolicy.from_config({"min": 5, "max": 2, "target_rel_ci": 0.02})
+    with pytest.raises(ValueError):
+        IterationPolicy.from_config({"min": 1, "max": 2, "target_rel_ci": 0.02})
+
+
+def test_missing_fields() -> None:
+    with pytest.raises(ValueError, match="'target_rel_ci'"):
+        IterationPolicy.from_config({"min": 2, "max": 4})
+    with pytest.raises(ValueError, match="'min'"):
+        IterationPolicy.from_config({"max": 4, "target_rel_ci": 0.02})
+
+
+def test_unknown_tracked_metric() -> None:
+    policy = IterationPolicy.from_config(
+        {"min": 2, "max": 10, "target_rel_ci": 0.02, "metrics": ["throughput", "througput"]}
+    )
+
+    assert policy.stop_reason(aggregate([])) is None
+    with pytest.raises(ValueError, match="througput"):
+        policy.stop_reason(aggregate([make_run(0, 100.0, {0: 1.0})]))
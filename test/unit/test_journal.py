@@ -0,0 +1,59 @@
+from journal import SuiteJournal
+from parse import auto_generate_data_points
+from test.output import generate_fake_output
+
+SHARDED_METRICS = [["latency", "p50"], ["throughput"]]
+SHARDLESS_METRICS = [["errors", "total"]]
+
+
+def make_data_points(seed: int):
+    return auto_generate_data_points(
+        generate_fake_output(
+            shards_count=3, sharded_metrics=SHARDED_METRICS, shardless_metrics=SHARDLESS_METRICS, seed=seed
+        )
+    )
+
+
+def test_recorded_entries_are_loaded_back(tmp_path) -> None:
+    journal_path = tmp_path / "journal.yaml"
+    journal = SuiteJournal(journal_path)
+    journal.record("io", 0, "io_uring", make_data_points(1))
+    journal.record("io", 1, "io_uring", make_data_points(2))
+
+    loaded = SuiteJournal(journal_path)
+
+    assert set(loaded.entries) == {("io", 0, "io_uring"), ("io", 1, "io_uring")}
+    assert loaded.get("io", 2, "io_uring") is None
+    assert loaded.get("io", 0, "epoll") is None
+
+    (expected_shardless, expected_sharded) = make_data_points(2)
+    (shardless, sharded) = loaded.get("io", 1, "io_uring")
+    assert dict(shardless.items()) == dict(expected_shardless.items())
+    assert dict(sharded.items()) == dict(expected_sharded.items())
+
+
+def test_incomplete_last_entry_is_ignored(tmp_path) -> None:
+    journal_path = tmp_path / "journal.yaml"
+    journal = SuiteJournal(journal_path)
+    journal.record("io", 0, "io_uring", make_data_points(1))
+    journal.record("io", 1, "io_uring", make_data_points(2))
+
+    # Simulate a crash in the middle of writing the second entry
+    content = journal_path.read_text()
+    journal_path.write_text(content[: len(content) - 40])
+
+    loaded = SuiteJournal(journal_path)
+
+    assert set(loaded.entries) == {("io", 0, "io_uring")}
+
+
+def test_journal_is_resumed_again_after_an_incomplete_last_entry(tmp_path) -> None:
+    journal_path = tmp_path / "journal.yaml"
+    SuiteJournal(journal_path).record("io", 0, "io_uring", make_data_points(1))
+    with open(journal_path, "a") as f:
+        f.write("--- !yamlable/")
+
+    resumed = SuiteJournal(journal_path)
+    resumed.record("io", 1, "io_uring", make_data_points(2))
+
+    assert set(SuiteJournal(journal_path).entries) == {("io", 0, "io_uring"), ("io", 1, "io_uring")}
@@ -1,6 +1,17 @@
+import random
+import re
+
 import pytest
 
-from metadata import BenchmarkMetadata, MetricMetadata, MetricPlotMetadata, _asterix_compare
+from metadata import (
+    BenchmarkMetadata,
+    BenchmarkMetadataHolder,
+    MetricMetadata,
+    MetricPlotMetadata,
+    _asterix_compare,
+    _asterix_resolver,
+    _WildcardMatcher,
+)
 from tree import TreeDict
 
 
@@ -132,3 +143,45 @@ def test_asterix_compare() -> None:
     assert _asterix_compare("*", "a") is True
     assert _asterix_compare("*", "*") is True
     assert _asterix_compare("a", "b") is False
+
+
+def test_wildcard_matcher_matches_tree_get() -> None:
+    rng = random.Random(7)
+    keys = ["a", "b", "c", "*"]
+    for _ in range(200):
+        tree = TreeDict[MetricMetadata]()
+        for index in range(rng.randint(1, 8)):
+            path = tuple(rng.choice(keys) for _ in range(rng.randint(1, 3)))
+            try:
+                tree[path] = MetricMetadata(MetricPlotMetadata(f"title_{index}", "Value"))
+            except TypeError:
+                # The path goes through an existing leaf
+                continue
+        matcher = _WildcardMatcher(tree.get_metrics())
+
+        for _ in range(20):
+            path = tuple(rng.choice([*keys, "d"]) for _ in range(rng.randint(1, 4)))
+            try:
+                expected = tree.get(path, _asterix_compare, _asterix_resolver)
+            except ValueError as e:
+                with pytest.raises(ValueError, match=re.escape(str(e))):
+                    matcher.match(path)
+                continue
+            assert matcher.match(path) is expected
+
+
+def test_holder_memoizes_resolved_metadata() -> None:
+    sharded = TreeDict[MetricMetadata]()
+    sharded[("io", "*")] = MetricMetadata(MetricPlotMetadata("IO", "Value"))
+    holder = BenchmarkMetadataHolder()
+    holder.set_metadata("io", BenchmarkMetadata(sharded_metrics=sharded))
+
+    metadata = holder.get_sharded_metric_metadata_or_default("io", ("io", "read"))
+
+    assert metadata.plotting.title == "IO"
+    assert holder.get_sharded_metric_metadata_or_default("io", ("io", "read")) is metadata
+    assert holder.get_shardless_metric_metadata_or_default("io", ("io", "read")).plotting.title == "io_read"
+    assert holder.get_sharded_metric_metadata_or_default(None, ("io", "read")).plotting.title == "io_read"
+
+    holder.set_metadata("io", BenchmarkMetadata())
+    assert holder.get_sharded_metric_metadata_or_default("io", ("io", "read")).plotting.title == "io_read"
@@ -1,4 +1,7 @@
-from parse import auto_generate_data_points
+import pytest
+from yaml import safe_dump
+
+from parse import auto_generate_data_points, load_data_from_file
 from test.output import generate_fake_output
 
 
@@ -42,6 +45,28 @@ def test_auto_generate_data_points():
         )
 
 
+def test_load_data_from_file(tmp_path):
+    fake_output = generate_fake_output(
+        shards_count=2,
+        sharded_metrics=[["latency", "p50"]],
+        shardless_metrics=[["errors", "total"]],
+        seed=123,
+    )
+    raw_output = "client: running\n" * 1000 + "---\n" + safe_dump(fake_output) + "...\n" + "trailing log line\n"
+    output_path = tmp_path / "io_uring.out"
+    output_path.write_text(raw_output)
+
+    assert load_data_from_file(output_path) == fake_output
+
+
+def test_load_data_from_file_without_payload(tmp_path):
+    output_path = tmp_path / "io_uring.out"
+    output_path.write_text("client: running\n")
+
+    with pytest.raises(ValueError):
+        load_data_from_file(output_path)
+
+
 def walk_tree(data, path):
     for key in path:
         data = data[key]
@@ -0,0 +1,159 @@
+import pytest
+from pypdf import PdfReader, PdfWriter
+
+import generate
+from agg_renderer import AggRenderer
+from pdf_summary import PdfRenderOptions, find_chart_images, generate_benchmark_summary_pdf, merge_pdfs, parse_pdf_grid
+
+
+def write_charts(directory, formats: list[str], names: tuple[str, ...] = ("a", "b")) -> None:
+    figs = [
+        generate.make_plot(generate.PlotData(generate.PlotType.Sharded, name, {"io_uring": [1, 2], "epoll": [2, 1]}))
+        for name in names
+    ]
+    AggRenderer().write_images(
+        [fig.to_dict() for fig in figs],
+        [[directory / f"{name}.{image_format}" for image_format in formats] for name in names],
+    )
+
+
+def page_images(pdf_path) -> list[int]:
+    return [len(page.images) for page in PdfReader(pdf_path).pages]
+
+
+def test_svg_charts_are_embedded_as_vector_graphics(tmp_path) -> None:
+    write_charts(tmp_path, ["svg", "png"])
+    images = find_chart_images(tmp_path)
+    assert [path.name for path in images] == ["a.png", "a.svg", "b.png", "b.svg"]
+
+    pdf_path = generate_benchmark_summary_pdf(
+        benchmark_name="bench", images=images, output_pdf=tmp_path / "summary.pdf"
+    )
+
+    # Title page and a page per chart, drawn without raster images
+    assert page_images(pdf_path) == [0, 0, 0]
+
+
+def test_png_charts_are_used_without_svgs(tmp_path) -> None:
+    write_charts(tmp_path, ["png"])
+
+    pdf_path = generate_benchmark_summary_pdf(
+        benchmark_name="bench", images=find_chart_images(tmp_path), output_pdf=tmp_path / "summary.pdf"
+    )
+
+    assert page_images(pdf_path) == [0, 1, 1]
+
+
+def test_broken_svg_falls_back_to_png(tmp_path) -> None:
+    write_charts(tmp_path, ["svg", "png"])
+    (tmp_path / "a.svg").write_text("<svg")
+
+    pdf_path = generate_benchmark_summary_pdf(
+        benchmark_name="bench", images=find_chart_images(tmp_path), output_pdf=tmp_path / "summary.pdf"
+    )
+
+    assert page_images(pdf_path) == [0, 1, 0]
+
+
+def test_svg_charts_with_text_fall_back_to_png(tmp_path) -> None:
+    # Kaleido writes the labels as text, which fpdf2 would leave out
+    write_charts(tmp_path, ["svg", "png"])
+    (tmp_path / "a.svg").write_text(
+        '<svg xmlns="http://www.w3.org/2000/svg" width="700" height="500" viewBox="0 0 700 500"><text x="10" y="20">latency</text></svg>'
+    )
+
+    pdf_path = generate_benchmark_summary_pdf(
+        benchmark_name="bench", images=find_chart_images(tmp_path), output_pdf=tmp_path / "summary.pdf"
+    )
+    assert page_images(pdf_path) == [0, 1, 0]
+
+    # Without a PNG, the SVG is embedded without its text
+    (tmp_path / "a.png").unlink()
+    pdf_path = generate_benchmark_summary_pdf(
+        benchmark_name="bench", images=find_chart_images(tmp_path), output_pdf=tmp_path / "summary.pdf"
+    )
+    assert page_images(pdf_path) == [0, 0, 0]
+
+
+def outline_titles(outline: list) -> list:
+    return [outline_titles(item) if isinstance(item, list) else item.title for item in outline]
+
+
+def test_merged_pdf_has_a_bookmark_per_benchmark_and_chart(tmp_path) -> None:
+    pdfs = []
+    for name in ("first", "second"):
+        (tmp_path / name).mkdir()
+        write_charts(tmp_path / name, ["png"])
+        pdfs.append(
+            generate_benchmark_summary_pdf(
+                benchmark_name=name,
+                images=find_chart_images(tmp_path / name),
+                output_pdf=tmp_path / name / "summary.pdf",
+            )
+        )
+    # A PDF without bookmarks is named after its benchmark's directory
+    (tmp_path / "third").mkdir()
+    writer = PdfWriter()
+    writer.add_blank_page(100, 100)
+    writer.write(tmp_path / "third" / "summary.pdf")
+    pdfs.append(tmp_path / "third" / "summary.pdf")
+
+    merged = merge_pdfs(input_pdfs=pdfs, output_pdf=tmp_path / "suite_summary.pdf")
+
+    reader = PdfReader(merged)
+    assert len(reader.pages) == 3 + 3 + 1
+    assert outline_titles(reader.outline) == ["first", ["a", "b"], "second", ["a", "b"], "third"]
+    assert [reader.get_destination_page_number(item) for item in reader.outline[1]] == [1, 2]
+    # The charts are the same in both benchmarks
+    assert merged.stat().st_size < sum(pdf.stat().st_size for pdf in pdfs[:2])
+    charts = {image.idnum for page in reader.pages for image in page.get("/Resources", {}).get("/XObject", {}).values()}
+    assert len(charts) == len(reader.outline[1])
+
+
+def test_pdf_grid_is_parsed_as_rows_and_columns() -> None:
+    assert parse_pdf_grid("1x1") == (1, 1)
+    assert parse_pdf_grid("2X3") == (2, 3)
+    for value in ("2", "0x3", "2x", "axb"):
+        with pytest.raises(ValueError):
+            parse_pdf_grid(value)
+
+
+@pytest.mark.parametrize("image_format", ["svg", "png"])
+def test_charts_are_laid_out_in_a_grid(tmp_path, image_format) -> None:
+    names = tuple(f"latency_p{index}" for index in range(8))
+    write_charts(tmp_path, [image_format], names)
+
+    pdf_path = generate_benchmark_summary_pdf(
+        benchmark_name="bench",
+        images=find_chart_images(tmp_path),
+        output_pdf=tmp_path / "summary.pdf",
+        options=PdfRenderOptions(grid_rows=2, grid_columns=3),
+    )
+
+    reader = PdfReader(pdf_path)
+    # Title page, then 6 + 2 charts; wide charts fit larger on landscape pages
+    assert len(reader.pages) == 1 + 2
+    assert [page.mediabox.width > page.mediabox.height for page in reader.pages] == [False, True, True]
+    assert outline_titles(reader.outline) == ["bench", list(names)]
+    assert [reader.get_destination_page_number(item) for item in reader.outline[1]] == [1] * 6 + [2] * 2
+    # Every chart has a caption with its name
+    assert all(name in reader.pages[1].extract_text() for name in names[:6])
+    assert all(name in reader.pages[2].extract_text() for name in names[6:])
+
+
+@pytest.mark.parametrize("grid", [(1, 1), (1, 2)])
+def test_chart_names_are_unescaped(tmp_path, grid) -> None:
+    names = ("latency[p99]*", "rate&amp?")
+    write_charts(tmp_path, ["png"], tuple(generate.sanitize_filename(name) for name in names))
+
+    pdf_path = generate_benchmark_summary_pdf(
+        benchmark_name="bench",
+        images=find_chart_images(tmp_path),
+        output_pdf=tmp_path / "summary.pdf",
+        options=PdfRenderOptions(grid_rows=grid[0], grid_columns=grid[1]),
+    )
+
+    reader = PdfReader(pdf_path)
+    assert outline_titles(reader.outline) == ["bench", sorted(names)]
+    if grid != (1, 1):
+        assert all(name in reader.pages[1].extract_text() for name in names)
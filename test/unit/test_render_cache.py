@@ -0,0 +1,41 @@
+from render_cache import RenderCache
+
+
+def test_recorded_hashes_are_loaded_back(tmp_path) -> None:
+    cache_path = tmp_path / "render_cache.yaml"
+    image = tmp_path / "bench" / "metric.svg"
+    image.parent.mkdir()
+    image.write_text("<svg/>")
+    figure_hash = RenderCache.figure_hash('{"data": []}', image)
+
+    cache = RenderCache(cache_path)
+    assert not cache.is_fresh(image, figure_hash)
+    cache.record(image, figure_hash)
+    cache.save()
+
+    loaded = RenderCache(cache_path)
+    assert loaded.hashes == {"bench/metric.svg": figure_hash}
+    assert loaded.is_fresh(image, figure_hash)
+    assert not loaded.is_fresh(image, RenderCache.figure_hash('{"data": [1]}', image))
+    assert not RenderCache(cache_path, load=False).is_fresh(image, figure_hash)
+
+    image.unlink()
+    assert not loaded.is_fresh(image, figure_hash)
+
+
+def test_hash_depends_on_the_image_format(tmp_path) -> None:
+    fig_json = '{"data": []}'
+
+    assert RenderCache.figure_hash(fig_json, tmp_path / "a.svg") == RenderCache.figure_hash(
+        fig_json, tmp_path / "b.svg"
+    )
+    assert RenderCache.figure_hash(fig_json, tmp_path / "a.svg") != RenderCache.figure_hash(
+        fig_json, tmp_path / "a.png"
+    )
+
+
+def test_malformed_index_is_ignored(tmp_path) -> None:
+    cache_path = tmp_path / "render_cache.yaml"
+    cache_path.write_text("- not a mapping\n")
+
+    assert len(RenderCache(cache_path)) == 0
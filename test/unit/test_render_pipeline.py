@@ -0,0 +1,73 @@
+import os
+import time
+
+import pytest
+
+from render_pipeline import BackgroundWorker
+
+
+def square(x: int) -> int:
+    return x * x
+
+
+def fail_on_odd(x: int) -> int:
+    if x % 2 == 1:
+        raise ValueError(f"odd value {x}")
+    return x
+
+
+def current_affinity() -> set[int]:
+    return os.sched_getaffinity(0)
+
+
+def test_results_are_returned_in_submission_order() -> None:
+    worker = BackgroundWorker(square)
+    worker.start()
+    for x in range(10):
+        worker.submit(x)
+
+    assert worker.close() == [x * x for x in range(10)]
+
+
+def test_failures_are_reported_after_draining() -> None:
+    worker = BackgroundWorker(fail_on_odd)
+    worker.start()
+    for x in range(4):
+        worker.submit(x)
+
+    with pytest.raises(RuntimeError, match="odd value 3"):
+        worker.close()
+
+
+def test_worker_is_pinned_to_given_cpus() -> None:
+    cpu = min(os.sched_getaffinity(0))
+    worker = BackgroundWorker(current_affinity, cpus={cpu})
+    worker.start()
+    worker.submit()
+
+    assert worker.close() == [{cpu}]
+
+
+def test_tasks_are_copied_when_submitted() -> None:
+    worker = BackgroundWorker(len)
+    worker.start()
+    values = [1, 2]
+    worker.submit(values)
+    values.append(3)
+    worker.submit(values)
+
+    assert worker.close() == [2, 3]
+
+
+def test_terminate_drops_pending_tasks() -> None:
+    task_seconds = 10
+    worker = BackgroundWorker(time.sleep)
+    worker.start()
+    for _ in range(task_seconds):
+        worker.submit(task_seconds)
+
+    start = time.monotonic()
+    worker.terminate()
+
+    assert time.monotonic() - start < task_seconds
+    assert worker.close() == []
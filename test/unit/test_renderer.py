@@ -0,0 +1,93 @@
+import pytest
+
+import renderer
+from renderer import KaleidoRenderer
+
+
+class FakeKaleido:
+    """Writes the format of the spec to its path instead of rendering the figure."""
+
+    sessions: list["FakeKaleido"] = []
+
+    def __init__(self, **kwargs) -> None:
+        self.is_open = False
+        FakeKaleido.sessions.append(self)
+
+    async def open(self) -> None:
+        self.is_open = True
+
+    async def close(self) -> None:
+        self.is_open = False
+
+    async def write_fig_from_object(self, specs: list[dict]) -> tuple:
+        errors = []
+        for spec in specs:
+            if spec["fig"].get("broken"):
+                raise RuntimeError("Render failed")
+            # Like Kaleido without cancel_on_error, the error is returned and the image isn't written
+            if spec["fig"].get("invalid"):
+                errors.append(ValueError("Invalid figure"))
+                continue
+            spec["path"].write_text(spec["opts"]["format"])
+        return tuple(errors)
+
+
+@pytest.fixture(autouse=True)
+def fake_kaleido(monkeypatch):
+    FakeKaleido.sessions = []
+    monkeypatch.setattr(renderer.kaleido, "Kaleido", FakeKaleido)
+
+
+def test_session_is_reused_until_closed(tmp_path) -> None:
+    kaleido_renderer = KaleidoRenderer()
+    kaleido_renderer.write_images([{}], [[tmp_path / "a.svg", tmp_path / "a.png"]])
+    kaleido_renderer.write_images([{}, {}], [[tmp_path / "b.svg"], [tmp_path / "c.png"]])
+
+    assert (tmp_path / "a.png").read_text() == "png"
+    assert (tmp_path / "c.png").read_text() == "png"
+    assert kaleido_renderer.startups == 1
+    assert kaleido_renderer.rendered_images == len(list(tmp_path.iterdir()))
+    assert [session.is_open for session in FakeKaleido.sessions] == [True]
+
+    kaleido_renderer.close()
+    assert [session.is_open for session in FakeKaleido.sessions] == [False]
+
+    kaleido_renderer.write_images([{}], [[tmp_path / "d.svg"]])
+    assert kaleido_renderer.startups == len(FakeKaleido.sessions)
+    assert FakeKaleido.sessions[-1].is_open
+    kaleido_renderer.close()
+
+
+def test_failed_render_closes_the_session(tmp_path) -> None:
+    kaleido_renderer = KaleidoRenderer()
+    with pytest.raises(RuntimeError, match="Render failed"):
+        kaleido_renderer.write_images([{"broken": True}], [[tmp_path / "a.svg"]])
+    assert not FakeKaleido.sessions[0].is_open
+
+    kaleido_renderer.write_images([{}], [[tmp_path / "a.svg"]])
+    assert FakeKaleido.sessions[-1].is_open
+    kaleido_renderer.close()
+
+
+def test_failed_images_are_returned_and_keep_the_previous_file(tmp_path) -> None:
+    (tmp_path / "b.svg").write_text("previous")
+    kaleido_renderer = KaleidoRenderer()
+
+    failed = kaleido_renderer.write_images(
+        [{}, {"invalid": True}], [[tmp_path / "a.svg", tmp_path / "a.png"], [tmp_path / "b.svg", tmp_path / "b.png"]]
+    )
+
+    assert failed == [tmp_path / "b.svg", tmp_path / "b.png"]
+    assert (tmp_path / "a.png").read_text() == "png"
+    assert (tmp_path / "b.svg").read_text() == "previous"
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["a.png", "a.svg", "b.svg"]
+    assert kaleido_renderer.rendered_images == len(["a.svg", "a.png"])
+    kaleido_renderer.close()
+
+
+def test_process_renderer_is_shared() -> None:
+    assert renderer.get_renderer() is renderer.get_renderer()
+    assert renderer.get_renderer("agg") is not renderer.get_renderer("kaleido")
+    with pytest.raises(ValueError):
+        renderer.get_renderer("cairo")
+    renderer.close_renderers()
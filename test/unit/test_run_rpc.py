@@ -0,0 +1,96 @@
+import socket
+import subprocess
+import sys
+
+import pytest
+
+import run_rpc
+from run_rpc import DEFAULT_REMOTE_SETTLE_TIME, RpcTestRunner, _wait_for_exit, _wait_until_listening
+
+
+def start_sleeper(seconds: float) -> subprocess.Popen[str]:
+    return subprocess.Popen([sys.executable, "-c", f"import time; time.sleep({seconds})"], text=True)
+
+
+def test_wait_until_listening_detects_listening_socket() -> None:
+    process = start_sleeper(10)
+    try:
+        with socket.create_server(("127.0.0.1", 0)) as server:
+            port = server.getsockname()[1]
+            assert _wait_until_listening("127.0.0.1", port, process, timeout=5) is True
+    finally:
+        process.kill()
+        process.wait()
+
+
+def test_wait_until_listening_detects_exited_process() -> None:
+    with socket.create_server(("127.0.0.1", 0)) as server:
+        port = server.getsockname()[1]
+    process = start_sleeper(0)
+
+    assert _wait_until_listening("127.0.0.1", port, process, timeout=10) is None
+
+
+def test_wait_until_listening_times_out() -> None:
+    with socket.create_server(("127.0.0.1", 0)) as server:
+        port = server.getsockname()[1]
+    process = start_sleeper(10)
+    try:
+        assert _wait_until_listening("127.0.0.1", port, process, timeout=0.2) is False
+    finally:
+        process.kill()
+        process.wait()
+
+
+def test_wait_for_exit() -> None:
+    process = start_sleeper(10)
+    try:
+        assert not _wait_for_exit(process, timeout=0.2)
+    finally:
+        process.kill()
+
+    assert _wait_for_exit(process, timeout=5)
+
+
+class FakeServerProcess:
+    def __init__(self, returncode: int | None) -> None:
+        self.returncode = returncode
+
+    def poll(self) -> int | None:
+        return self.returncode
+
+
+def make_runner(tmp_path, **rpc_config) -> RpcTestRunner:
+    (tmp_path / "rpc.yaml").write_text("{}")
+    cpusets = [
+        "asymmetric_server_app_cpuset",
+        "asymmetric_server_async_worker_cpuset",
+        "symmetric_server_cpuset",
+        "asymmetric_client_app_cpuset",
+        "asymmetric_client_async_worker_cpuset",
+        "symmetric_client_cpuset",
+    ]
+    rpc_config = (
+        {"tester_path": "release/rpc_tester", "ip_address": "10.0.0.1"} | dict.fromkeys(cpusets, "0") | rpc_config
+    )
+    return RpcTestRunner(rpc_config, tmp_path / "rpc.yaml", tmp_path, skip_async_workers_cpuset=False)
+
+
+def test_remote_server_is_not_probed_from_here(tmp_path, monkeypatch) -> None:
+    slept = []
+    monkeypatch.setattr(run_rpc, "sleep", slept.append)
+    monkeypatch.setattr(run_rpc, "_wait_until_listening", lambda *args: pytest.fail("Probed the connect address"))
+    runner = make_runner(tmp_path, server_remote="10.0.0.2:8080")
+
+    runner._RpcTestRunner__wait_for_server(FakeServerProcess(None))
+
+    assert slept == [DEFAULT_REMOTE_SETTLE_TIME]
+    with pytest.raises(RuntimeError, match="exited with code 1"):
+        runner._RpcTestRunner__wait_for_server(FakeServerProcess(1))
+
+
+def test_server_exiting_before_listening_fails(tmp_path) -> None:
+    runner = make_runner(tmp_path, ip_address="127.0.0.1", remote_connect_port="1", server_ready_timeout=5)
+
+    with pytest.raises(RuntimeError, match="exited with code 0 before accepting connections"):
+        runner._RpcTestRunner__wait_for_server(start_sleeper(0))
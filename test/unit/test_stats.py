@@ -0,0 +1,149 @@
+import math
+import statistics
+
+import numpy as np
+
+from stats import (
+    NO_SHARD,
+    MetricSamples,
+    RunningStats,
+    StatsAggregator,
+    compute_grouped_stats,
+    compute_stats,
+    compute_stats_batch,
+    join_stats,
+    split_by_run,
+    summarize_stats,
+)
+from tree import TreeDict
+
+
+def make_runs() -> list[dict]:
+    runs = []
+    for run_id in range(3):
+        sharded: TreeDict = TreeDict()
+        sharded[("requests",)] = {"epoll": {0: 10 + run_id, 1: 12.5}, "io_uring": {1: 7}}
+        shardless: TreeDict = TreeDict()
+        shardless[("errors", "total")] = {"epoll": run_id, "io_uring": "n/a"}
+        runs.append({"run_id": run_id, "sharded": sharded, "shardless": shardless})
+    return runs
+
+
+def test_metric_samples_keep_values_exact() -> None:
+    values = [1, 2.5, 2**60, True, None, "n/a", -3, 0.0]
+    samples = MetricSamples()
+    for index, value in enumerate(values):
+        samples.append(index, NO_SHARD, value)
+
+    assert len(samples) == len(values)
+    loaded = [value for _, _, value in samples]
+    assert loaded == values
+    assert [type(value) for value in loaded] == [type(value) for value in values]
+
+
+def test_join_stats_stores_samples_per_metric_and_backend() -> None:
+    (sharded, shardless) = join_stats(make_runs())
+
+    epoll = sharded[("requests",)]["epoll"]
+    assert list(epoll) == [(0, 0, 10), (0, 1, 12.5), (1, 0, 11), (1, 1, 12.5), (2, 0, 12), (2, 1, 12.5)]
+    assert list(shardless[("errors", "total")]["epoll"]) == [(0, NO_SHARD, 0), (1, NO_SHARD, 1), (2, NO_SHARD, 2)]
+
+
+def test_split_by_run_is_inverse_of_join_stats() -> None:
+    runs = make_runs()
+
+    split = split_by_run(*join_stats(runs))
+
+    assert list(split) == [0, 1, 2]
+    for run in runs:
+        (sharded, shardless) = split[run["run_id"]]
+        assert dict(sharded.items()) == dict(run["sharded"].items())
+        assert dict(shardless.items()) == dict(run["shardless"].items())
+
+
+def test_summarize_stats_of_samples() -> None:
+    stats = summarize_stats(*join_stats(make_runs()))
+
+    assert stats.get_sharded_metrics()[("requests",)]["epoll"][0] == {
+        "min": 10,
+        "max": 12,
+        "mean": 11,
+        "median": 11,
+        "range": 2,
+        "stdev": 1,
+        "variance": 1,
+    }
+    assert stats.get_sharded_metrics()[("requests",)]["io_uring"][1]["stdev"] == 0
+    assert stats.get_shardless_metrics()[("errors", "total")]["io_uring"] is None
+
+
+def test_compute_stats_batch_matches_statistics_module() -> None:
+    columns = [[1.5, 2.25, 10.0, 0.1], [3.0, 3.0], [7.0], [0.1, 0.2, 0.3, 0.7, 1e9]]
+    matrix = np.full((max(map(len, columns)), len(columns)), np.nan)
+    for index, column in enumerate(columns):
+        matrix[: len(column), index] = column
+
+    for column, stats in zip(columns, compute_stats_batch(matrix), strict=True):
+        assert stats == {
+            "min": min(column),
+            "max": max(column),
+            "mean": statistics.mean(column),
+            "median": statistics.median(column),
+            "range": max(column) - min(column),
+            "stdev": statistics.stdev(column) if len(column) > 1 else 0.0,
+            "variance": statistics.variance(column) if len(column) > 1 else 0.0,
+        }
+
+
+def test_compute_stats_skips_non_numeric_values() -> None:
+    assert compute_stats([1, "n/a", None, "3"]) == compute_stats([1, 3])
+    assert compute_stats(["n/a", None]) is None
+    assert compute_stats([]) is None
+
+
+def test_compute_grouped_stats_keeps_first_occurrence_order() -> None:
+    groups = np.array([5, 2, 5, 2, 9])
+    values = np.array([1.0, 2.0, 3.0, math.nan, 4.0])
+
+    stats = compute_grouped_stats(groups, values)
+
+    assert list(stats) == [5, 2, 9]
+    assert stats[5] == compute_stats([1.0, 3.0])
+    assert stats[2] == compute_stats([2.0])
+    assert stats[9] == compute_stats([4.0])
+
+
+def test_running_stats_match_statistics_module() -> None:
+    values = [1.5, 2.25, 10.0, 0.1, 1e9, -3.0]
+    running = RunningStats()
+    for value in values:
+        running.add(value)
+
+    assert running.count == len(values)
+    assert (running.min, running.max) == (min(values), max(values))
+    assert math.isclose(running.mean, statistics.mean(values))
+    assert math.isclose(running.variance(), statistics.variance(values))
+    assert math.isclose(running.stdev(), statistics.stdev(values))
+
+
+def test_stats_aggregator_joins_runs_incrementally() -> None:
+    runs = make_runs()
+    aggregator = StatsAggregator()
+    for run in runs:
+        aggregator.add_run(run)
+
+    (sharded, shardless) = aggregator.get_samples()
+    (expected_sharded, expected_shardless) = join_stats(runs)
+    assert aggregator.run_count == len(runs)
+    assert {
+        path: {backend: list(samples) for backend, samples in backends.items()} for path, backends in sharded.items()
+    } == {
+        path: {backend: list(samples) for backend, samples in backends.items()}
+        for path, backends in expected_sharded.items()
+    }
+    assert list(shardless[("errors", "total")]["epoll"]) == list(expected_shardless[("errors", "total")]["epoll"])
+
+    assert aggregator.running_stats[(("requests",), "epoll", 0)].mean == statistics.mean([10, 11, 12])
+    assert aggregator.running_stats[(("errors", "total"), "epoll", NO_SHARD)].count == len(runs)
+    # Non-numeric values have no running stats
+    assert (("errors", "total"), "io_uring", NO_SHARD) not in aggregator.running_stats
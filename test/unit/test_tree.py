@@ -1,5 +1,6 @@
-from yaml import safe_dump, safe_load
+import pytest
 
+from fast_yaml import safe_dump, safe_load
 from tree import TreeDict
 
 VALUES = {(("a", "b"), 1), (("a", "c"), 2), (("d",), 3)}
@@ -147,3 +148,51 @@ def test_yaml_deserialize_with_duplicate_keys() -> None:
         assert False, "Expected ValueError for duplicate keys, but no exception was raised."
     except ValueError as e:
         assert "Duplicate key 'b'" in str(e), f"Unexpected error message: {str(e)}"
+
+
+def test_getitem_of_missing_path_does_not_modify_tree() -> None:
+    tm: TreeDict[int] = TreeDict()
+    tm[("a", "b")] = 1
+
+    with pytest.raises(KeyError):
+        tm[("a", "missing", "c")]
+
+    assert tm.get_metrics() == {"a": {"b": tm.get_metrics()["a"]["b"]}}
+    assert tm[("a",)] == {"b": tm.get_metrics()["a"]["b"]}
+    assert len(tm) == 1
+
+
+def test_items_keep_tree_order_after_inserting_into_earlier_subtree() -> None:
+    tm: TreeDict[int] = TreeDict()
+    tm[("a", "x")] = 1
+    tm[("b",)] = 2
+    # Use the index, then insert a leaf that comes before ("b",) in the tree order
+    assert ("b",) in tm
+    tm[("a", "y")] = 3
+    tm.setdefault(("c",), 4)
+
+    assert list(tm.items()) == [(("a", "x"), 1), (("a", "y"), 3), (("b",), 2), (("c",), 4)]
+    assert tm.keys() == [("a", "x"), ("a", "y"), ("b",), ("c",)]
+    assert safe_dump(tm) == safe_dump(safe_load(safe_dump(tm)))
+
+
+def test_index_sees_changes_made_through_get_metrics() -> None:
+    tm: TreeDict[int] = TreeDict()
+    tm[("a", "b")] = 1
+    assert ("a", "c") not in tm
+
+    tm.get_metrics()["a"]["c"] = tm.get_metrics()["a"]["b"]
+
+    assert ("a", "c") in tm
+    assert tm[("a", "c")] == 1
+
+
+def test_insert_through_leaf_raises_type_error() -> None:
+    tm: TreeDict[int] = TreeDict()
+    tm[("a",)] = 1
+
+    with pytest.raises(TypeError):
+        tm[("a", "b")] = 2
+    with pytest.raises(TypeError):
+        tm.setdefault(("a", "b", "c"), 2)
+    assert list(tm.items()) == [(("a",), 1)]
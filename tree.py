@@ -1,7 +1,6 @@
 from collections.abc import Callable, Iterator
 from typing import Generic, TypeVar
 
-import yaml
 from yamlable import YamlAble, yaml_info
 
 T = TypeVar("T")
@@ -9,19 +8,39 @@ T = TypeVar("T")
 
 @yaml_info("leaf")
 class _Leaf(Generic[T], YamlAble):
+    # Keeps the instance __dict__ unallocated, see the result classes of `benchmark`
+    __slots__ = ("value",)
+
     def __init__(self, value: T) -> None:
         self.value = value
 
     def __repr__(self) -> str:
         return f"Leaf({self.value})"
 
+    def __to_yaml_dict__(self) -> dict:
+        return {"value": self.value}
+
+
+def _equals(x: str, y: str) -> bool:
+    return x == y
+
 
 @yaml_info("tree_dict")
 class TreeDict(Generic[T], YamlAble):
+    """Values stored at paths (tuples of keys) of a nested dict.
+
+    Besides the nested form, which is serialized to YAML, the tree keeps a flat index of its leaves
+    (path -> leaf, in tree order). The index is built on first use, kept up to date by `__setitem__`
+    and `setdefault`, and dropped when the nested form may have been changed directly (`get_metrics`).
+    """
+
     def __init__(self) -> None:
         self.metrics: dict = {}
+        self._index: dict[tuple[str, ...], _Leaf[T]] | None = None
 
     def get_metrics(self) -> dict:
+        # The caller may modify the nested form
+        self._invalidate_index()
         return self.metrics
 
     def items(self) -> Iterator[tuple[tuple[str, ...], T]]:
@@ -31,74 +50,73 @@ class TreeDict(Generic[T], YamlAble):
             For metrics = {'io': {'read': {'256kb': 123}}}
             items() yields (('io','read','256kb'), 123)
         """
-
-        def walk(prefix: list, data) -> Iterator[tuple[tuple[str, ...], T]]:
-            if not isinstance(data, dict):
-                yield (tuple(prefix), data.value)
-                return
-            for key, val in data.items():
-                yield from walk(prefix + [key], val)
-
-        yield from walk([], self.metrics)
+        for path, leaf in self._leaves().items():
+            yield (path, leaf.value)
 
     def __getitem__(self, path: tuple) -> T | dict:
         """Get the value or subtree at the given path in the metrics tree.
 
         If the path leads to a leaf, returns the leaf value.
         If the path leads to an internal node, returns the subtree dict.
-        If the path does not exist, creates intermediate nodes as needed.
+
+        Raises:
+            KeyError: if the path does not exist.
         """
+        leaf = self._leaves().get(path)
+        if leaf is not None:
+            return leaf.value
+
         cur = self.metrics
         for part in path:
-            if part not in cur:
-                cur[part] = {}
+            if not isinstance(cur, dict) or part not in cur:
+                raise KeyError(path)
             cur = cur[part]
-        if isinstance(cur, dict):
-            return cur
-        else:
-            return cur.value
+        return cur
 
     def __setitem__(self, path: tuple, value: T) -> None:
         """Set the value at the given path in the metrics tree.
 
         Creates intermediate nodes as needed.
         """
-        cur = self.metrics
-        for part in path[:-1]:
-            if part not in cur:
-                cur[part] = {}
-            cur = cur[part]
-        cur[path[-1]] = _Leaf(value)
+        (parent, appended) = self._parent_for_insert(path)
+        replaced = parent.get(path[-1])
+        leaf = _Leaf(value)
+        parent[path[-1]] = leaf
+        self._index_leaf(
+            path, leaf, appended=appended and replaced is None, replaced_subtree=isinstance(replaced, dict)
+        )
 
     def setdefault(self, path: tuple, default: T) -> T:
         """Set the value at the given path if not already set, and return it.
 
         Creates intermediate nodes as needed.
         """
-        cur = self.metrics
-        for part in path[:-1]:
-            if part not in cur:
-                cur[part] = {}
-            cur = cur[part]
-        if path[-1] not in cur:
-            cur[path[-1]] = _Leaf(default)
-            return default
-        else:
-            leaf = cur[path[-1]]
-            if isinstance(leaf, _Leaf):
-                return leaf.value
-            else:
-                raise TypeError(f"Expected leaf at path {path}, found subtree.")
+        leaf = self._leaves().get(path)
+        if leaf is not None:
+            return leaf.value
+
+        (parent, appended) = self._parent_for_insert(path)
+        if path[-1] in parent:
+            raise TypeError(f"Expected leaf at path {path}, found subtree.")
+
+        leaf = _Leaf(default)
+        parent[path[-1]] = leaf
+        self._index_leaf(path, leaf, appended=appended, replaced_subtree=False)
+        return default
 
     def get(
         self,
         path: tuple,
-        comparator: Callable[[str, str], bool] = lambda x, y: x == y,
+        comparator: Callable[[str, str], bool] = _equals,
         ambiguity_resolver: Callable[[tuple, list], str | None] = lambda _a, _b: None,
     ) -> T | None:
         """Get the value at the given path if it exists and satisfies the comparator, else None.
         If multiple keys match the comparator at any level it raises ValueError to avoid ambiguity.
         """
+        if comparator is _equals:
+            leaf = self._leaves().get(path)
+            return leaf.value if leaf is not None else None
+
         cur = self.metrics
         for part in path:
             if not isinstance(cur, dict):
@@ -119,20 +137,15 @@ class TreeDict(Generic[T], YamlAble):
 
     def keys(self) -> list[tuple[str, ...]]:
         """Return a list of all paths to leaf nodes in the metrics tree."""
-        return [path for path, _ in self.items()]
+        return list(self._leaves())
 
     def __contains__(self, path: tuple) -> bool:
         """Check if the given path exists in the metrics tree."""
-        cur = self.metrics
-        for part in path:
-            if not isinstance(cur, dict) or part not in cur:
-                return False
-            cur = cur[part]
-        return isinstance(cur, _Leaf)
+        return path in self._leaves()
 
     def __len__(self) -> int:
         """Return the number of leaf nodes in the metrics tree."""
-        return sum(1 for _ in self.items())
+        return len(self._leaves())
 
     def __repr__(self) -> str:
         return f"TreeDict({self.metrics})"
@@ -140,6 +153,52 @@ class TreeDict(Generic[T], YamlAble):
     def __to_yaml_dict__(self) -> dict:
         return self.metrics
 
+    def _leaves(self) -> dict[tuple[str, ...], _Leaf[T]]:
+        if self._index is None:
+            index: dict[tuple[str, ...], _Leaf[T]] = {}
+
+            def walk(prefix: tuple[str, ...], data: dict) -> None:
+                for key, val in data.items():
+                    if isinstance(val, dict):
+                        walk((*prefix, key), val)
+                    else:
+                        index[(*prefix, key)] = val
+
+            walk((), self.metrics)
+            self._index = index
+        return self._index
+
+    def _parent_for_insert(self, path: tuple) -> tuple[dict, bool]:
+        """Return the dict holding the last key of the path, creating intermediate nodes as needed.
+
+        Also tells whether a new leaf at the path would come last in the tree order.
+        """
+        cur = self.metrics
+        appended = True
+        for part in path[:-1]:
+            if not isinstance(cur, dict):
+                raise TypeError(f"Expected subtree at path {path}, found leaf.")
+            if part not in cur:
+                cur[part] = {}
+            elif part != next(reversed(cur)):
+                appended = False
+            cur = cur[part]
+        if not isinstance(cur, dict):
+            raise TypeError(f"Expected subtree at path {path}, found leaf.")
+        return (cur, appended)
+
+    def _index_leaf(self, path: tuple, leaf: _Leaf[T], appended: bool, replaced_subtree: bool) -> None:
+        if self._index is None:
+            return
+        if replaced_subtree or (path not in self._index and not appended):
+            # The index would be out of tree order, rebuild it on next use
+            self._invalidate_index()
+            return
+        self._index[path] = leaf
+
+    def _invalidate_index(self) -> None:
+        self._index = None
+
     @staticmethod
     def __resolve_next_key_or_throw(
         path: tuple, candidates: list, ambiguity_resolver: Callable[[tuple, list], str | None]
@@ -160,22 +219,3 @@ class TreeDict(Generic[T], YamlAble):
         obj = cls()
         obj.metrics = dct
         return obj
-
-
-class NoDuplicateLoader(yaml.SafeLoader):
-    def construct_mapping(self, node: yaml.nodes.MappingNode, deep: bool = False) -> dict:
-        seen = set()
-        mapping = []
-        for key_node, value_node in node.value:
-            key = self.construct_object(key_node, deep=deep)
-            if key in seen:
-                raise ValueError(f"Duplicate key '{key}' at {key_node.start_mark}")
-            seen.add(key)
-            mapping.append((key, self.construct_object(value_node, deep=deep)))
-        return dict(mapping)
-
-
-yaml.SafeLoader.add_constructor(
-    yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG,
-    NoDuplicateLoader.construct_mapping,
-)